@@ -0,0 +1,17 @@
+import pytest
+from django.core.cache import caches
+from django.core.signals import request_started
+from library import authentication
+from library.blacklist import blacklist
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+    authentication.clear()
+    blacklist.reset()
+    # Tests warm the blacklist explicitly, so query counts don't depend on
+    # which test happens to make the first request.
+    request_started.disconnect(dispatch_uid='library.warm_token_blacklist')
+    yield
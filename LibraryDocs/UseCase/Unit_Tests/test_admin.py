@@ -0,0 +1,93 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from library.models import Book, Loan, Reader
+from library.pagination import EstimatedCountPaginator
+
+
+@pytest.mark.django_db
+class TestFastAdmin:
+    def setup_method(self):
+        self.user = User.objects.create_superuser(
+            username='staff',
+            email='staff@library.com',
+            password='StaffStr0ngP@ss2024!'
+        )
+        self.reader = Reader.objects.create(user=self.user, address='Test Address', phone='1234567890')
+        self.books = Book.objects.bulk_create([
+            Book(title=f'Book {i}', author='Author', genre=f'Genre {i % 2}', publication_year=1990 + i)
+            for i in range(30)
+        ])
+        Loan.objects.create(book=self.books[0], reader=self.reader, return_date=timezone.now())
+
+    def test_unfiltered_count_is_estimated_above_limit(self, monkeypatch):
+        monkeypatch.setattr(EstimatedCountPaginator, 'exact_count_limit', 10)
+        Book.objects.filter(pk__in=[book.pk for book in self.books[:5]]).delete()
+
+        paginator = EstimatedCountPaginator(Book.objects.order_by('pk'), 10)
+        with CaptureQueriesContext(connection) as queries:
+            assert paginator.count == self.books[-1].pk
+        assert 'COUNT' not in queries[0]['sql']
+
+        assert EstimatedCountPaginator(Book.objects.filter(genre='Genre 0').order_by('pk'), 10).count == 10
+        assert EstimatedCountPaginator(Book.objects.filter(genre='Nope').order_by('pk'), 10).count == 0
+
+    def test_small_tables_are_counted_exactly(self):
+        assert EstimatedCountPaginator(Book.objects.order_by('pk'), 10).count == 30
+
+    def test_changelists_render_with_filters(self, client):
+        client.force_login(self.user)
+
+        response = client.get(reverse('admin:library_book_changelist'), {'decade': '2000', 'genre': 'Genre 1'})
+        assert response.status_code == 200
+        assert response.context['cl'].result_count == 5
+        assert '1990s' in response.content.decode()
+
+        year = timezone.localtime(Loan.objects.get().loan_date).year
+        response = client.get(reverse('admin:library_loan_changelist'), {'loan_date__year': year})
+        assert response.status_code == 200
+        assert response.context['cl'].result_count == 1
+
+    def test_date_hierarchy_years_come_from_the_date_range(self, client):
+        client.force_login(self.user)
+        for year, book in zip((2019, 2022), self.books[1:3]):
+            loan = Loan.objects.create(book=book, reader=self.reader, return_date=timezone.now())
+            Loan.objects.filter(pk=loan.pk).update(loan_date=timezone.make_aware(timezone.datetime(year, 6, 1)))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('admin:library_loan_changelist'))
+        assert response.status_code == 200
+        assert not any('DISTINCT' in query['sql'] for query in queries)
+        content = response.content.decode()
+        last_year = timezone.localtime(Loan.objects.order_by('loan_date').last().loan_date).year
+        for year in range(2019, last_year + 1):
+            assert f'?loan_date__year={year}"' in content
+
+    def test_date_hierarchy_starts_at_the_only_year(self, client):
+        client.force_login(self.user)
+        loan_date = timezone.localtime(Loan.objects.get().loan_date)
+
+        response = client.get(reverse('admin:library_loan_changelist'))
+        assert response.status_code == 200
+        content = response.content.decode()
+        assert f'loan_date__day={loan_date.day}' in content
+        assert f'loan_date__year={loan_date.year}' in content
+
+    def test_loan_form_uses_autocomplete(self, client):
+        client.force_login(self.user)
+
+        response = client.get(reverse('admin:library_loan_add'))
+        assert response.status_code == 200
+        content = response.content.decode()
+        assert 'admin-autocomplete' in content
+        assert 'Book 29' not in content
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('admin:autocomplete'), {
+                'app_label': 'library', 'model_name': 'loan', 'field_name': 'reader', 'term': 'sta'
+            })
+        assert [result['text'] for result in response.json()['results']] == ['staff']
+        assert not any('"auth_user"."id" = ' in query['sql'] for query in queries[2:])
@@ -0,0 +1,114 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from rest_framework import status
+from rest_framework.test import APIClient
+from library import benchmark
+from library.benchmark import percentile
+from library.models import Book, Loan, Reader
+
+
+@pytest.mark.django_db
+class TestAsyncReadViews:
+    def setup_method(self):
+        self.user = User.objects.create_user(username='asyncuser', password='AsyncUserStr0ngP@ss2024!')
+        self.reader = Reader.objects.create(user=self.user, address='Test Address', phone='1234567890')
+        self.books = [
+            Book.objects.create(title=f'Dune {i}', author='Frank Herbert', genre='Sci-Fi', publication_year=1965 + i)
+            for i in range(3)
+        ]
+        Loan.objects.create(
+            book=self.books[0],
+            reader=self.reader,
+            return_date=timezone.now() - timezone.timedelta(days=1)
+        )
+        self.client = APIClient()
+        response = self.client.post(
+            reverse('token_obtain_pair'),
+            {'username': 'asyncuser', 'password': 'AsyncUserStr0ngP@ss2024!'},
+            format='json'
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def _assert_same(self, sync_url, async_url):
+        expected = self.client.get(sync_url)
+        response = self.client.get(async_url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == expected.json()
+        return response
+
+    def test_requires_authentication(self):
+        response = APIClient().get(reverse('async_book_list'))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response['WWW-Authenticate'].startswith('Bearer')
+
+    def test_rejects_writes(self):
+        response = self.client.post(reverse('async_book_list'), {})
+        assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+
+    def test_book_list_matches_sync_view(self):
+        expected = self.client.get(reverse('book-list') + '?page_size=2').json()
+        response = self.client.get(reverse('async_book_list') + '?page_size=2')
+        assert response.json()['results'] == expected['results']
+        next_page = response.json()['next']
+        assert next_page.startswith('http://testserver/async/books/?cursor=')
+        assert len(self.client.get(next_page).json()['results']) == 1
+
+    def test_book_list_conditional_get(self):
+        url = reverse('async_book_list') + '?page_size=2'
+        response = self.client.get(url)
+        assert response.has_header('Last-Modified')
+
+        cached = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+        Book.objects.filter(pk=self.books[0].pk).update(title='Changed', updated_at=timezone.now())
+        assert self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code == status.HTTP_200_OK
+
+    def test_book_list_filters(self):
+        response = self.client.get(reverse('async_book_list') + '?year_min=1966')
+        assert [book['title'] for book in response.json()['results']] == ['Dune 1', 'Dune 2']
+        response = self.client.get(reverse('async_book_list') + '?year_min=1970&year_max=1960')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_book_detail_and_conditional_get(self):
+        url = reverse('async_book_detail', args=[self.books[1].id])
+        response = self._assert_same(reverse('book-detail', args=[self.books[1].id]), url)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert self.client.get(reverse('async_book_detail', args=[0])).status_code == status.HTTP_404_NOT_FOUND
+
+    def test_search_most_borrowed_pending_and_profile(self):
+        self._assert_same(reverse('book-search') + '?q=dune', reverse('async_book_search') + '?q=dune')
+        self._assert_same(reverse('book-most-borrowed'), reverse('async_most_borrowed'))
+        self._assert_same(reverse('book-most-borrowed') + '?window=7', reverse('async_most_borrowed') + '?window=7')
+        self._assert_same(reverse('loan-pending'), reverse('async_pending_loans'))
+        self._assert_same(reverse('user_profile'), reverse('async_user_profile'))
+        response = self.client.get(reverse('async_most_borrowed') + '?window=3')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_cached_user_skips_queries(self):
+        self.client.get(reverse('async_user_profile'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('async_user_profile'))
+        assert response.status_code == status.HTTP_200_OK
+        assert len(queries) == 0
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('async_book_list'))
+        # The list validators and the page; none for the user.
+        assert len(queries) == 2
+
+
+class TestBenchmark:
+    def test_percentile(self):
+        samples = list(range(1, 101))
+        assert percentile(samples, 0.50) == 50
+        assert percentile(samples, 0.99) == 99
+        assert percentile([], 0.5) is None
+
+    def test_run_counts_requests_and_errors(self, live_server):
+        result = benchmark.run(f'{live_server.url}/async/books/', requests=20, concurrency=4).as_dict()
+        assert result['requests'] == 20
+        assert result['errors'] == 20
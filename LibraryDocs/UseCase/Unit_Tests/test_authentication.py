@@ -0,0 +1,79 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from library.authentication import cached_user
+from library.models import Reader
+
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+    def setup_method(self):
+        self.user = User.objects.create_user(username='jwtuser', password='JwtUserStr0ngP@ss2024!')
+        self.reader = Reader.objects.create(user=self.user, address='Test Address', phone='1234567890')
+        self.client = APIClient()
+        response = self.client.post(
+            reverse('token_obtain_pair'),
+            {'username': 'jwtuser', 'password': 'JwtUserStr0ngP@ss2024!'},
+            format='json'
+        )
+        self.access = response.data['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+
+    def _profile_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('user_profile'))
+        return response, len(queries)
+
+    def test_token_carries_reader_but_no_permission_flags(self):
+        token = AccessToken(self.access)
+        assert token['reader_id'] == self.reader.id
+        assert 'is_staff' not in token
+        assert 'is_superuser' not in token
+
+    def test_repeated_requests_skip_user_lookup(self):
+        response, queries = self._profile_queries()
+        assert response.status_code == status.HTTP_200_OK
+        assert queries == 1
+        response, queries = self._profile_queries()
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['user']['username'] == 'jwtuser'
+        assert queries == 0
+
+    def test_pending_uses_reader_claim(self):
+        self._profile_queries()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('loan-pending'))
+        assert response.status_code == status.HTTP_200_OK
+        assert len(queries) == 1
+
+    def test_password_change_evicts_cached_user(self):
+        self._profile_queries()
+        response = self.client.put(
+            reverse('change_password'),
+            {'old_password': 'JwtUserStr0ngP@ss2024!', 'new_password': 'N3wJwtUserStr0ngP@ss!'},
+            format='json'
+        )
+        assert response.status_code == status.HTTP_200_OK
+        _, queries = self._profile_queries()
+        assert queries == 1
+
+    def test_deactivated_user_is_rejected(self):
+        self._profile_queries()
+        self.user.is_active = False
+        self.user.save()
+        response, _ = self._profile_queries()
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_cached_user_is_not_shared(self):
+        self._profile_queries()
+        first = cached_user(User, self.user.id)
+        first.username = 'mutated'
+        first.reader.phone = 'mutated'
+        second = cached_user(User, self.user.id)
+        assert second.username == 'jwtuser'
+        assert second.reader.phone == '1234567890'
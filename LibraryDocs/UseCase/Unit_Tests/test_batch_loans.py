@@ -0,0 +1,110 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework import status
+from rest_framework.test import APIClient
+from library import inventory
+from library.models import Book, Loan, Reader
+
+
+@pytest.mark.django_db
+class TestBatchLoans:
+    def setup_method(self):
+        self.user = User.objects.create_user(username='desk', password='DeskStr0ngP@ss2024!')
+        self.reader = Reader.objects.create(user=self.user, address='Test Address', phone='1234567890')
+        self.books = [
+            Book.objects.create(title=f'Book {i}', author='Author', genre='Test', publication_year=2024)
+            for i in range(5)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _checkout(self, book_ids):
+        return self.client.post(reverse('loan-batch-checkout'), {'books': book_ids}, format='json')
+
+    def _return(self, loan_ids):
+        return self.client.post(reverse('loan-batch-return'), {'loans': loan_ids}, format='json')
+
+    def test_checkout_enforces_limit_and_reports_per_book(self):
+        Book.objects.filter(pk=self.books[1].pk).update(available_copies=0, is_available=False)
+        ids = [book.id for book in self.books]
+
+        response = self._checkout(ids + [0])
+
+        assert response.status_code == status.HTTP_201_CREATED
+        results = response.data['results']
+        assert [result['book'] for result in results] == ids + [0]
+        assert results[1]['error'] == 'Book is not available for loan'
+        assert [bool(result.get('loan')) for result in results] == [True, False, True, True, False, False]
+        assert results[4]['error'] == 'Maximum number of loans reached'
+        assert results[5]['error'] == 'Book not found'
+
+        assert Loan.objects.filter(reader=self.reader, returned=False).count() == 3
+        loaned = Book.objects.filter(pk__in=[ids[0], ids[2], ids[3]])
+        assert not loaned.filter(is_available=True).exists()
+        assert list(loaned.values_list('loan_count', flat=True)) == [1, 1, 1]
+        assert Book.objects.get(pk=ids[4]).is_available
+
+    def test_checkout_query_count_is_independent_of_batch_size(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self._checkout([book.id for book in self.books[:3]])
+        assert response.status_code == status.HTTP_201_CREATED
+        # Reader lock, active count, availability, UPDATE, INSERT, plus the
+        # transaction's savepoint pair.
+        assert len(queries) <= 7
+
+    def test_batches_lock_rows_in_pk_order(self):
+        with CaptureQueriesContext(connection) as queries:
+            self._checkout([self.books[2].id, self.books[0].id])
+        books = next(query['sql'] for query in queries if query['sql'].startswith('SELECT "library_book"'))
+        assert books.endswith('ORDER BY "library_book"."id" ASC')
+
+        loan_ids = list(Loan.objects.values_list('id', flat=True))
+        with CaptureQueriesContext(connection) as queries:
+            self._return(loan_ids[::-1])
+        loans = next(query['sql'] for query in queries if query['sql'].startswith('SELECT "library_loan"'))
+        assert loans.endswith('ORDER BY "library_loan"."id" ASC')
+
+    def test_checkout_rolls_back_when_copies_run_out(self, monkeypatch):
+        take_copies = inventory.take_copies
+        monkeypatch.setattr(inventory, 'take_copies', lambda ids, *args, **kwargs: take_copies(ids[:1], *args, **kwargs))
+
+        response = self._checkout([book.id for book in self.books[:2]])
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert not Loan.objects.exists()
+        assert not Book.objects.filter(available_copies=0).exists()
+        assert not Book.objects.filter(loan_count__gt=0).exists()
+
+    def test_checkout_with_no_free_slot_fails(self):
+        self._checkout([book.id for book in self.books[:3]])
+        response = self._checkout([self.books[3].id])
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['results'][0]['error'] == 'Maximum number of loans reached'
+
+    def test_checkout_rejects_invalid_payload(self):
+        assert self._checkout([]).status_code == status.HTTP_400_BAD_REQUEST
+        assert self._checkout(['x']).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_return_reports_per_loan(self):
+        self._checkout([book.id for book in self.books[:2]])
+        mine = list(Loan.objects.filter(reader=self.reader).order_by('id').values_list('id', flat=True))
+        other = Reader.objects.create(
+            user=User.objects.create(username='other'), address='Test Address', phone='1234567890'
+        )
+        theirs = Loan.objects.create(book=self.books[4], reader=other, return_date=self.books[4].created_at)
+
+        response = self._return(mine + [theirs.id, 0])
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [result.get('status') for result in response.data['results'][:2]] == ['book returned'] * 2
+        assert response.data['results'][2]['error'] == 'You are not authorized to return this book'
+        assert response.data['results'][3]['error'] == 'Loan not found'
+        assert not Loan.objects.filter(pk__in=mine, returned=False).exists()
+        assert Book.objects.filter(pk__in=[self.books[0].id, self.books[1].id], is_available=True).count() == 2
+
+        response = self._return(mine)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['results'][0]['error'] == 'This loan has already been returned'
@@ -0,0 +1,90 @@
+import pytest
+from django.core.management import call_command
+from django.db import models
+from django.urls.resolvers import URLResolver
+from django.contrib.auth.models import User
+from django.utils import timezone
+from library import api_benchmark, seeding, urls
+from library.models import Book, Loan, Reader
+
+
+def _route_names(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _route_names(pattern.url_patterns)
+        else:
+            yield pattern.name
+
+
+@pytest.mark.django_db
+class TestSeedLibrary:
+    def test_seeds_consistent_data(self):
+        call_command('seed_library', books=50, readers=10, loans=300, batch_size=40, seed=1)
+
+        assert Book.objects.count() == 50
+        assert Reader.objects.count() == 10
+        assert Loan.objects.count() == 300
+        active = Loan.objects.filter(returned=False)
+        assert active.count() == 30
+        assert not active.values('reader').annotate(n=models.Count('id')).filter(n__gt=3).exists()
+        assert Book.objects.filter(is_available=False).count() == 30
+        assert Book.objects.aggregate(total=models.Sum('loan_count'))['total'] == 300
+        assert not Loan.objects.filter(loan_date__gt=models.F('return_date')).exists()
+
+    def test_reseeding_adds_rows(self):
+        call_command('seed_library', books=5, readers=2, loans=0)
+        User.objects.order_by('pk').first().delete()
+        Book.objects.order_by('pk').first().delete()
+        call_command('seed_library', books=5, readers=2, loans=0)
+        assert Book.objects.count() == 9
+        assert User.objects.count() == 3
+
+    def test_backdating_leaves_other_loans_alone(self, monkeypatch):
+        call_command('seed_library', books=5, readers=2, loans=0)
+        insert = seeding._insert
+        concurrent = []
+
+        def insert_then_checkout(model, objects, batch_size):
+            ids = insert(model, objects, batch_size)
+            if model is Loan:
+                # A checkout committed by someone else while seeding.
+                concurrent.append(Loan.objects.create(
+                    book=Book.objects.first(), reader=Reader.objects.first(), return_date=timezone.now()
+                ))
+            return ids
+
+        monkeypatch.setattr(seeding, '_insert', insert_then_checkout)
+        call_command('seed_library', books=5, readers=2, loans=20, seed=3)
+
+        loan = concurrent[0]
+        assert Loan.objects.get(pk=loan.pk).loan_date == loan.loan_date
+
+
+@pytest.mark.django_db
+class TestApiBenchmark:
+    def test_scenarios_cover_every_route(self):
+        fixtures = api_benchmark.create_fixtures()
+        covered = {scenario.route for scenario in api_benchmark.api_scenarios(fixtures)}
+        assert set(_route_names(urls.urlpatterns)) <= covered
+
+    def test_run_succeeds_and_rolls_back(self):
+        call_command('seed_library', books=20, readers=5, loans=50, seed=2)
+        counts = (Book.objects.count(), Loan.objects.count(), User.objects.count())
+
+        results = api_benchmark.run(iterations=1, warmup=0)
+
+        assert {name: stats['errors'] for name, stats in results.items() if stats['errors']} == {}
+        assert results['book-list']['queries'] <= 3
+        assert (Book.objects.count(), Loan.objects.count(), User.objects.count()) == counts
+
+    def test_regressions(self):
+        baseline = {'a': {'p95_ms': 10.0, 'queries': 2}, 'b': {'p95_ms': 10.0, 'queries': 2}}
+        results = {
+            'a': {'p95_ms': 12.0, 'queries': 2},
+            'b': {'p95_ms': 20.0, 'queries': 3},
+            'c': {'p95_ms': 50.0, 'queries': 9},
+        }
+        assert api_benchmark.regressions(results, baseline) == [
+            'b: 2 -> 3 queries',
+            'b: p95 10.0 -> 20.0 ms',
+        ]
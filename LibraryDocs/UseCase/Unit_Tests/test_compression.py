@@ -0,0 +1,112 @@
+import gzip
+from decimal import Decimal
+from io import BytesIO
+
+import pytest
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from library import api_benchmark, compression
+from library.models import Book, Reader
+from library.parsers import FastJSONParser
+from library.renderers import FastJSONRenderer
+
+
+class TestFastJSON:
+    def test_renders_like_drf(self):
+        data = {
+            'when': timezone.now(),
+            'amount': Decimal('1.50'),
+            'label': gettext_lazy('Title'),
+            'text': 'Ação   line',
+            'items': [1, 2.5, None, True],
+            3: 'int key',
+        }
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+        assert FastJSONRenderer().render(None) == b''
+
+    def test_indent_falls_back_to_drf(self):
+        data = {'a': [1, 2]}
+        assert FastJSONRenderer().render(data, 'application/json; indent=4') == \
+            JSONRenderer().render(data, 'application/json; indent=4')
+
+    def test_parser(self):
+        assert FastJSONParser().parse(BytesIO('{"title": "Ação"}'.encode())) == {'title': 'Ação'}
+        with pytest.raises(ParseError):
+            FastJSONParser().parse(BytesIO(b'{"title": NaN}'))
+
+
+class TestNegotiation:
+    def test_gzip_only_without_brotli(self, monkeypatch):
+        monkeypatch.setattr(compression, 'brotli', None)
+        assert compression.negotiate('gzip, deflate, br') == 'gzip'
+        assert compression.negotiate('br') is None
+        assert compression.negotiate('gzip;q=0') is None
+        assert compression.negotiate('*;q=0.1') == 'gzip'
+        assert compression.negotiate('') is None
+
+    def test_prefers_brotli(self):
+        pytest.importorskip('brotli')
+        assert compression.negotiate('gzip, br') == 'br'
+        assert compression.negotiate('gzip;q=1, br;q=0.5') == 'gzip'
+
+
+@pytest.mark.django_db
+class TestCompressionMiddleware:
+    def setup_method(self):
+        self.user = User.objects.create_user(username='gzip', password='GzipStr0ngP@ss2024!', is_staff=True)
+        Reader.objects.create(user=self.user, address='Test Address', phone='1234567890')
+        self.books = [
+            Book.objects.create(title=f'Book {i}', author='Author', genre='Test', publication_year=2024)
+            for i in range(20)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_large_list_is_gzipped(self):
+        plain = self.client.get(reverse('book-list'))
+        response = self.client.get(reverse('book-list'), HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+        assert response['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response['Vary']
+        assert int(response['Content-Length']) == len(response.content) < len(plain.content)
+        assert gzip.decompress(response.content) == plain.content
+        assert response['ETag'] == 'W/' + plain['ETag']
+
+    def test_weak_etag_still_validates(self, settings):
+        settings.COMPRESSION = {'MIN_SIZE': 100}
+        Book.objects.filter(pk=self.books[0].pk).update(title='Long title ' * 18, author='Long author ' * 16)
+        url = reverse('book-detail', args=[self.books[0].pk])
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        etag = response['ETag']
+        assert etag.startswith('W/')
+
+        cached = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag)
+        assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+        updated = self.client.patch(url, {'title': 'Guarded'}, format='multipart', HTTP_IF_MATCH=etag)
+        assert updated.status_code == status.HTTP_200_OK
+
+    def test_small_responses_are_not_compressed(self):
+        response = self.client.get(reverse('book-list'), {'fields': 'id', 'page_size': 2}, HTTP_ACCEPT_ENCODING='gzip')
+
+        assert not response.has_header('Content-Encoding')
+
+    def test_streaming_export_is_compressed_incrementally(self):
+        response = self.client.get(reverse('book-export'), {'output': 'csv'}, HTTP_ACCEPT_ENCODING='gzip')
+
+        assert response.streaming
+        assert response['Content-Encoding'] == 'gzip'
+        assert not response.has_header('Content-Length')
+        body = gzip.decompress(b''.join(response.streaming_content)).decode()
+        assert body.count('Book ') == 20
+
+    def test_render_benchmark(self):
+        results = api_benchmark.render_costs(rows=20, repeat=1)
+
+        assert results['books']['rows'] == 20
+        assert results['books']['gzip_bytes'] < results['books']['identity_bytes']
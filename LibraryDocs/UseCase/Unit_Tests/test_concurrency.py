@@ -0,0 +1,53 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework import status
+from rest_framework.test import APIClient
+from library.models import Book, Loan, Reader
+
+
+def _checkout(user, book_id):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    try:
+        return client.post(reverse('loan-list'), {'book': book_id}, format='json').status_code
+    finally:
+        connection.close()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentCheckout:
+    def _make_reader(self, username):
+        user = User.objects.create_user(username=username, password='ConcStr0ngP@ss2024!')
+        Reader.objects.create(user=user, address='Test Address', phone='1234567890')
+        return user
+
+    def _make_book(self, title):
+        return Book.objects.create(title=title, author='Author', genre='Test', publication_year=2024)
+
+    def test_same_book_is_loaned_only_once(self):
+        book = self._make_book('Hot Book')
+        users = [self._make_reader(f'reader{i}') for i in range(8)]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            codes = list(pool.map(lambda user: _checkout(user, book.id), users))
+
+        assert codes.count(status.HTTP_201_CREATED) == 1
+        assert codes.count(status.HTTP_400_BAD_REQUEST) == len(users) - 1
+        assert Loan.objects.filter(book=book).count() == 1
+        book.refresh_from_db()
+        assert not book.is_available
+
+    def test_reader_cannot_exceed_loan_limit(self):
+        user = self._make_reader('greedy')
+        books = [self._make_book(f'Book {i}') for i in range(8)]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            codes = list(pool.map(lambda book: _checkout(user, book.id), books))
+
+        assert codes.count(status.HTTP_201_CREATED) == 3
+        assert Loan.objects.filter(reader__user=user, returned=False).count() == 3
+        assert Book.objects.filter(is_available=False).count() == 3
@@ -0,0 +1,75 @@
+import pytest
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework import status
+from rest_framework.test import APIClient
+from library.models import Book, Reader
+
+
+@pytest.mark.django_db
+class TestConditionalRequests:
+    def setup_method(self):
+        self.user = User.objects.create_superuser(
+            username='poller',
+            email='poller@library.com',
+            password='PollerStr0ngP@ss2024!'
+        )
+        self.reader = Reader.objects.create(user=self.user, address='Test Address', phone='1234567890')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.book = Book.objects.create(title='Cached', author='Author', genre='Test', publication_year=2024)
+
+    def test_detail_not_modified(self):
+        url = reverse('book-detail', kwargs={'pk': self.book.id})
+        first = self.client.get(url)
+        assert first.status_code == status.HTTP_200_OK
+        assert first['Last-Modified']
+
+        second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        assert second.status_code == status.HTTP_304_NOT_MODIFIED
+        assert second['ETag'] == first['ETag']
+
+        self.book.genre = 'Changed'
+        self.book.save()
+        third = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        assert third.status_code == status.HTTP_200_OK
+        assert third['ETag'] != first['ETag']
+
+    def test_list_etag_follows_inserts_deletes_and_query(self):
+        url = reverse('book-list')
+        etag = self.client.get(url)['ETag']
+        assert self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+        assert self.client.get(url + '?genre=Test', HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+        other = Book.objects.create(title='Another', author='Author', genre='Test', publication_year=2024)
+        assert self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+        etag = self.client.get(url)['ETag']
+        other.delete()
+        assert self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+    def test_if_match_guards_updates(self):
+        url = reverse('book-detail', kwargs={'pk': self.book.id})
+        etag = self.client.get(url)['ETag']
+
+        stale = self.client.patch(url, {'genre': 'Mine'}, format='multipart', HTTP_IF_MATCH='"stale"')
+        assert stale.status_code == status.HTTP_412_PRECONDITION_FAILED
+
+        fresh = self.client.patch(url, {'genre': 'Mine'}, format='multipart', HTTP_IF_MATCH=etag)
+        assert fresh.status_code == status.HTTP_200_OK
+        assert fresh['ETag'] != etag
+
+        lost = self.client.patch(url, {'genre': 'Theirs'}, format='multipart', HTTP_IF_MATCH=etag)
+        assert lost.status_code == status.HTTP_412_PRECONDITION_FAILED
+        self.book.refresh_from_db()
+        assert self.book.genre == 'Mine'
+
+    def test_profile_changes_with_user(self):
+        url = reverse('user_profile')
+        etag = self.client.get(url)['ETag']
+        assert self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+        self.user.email = 'new@library.com'
+        self.user.save()
+        # The forced-auth user caches its reader; a real request loads it fresh.
+        self.user.reader.refresh_from_db()
+        assert self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
@@ -0,0 +1,37 @@
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.contrib.auth.models import User
+from library import api_benchmark
+from library.models import Book, Loan
+
+
+def _pragma(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db
+class TestSQLiteProfile:
+    def test_pragmas_applied_on_connect(self):
+        assert _pragma('journal_mode') == 'wal'
+        assert _pragma('synchronous') == 1  # NORMAL
+        assert _pragma('cache_size') == settings.SQLITE_PRAGMAS['cache_size']
+        assert _pragma('busy_timeout') == 20000
+
+    def test_connections_persist_with_health_checks(self):
+        assert connection.settings_dict['CONN_MAX_AGE'] == settings.CONN_MAX_AGE > 0
+        assert connection.settings_dict['CONN_HEALTH_CHECKS'] is True
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentWriters:
+    def test_round_trips_without_lock_errors(self):
+        result = api_benchmark.run_writers(threads=4, operations=5)
+
+        assert result['round_trips'] == 20
+        assert result['failed'] == 0
+        assert not User.objects.exists()
+        assert not Book.objects.exists()
+        assert not Loan.objects.exists()
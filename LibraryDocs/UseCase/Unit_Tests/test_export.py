@@ -0,0 +1,66 @@
+import csv
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from rest_framework import status
+from rest_framework.test import APIClient
+from library.models import Book, Loan, Reader
+
+
+@pytest.mark.django_db
+class TestExport:
+    def setup_method(self):
+        self.admin_user = User.objects.create_superuser(
+            username='exporter',
+            email='exporter@library.com',
+            password='ExportStr0ngP@ss2024!'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin_user)
+        reader = Reader.objects.create(user=self.admin_user, address='Test Address', phone='1234567890')
+        self.books = [
+            Book.objects.create(title=f'Book {i}', author='Author', genre='Test', publication_year=2000 + i)
+            for i in range(3)
+        ]
+        for days_ago, book in zip((40, 10, 1), self.books):
+            loan = Loan.objects.create(book=book, reader=reader, return_date=timezone.now())
+            Loan.objects.filter(pk=loan.pk).update(loan_date=timezone.now() - timezone.timedelta(days=days_ago))
+
+    def _content(self, response):
+        assert response.status_code == status.HTTP_200_OK
+        return b''.join(response.streaming_content).decode()
+
+    def test_books_export_streams_csv(self):
+        Book.objects.filter(pk=self.books[0].pk).update(total_copies=3, available_copies=2)
+        response = self.client.get(reverse('book-export'))
+        assert response['Content-Type'] == 'text/csv'
+        rows = list(csv.DictReader(io.StringIO(self._content(response))))
+        assert [row['title'] for row in rows] == ['Book 0', 'Book 1', 'Book 2']
+        assert rows[0]['loan_count'] == '1'
+        assert (rows[0]['total_copies'], rows[0]['available_copies']) == ('3', '2')
+
+    def test_loans_export_filters_by_loan_date(self):
+        since = (timezone.now() - timezone.timedelta(days=20)).date().isoformat()
+        response = self.client.get(reverse('loan-export'), {'output': 'jsonl', 'since': since})
+        rows = [json.loads(line) for line in self._content(response).splitlines()]
+        assert [row['book_id'] for row in rows] == [self.books[1].id, self.books[2].id]
+
+    def test_invalid_bound_is_rejected(self):
+        response = self.client.get(reverse('loan-export'), {'since': 'yesterday'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_export_is_admin_only(self):
+        self.client.force_authenticate(user=User.objects.create_user(username='nosy', password='NosyStr0ngP@ss2024!'))
+        assert self.client.get(reverse('loan-export')).status_code == status.HTTP_403_FORBIDDEN
+
+    def test_command_writes_file(self, tmp_path):
+        path = tmp_path / 'loans.csv'
+        until = (timezone.now() - timezone.timedelta(days=5)).isoformat()
+        call_command('export_library', 'loans', output=str(path), until=until, chunk_size=1)
+        rows = list(csv.DictReader(path.open()))
+        assert [int(row['book_id']) for row in rows] == [self.books[0].id, self.books[1].id]
@@ -0,0 +1,77 @@
+import pytest
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework import status
+from rest_framework.test import APIClient
+from library import facets
+from library.facets import facet_counts
+from library.models import Book, BookFacetCount
+
+
+@pytest.mark.django_db
+class TestBookFacets:
+    def setup_method(self):
+        self.user = User.objects.create_user(username='faceter', password='FacetStr0ngP@ss2024!')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        Book.objects.create(title='Dune', author='Frank Herbert', genre='Sci-Fi', publication_year=1965)
+        Book.objects.create(title='Neuromancer', author='William Gibson', genre='Sci-Fi', publication_year=1984)
+        Book.objects.create(title='Emma', author='Jane Austen', genre='Romance', publication_year=1815)
+        Book.objects.create(
+            title='Persuasion', author='Jane Austen', genre='Romance', publication_year=1817, is_available=False
+        )
+
+    def _titles(self, **params):
+        response = self.client.get(reverse('book-list'), params)
+        assert response.status_code == status.HTTP_200_OK
+        return sorted(book['title'] for book in response.data['results'])
+
+    def test_list_filters(self):
+        assert self._titles(genre='Sci-Fi') == ['Dune', 'Neuromancer']
+        assert self._titles(author='Jane Austen', is_available='false') == ['Persuasion']
+        assert self._titles(year_min=1900, year_max=1970) == ['Dune']
+
+    def test_invalid_filter_is_rejected(self):
+        response = self.client.get(reverse('book-list'), {'year_min': 2000, 'year_max': 1900})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_facets_for_current_filter(self):
+        response = self.client.get(reverse('book-facets'), {'genre': 'Romance'})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {
+            'count': 2,
+            'genre': [{'value': 'Romance', 'count': 2}],
+            'decade': [{'value': 1810, 'count': 2}],
+            'is_available': [{'value': True, 'count': 1}, {'value': False, 'count': 1}],
+        }
+
+    def test_facet_table_follows_writes(self):
+        book = Book.objects.get(title='Dune')
+        book.genre = 'Classic'
+        book.save()
+        Book.objects.filter(title='Neuromancer').update(is_available=False)
+        Book.objects.filter(title='Emma').delete()
+
+        stored = {
+            (row.genre, row.decade, row.is_available): row.count
+            for row in BookFacetCount.objects.filter(count__gt=0)
+        }
+        assert stored == {
+            ('Classic', 1960, True): 1,
+            ('Sci-Fi', 1980, False): 1,
+            ('Romance', 1810, False): 1,
+        }
+
+    @pytest.mark.parametrize('filters', [
+        {},
+        {'genre': 'Sci-Fi'},
+        {'is_available': True},
+        {'year_min': 1900, 'year_max': 1989},
+        {'year_min': 1816},
+        {'author': 'Jane Austen'},
+    ])
+    def test_facet_table_agrees_with_group_by(self, monkeypatch, filters):
+        from_table = facet_counts(filters)
+        monkeypatch.setattr(facets, '_covered_by_facet_table', lambda filters: False)
+        assert from_table == facet_counts(filters)
+        assert from_table['count'] == facets.filter_books(Book.objects.all(), filters).count()
@@ -0,0 +1,100 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from library import api_benchmark
+from library.models import Book, Loan, Reader
+from library.serializers import BookSerializer, LoanSerializer, ReaderSerializer
+
+
+@pytest.mark.django_db
+class TestSparseFieldsets:
+    def setup_method(self):
+        self.user = User.objects.create_user(username='fields', password='FieldsStr0ngP@ss2024!', is_staff=True)
+        self.reader = Reader.objects.create(user=self.user, address='Test Address', phone='1234567890')
+        self.books = [
+            Book.objects.create(title=f'Book {i}', author='Author', genre='Test', publication_year=2024)
+            for i in range(3)
+        ]
+        # update() skips the thumbnail signal; only URLs are rendered.
+        Book.objects.filter(pk=self.books[0].pk).update(cover_image='book_covers/cover.jpg')
+        Reader.objects.filter(pk=self.reader.pk).update(profile_picture='profile_pictures/me.jpg')
+        Loan.objects.create(reader=self.reader, book=self.books[1], return_date=timezone.now() + timedelta(days=14))
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _expected(self, serializer_class, queryset, path):
+        request = Request(APIRequestFactory().get(path))
+        return serializer_class(queryset, many=True, context={'request': request}).data
+
+    def test_row_lists_match_instance_serialization(self):
+        for route, serializer_class, queryset in (
+            ('book-list', BookSerializer, Book.objects.order_by('created_at', 'id')),
+            ('reader-list', ReaderSerializer, Reader.objects.select_related('user').order_by('created_at', 'id')),
+            ('loan-list', LoanSerializer, Loan.objects.order_by('loan_date', 'id')),
+        ):
+            response = self.client.get(reverse(route))
+            assert response.status_code == status.HTTP_200_OK
+            expected = self._expected(serializer_class, queryset, reverse(route))
+            assert response.json()['results'] == [dict(item) for item in expected]
+
+        book = self.client.get(reverse('book-list')).json()['results'][0]
+        assert book['cover_image'] == 'http://testserver/media/book_covers/cover.jpg'
+        assert book['cover_image_variants']['thumbnail'].startswith('http://testserver/media/')
+
+    def test_fields_trim_response_and_sql(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('book-list'), {'fields': 'id,title'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [set(book) for book in response.json()['results']] == [{'id', 'title'}] * 3
+        page_sql = [query['sql'] for query in queries if 'LIMIT' in query['sql']]
+        assert page_sql and '"author"' not in page_sql[0] and '"cover_image"' not in page_sql[0]
+
+    def test_exclude_drops_fields(self):
+        response = self.client.get(reverse('reader-list'), {'exclude': 'user,profile_picture_variants'})
+
+        assert response.status_code == status.HTTP_200_OK
+        reader = response.json()['results'][0]
+        assert 'user' not in reader and 'profile_picture_variants' not in reader
+        assert reader['phone'] == '1234567890'
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(reverse('book-list'), {'fields': 'id,colour'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['fields'] == 'Unknown field(s): colour'
+
+    def test_retrieve_defers_unused_columns(self):
+        url = reverse('book-detail', args=[self.books[0].pk])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'title'})
+
+        assert response.json() == {'title': 'Book 0'}
+        assert not any('"author"' in query['sql'] for query in queries)
+        # Conditional requests still work on the narrowed row.
+        again = self.client.get(url, {'fields': 'title'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert again.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_writes_ignore_fields(self):
+        response = self.client.patch(
+            reverse('book-detail', args=[self.books[2].pk]) + '?fields=id',
+            {'title': 'Renamed'}, format='multipart'
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['title'] == 'Renamed'
+
+    def test_serializer_cost_benchmark(self):
+        results = api_benchmark.serializer_costs(rows=10, repeat=1)
+
+        assert set(results) == {'books', 'readers', 'loans'}
+        assert results['books']['rows'] == 3
+        assert results['loans']['row_us'] > 0
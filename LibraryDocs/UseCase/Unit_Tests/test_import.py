@@ -0,0 +1,86 @@
+import json
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework import status
+from rest_framework.test import APIClient
+from library.importers import clean_row
+from library.models import Book
+
+
+CSV_CATALOG = (
+    'title,author,genre,publication_year\n'
+    'Dune,Frank Herbert,Sci-Fi,1965\n'
+    'Emma,Jane Austen,Romance,1815\n'
+    'Broken Row,,Romance,not-a-year\n'
+    'Dune,Frank Herbert,Classic,1965\n'
+)
+
+
+@pytest.mark.django_db
+class TestBookImport:
+    def setup_method(self):
+        self.admin_user = User.objects.create_superuser(
+            username='importer',
+            email='importer@library.com',
+            password='ImportStr0ngP@ss2024!'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin_user)
+
+    def test_command_imports_csv_in_batches(self, tmp_path):
+        path = tmp_path / 'catalog.csv'
+        path.write_text(CSV_CATALOG)
+        call_command('import_books', str(path), batch_size=1)
+        assert Book.objects.count() == 2
+        assert Book.objects.get(title='Dune').genre == 'Classic'
+
+    def test_endpoint_upserts_jsonl_and_reports_errors(self):
+        Book.objects.create(title='Emma', author='Jane Austen', genre='Unknown', publication_year=1815)
+        lines = [
+            json.dumps({'title': 'Emma', 'author': 'Jane Austen', 'genre': 'Romance', 'publication_year': 1815}),
+            json.dumps({'title': 'Dune', 'author': 'Frank Herbert', 'genre': 'Sci-Fi', 'publication_year': '1965'}),
+            '{not json',
+            json.dumps({'title': 'No Year', 'author': 'Someone', 'genre': 'Drama'}),
+        ]
+        upload = SimpleUploadedFile('catalog.jsonl', '\n'.join(lines).encode())
+        response = self.client.post(reverse('book-bulk'), {'file': upload}, format='multipart')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['imported'] == 2
+        assert response.data['failed'] == 2
+        assert [error['line'] for error in response.data['errors']] == [3, 4]
+        assert 'publication_year' in response.data['errors'][1]['errors']
+        assert Book.objects.count() == 2
+        assert Book.objects.get(title='Emma').genre == 'Romance'
+
+    def test_publication_year_must_be_an_integer(self):
+        row = {'title': 'Dune', 'author': 'Frank Herbert', 'genre': 'Sci-Fi'}
+        assert clean_row({**row, 'publication_year': ' 1965 '}).publication_year == 1965
+        assert clean_row({**row, 'publication_year': 1965}).publication_year == 1965
+        for year in (1965.7, 1965.0, True, '1965.7', '', None, [1965]):
+            with pytest.raises(ValueError):
+                clean_row({**row, 'publication_year': year})
+
+    def test_encoding_error_reports_partial_import(self):
+        rows = ''.join(f'Book {i},Author,Genre,2000\n' for i in range(500))
+        content = ('title,author,genre,publication_year\n' + rows).encode() + b'Bad \xff,Author,Genre,2000\n'
+        upload = SimpleUploadedFile('catalog.csv', content)
+        response = self.client.post(reverse('book-bulk'), {'file': upload, 'batch_size': 50}, format='multipart')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['error'].startswith('The file must be UTF-8 encoded')
+        assert response.data['imported'] > 0
+        assert response.data['failed'] == 0
+        assert Book.objects.count() == response.data['imported']
+
+    def test_endpoint_is_admin_only(self):
+        user = User.objects.create_user(username='reader', password='ReaderStr0ngP@ss2024!')
+        self.client.force_authenticate(user=user)
+        upload = SimpleUploadedFile('catalog.csv', CSV_CATALOG.encode())
+        response = self.client.post(reverse('book-bulk'), {'file': upload}, format='multipart')
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert Book.objects.count() == 0
@@ -0,0 +1,142 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from rest_framework import status
+from rest_framework.test import APIClient
+from library.models import Book, Loan, Reader
+
+
+@pytest.mark.django_db
+class TestMultiCopyInventory:
+    def setup_method(self):
+        self.book = Book.objects.create(
+            title='Bestseller', author='Author', genre='Test', publication_year=2024,
+            total_copies=3, available_copies=3
+        )
+        self.clients = []
+        for i in range(4):
+            user = User.objects.create_user(username=f'reader{i}', password='ReaderStr0ngP@ss2024!', is_staff=i == 0)
+            Reader.objects.create(user=user, address='Test Address', phone='1234567890')
+            client = APIClient()
+            client.force_authenticate(user=user)
+            self.clients.append(client)
+
+    def _checkout(self, client, book=None):
+        return client.post(reverse('loan-list'), {'book': (book or self.book).pk}, format='json')
+
+    def _counters(self):
+        self.book.refresh_from_db()
+        return self.book.available_copies, self.book.is_available
+
+    def test_copies_are_lent_until_none_is_left(self):
+        for client in self.clients[:3]:
+            assert self._checkout(client).status_code == status.HTTP_201_CREATED
+        assert self._counters() == (0, False)
+
+        response = self._checkout(self.clients[3])
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['error'] == 'Book is not available for loan'
+
+        loan = Loan.objects.filter(book=self.book).first()
+        client = self.clients[int(loan.reader.user.username[-1])]
+        assert client.post(reverse('loan-return-book', args=[loan.pk])).status_code == status.HTTP_200_OK
+        assert self._counters() == (1, True)
+        assert self.book.loan_count == 3
+
+    def test_checkout_writes_the_book_row_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            assert self._checkout(self.clients[0]).status_code == status.HTTP_201_CREATED
+
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "library_book"')]
+        assert len(updates) == 1
+        self.book.refresh_from_db()
+        assert (self.book.loan_count, self.book.available_copies) == (1, 2)
+
+    def test_batch_return_of_copies_of_one_title(self):
+        other = Book.objects.create(title='Other', author='Author', genre='Test', publication_year=2024)
+        reader = Reader.objects.get(user__username='reader0')
+        loans = Loan.objects.bulk_create([
+            Loan(book=self.book, reader=reader, return_date=timezone.now()),
+            Loan(book=self.book, reader=reader, return_date=timezone.now()),
+            Loan(book=other, reader=reader, return_date=timezone.now()),
+        ])
+        Book.objects.filter(pk=self.book.pk).update(available_copies=1)
+        Book.objects.filter(pk=other.pk).update(available_copies=0, is_available=False)
+
+        response = self.clients[0].post(
+            reverse('loan-batch-return'), {'loans': [loan.pk for loan in loans]}, format='json'
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert self._counters() == (3, True)
+        other.refresh_from_db()
+        assert (other.available_copies, other.is_available) == (1, True)
+
+    def test_serializer_exposes_and_adjusts_copies(self):
+        created = self.clients[0].post(
+            reverse('book-list'),
+            {'title': 'New', 'author': 'Author', 'genre': 'Test', 'publication_year': 2020, 'total_copies': 5}
+        )
+        assert created.status_code == status.HTTP_201_CREATED
+        assert (created.data['total_copies'], created.data['available_copies']) == (5, 5)
+
+        for client in self.clients[:2]:
+            self._checkout(client)
+        url = reverse('book-detail', args=[self.book.pk])
+        response = self.clients[0].patch(url, {'total_copies': 1}, format='multipart')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'total_copies' in response.data
+
+        response = self.clients[0].patch(url, {'total_copies': 5, 'available_copies': 99}, format='multipart')
+        assert response.status_code == status.HTTP_200_OK
+        assert (response.data['total_copies'], response.data['available_copies']) == (5, 3)
+
+    def test_deleting_an_active_loan_returns_its_copy(self):
+        self._checkout(self.clients[0])
+        Loan.objects.get().delete()
+
+        assert self._counters() == (3, True)
+
+    def test_reconcile_recomputes_counters_from_loans(self):
+        reader = Reader.objects.get(user__username='reader0')
+        Loan.objects.create(book=self.book, reader=reader, return_date=timezone.now())
+        Loan.objects.create(book=self.book, reader=reader, return_date=timezone.now(), returned=True)
+        single = Book.objects.create(title='Single', author='Author', genre='Test', publication_year=2024)
+        Loan.objects.create(book=single, reader=reader, return_date=timezone.now())
+
+        stdout = io.StringIO()
+        call_command('reconcile_inventory', chunk_size=1, stdout=stdout)
+
+        assert 'Corrected the copy counters of 2 books.' in stdout.getvalue()
+        assert self._counters() == (2, True)
+        single.refresh_from_db()
+        assert (single.available_copies, single.is_available) == (0, False)
+
+        stdout = io.StringIO()
+        call_command('reconcile_inventory', stdout=stdout)
+        assert 'of 0 books' in stdout.getvalue()
+
+    def test_admin_adjusts_copies_through_counters(self, client):
+        staff = User.objects.create_superuser(username='admin', email='admin@library.com', password='AdminStr0ngP@ss2024!')
+        client.force_login(staff)
+        self._checkout(self.clients[0])
+        url = reverse('admin:library_book_change', args=[self.book.pk])
+        form = {
+            'title': 'Bestseller', 'author': 'Author', 'genre': 'Test', 'publication_year': 2024,
+            'cover_image': '', 'total_copies': 4
+        }
+
+        assert client.post(url, form).status_code == 302
+        assert self._counters() == (3, True)
+        for reader_client in self.clients[1:3]:
+            self._checkout(reader_client)
+        response = client.post(url, {**form, 'total_copies': 2})
+        assert "Can&#x27;t withdraw copies that are on loan." in response.content.decode()
+        assert client.post(url, {**form, 'total_copies': 3}).status_code == 302
+        assert self._counters() == (0, False)
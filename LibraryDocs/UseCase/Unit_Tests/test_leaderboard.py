@@ -0,0 +1,86 @@
+import threading
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from rest_framework import status
+from rest_framework.test import APIClient
+from library import leaderboard
+from library.models import Book, Loan, Reader
+
+
+@pytest.mark.django_db
+class TestMostBorrowed:
+    def setup_method(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='ranker', password='RankerStr0ngP@ss2024!')
+        self.reader = Reader.objects.create(user=self.user, address='Test Address', phone='1234567890')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.classic = Book.objects.create(title='Classic', author='Old', genre='Drama', publication_year=1900)
+        self.trending = Book.objects.create(title='Trending', author='New', genre='Drama', publication_year=2024)
+
+    def _lend(self, book, times, days_ago=0):
+        for _ in range(times):
+            loan = Loan.objects.create(book=book, reader=self.reader, return_date=timezone.now())
+            if days_ago:
+                Loan.objects.filter(pk=loan.pk).update(loan_date=timezone.now() - timezone.timedelta(days=days_ago))
+
+    def _titles(self, window=None):
+        url = reverse('book-most-borrowed')
+        if window:
+            url += f'?window={window}'
+        response = self.client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        return [book['title'] for book in response.data]
+
+    def test_loan_count_follows_loans(self):
+        self._lend(self.classic, 2)
+        self.classic.refresh_from_db()
+        assert self.classic.loan_count == 2
+        Loan.objects.filter(book=self.classic).first().delete()
+        self.classic.refresh_from_db()
+        assert self.classic.loan_count == 1
+
+    def test_window_only_counts_recent_loans(self):
+        self._lend(self.classic, 5, days_ago=100)
+        self._lend(self.trending, 2)
+        assert self._titles() == ['Classic', 'Trending']
+        assert self._titles(window=30) == ['Trending']
+        assert self._titles(window=365) == ['Classic', 'Trending']
+
+    def test_cached_window_is_patched_by_new_loans(self, django_capture_on_commit_callbacks):
+        self._lend(self.trending, 2)
+        assert self._titles(window=7) == ['Trending']
+        with django_capture_on_commit_callbacks(execute=True):
+            self._lend(self.classic, 3)
+        assert self._titles(window=7) == ['Classic', 'Trending']
+
+    def test_concurrent_loans_are_all_counted(self):
+        self._lend(self.trending, 1)
+        self._lend(self.classic, 1)
+        assert leaderboard.most_borrowed(7) == [self.classic, self.trending]
+
+        threads = [threading.Thread(target=leaderboard.record_loan, args=(self.trending.pk,)) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert leaderboard._cached(7) == [(self.trending.pk, 21), (self.classic.pk, 1)]
+
+    def test_unknown_window_is_rejected(self):
+        response = self.client.get(reverse('book-most-borrowed') + '?window=12')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_rebuild_command_repairs_counts(self):
+        self._lend(self.classic, 3)
+        Book.objects.update(loan_count=0)
+        call_command('rebuild_loan_counts', batch_size=1)
+        self.classic.refresh_from_db()
+        self.trending.refresh_from_db()
+        assert self.classic.loan_count == 3
+        assert self.trending.loan_count == 0
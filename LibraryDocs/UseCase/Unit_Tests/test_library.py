@@ -130,7 +130,7 @@ class TestAdminFunctionality:
         url = reverse('loan-list')
         response = self.client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 2
+        assert len(response.data['results']) == 2
 
 
 @pytest.mark.django_db
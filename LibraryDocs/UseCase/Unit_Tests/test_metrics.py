@@ -0,0 +1,78 @@
+import logging
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from library import metrics
+from library.models import Book
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    metrics.registry.reset()
+    yield
+
+
+def _sample(text, line_start):
+    for line in text.splitlines():
+        if line.startswith(line_start + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+@pytest.mark.django_db
+class TestMetrics:
+    def setup_method(self):
+        self.user = User.objects.create_user(username='metrics', password='MetricsStr0ngP@ss2024!')
+        Book.objects.create(title='Dune', author='Frank Herbert', genre='Sci-Fi', publication_year=1965)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_records_latency_status_and_sql(self, settings):
+        settings.DEBUG = True
+        self.client.get(reverse('book-list'))
+        self.client.get(reverse('book-list'))
+        self.client.get(reverse('book-detail', args=[0]))
+
+        response = self.client.get(reverse('metrics'))
+        assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+        text = response.content.decode()
+        route = 'route="book-list",method="GET"'
+        assert _sample(text, f'library_http_request_duration_seconds_count{{{route}}}') == 2
+        assert _sample(text, f'library_http_request_duration_seconds_bucket{{{route},le="+Inf"}}') == 2
+        assert _sample(text, f'library_http_responses_total{{{route},status="200"}}') == 2
+        assert _sample(text, 'library_http_responses_total{route="book-detail",method="GET",status="404"}') == 1
+        assert _sample(text, f'library_sql_queries_total{{{route}}}') >= 1
+        assert _sample(text, f'library_n_plus_one_requests_total{{{route}}}') == 0
+        assert 'route="metrics"' not in text
+        assert 'library_response_cache_events_total{event="miss"}' in text
+
+    def test_token_protects_endpoint(self, settings):
+        settings.METRICS = {'TOKEN': None}
+        assert self.client.get(reverse('metrics')).status_code == 403
+        settings.METRICS = {'TOKEN': 's3cret'}
+        assert self.client.get(reverse('metrics')).status_code == 401
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer s3cret')
+        assert response.status_code == 200
+
+    def test_repeated_statement_is_flagged_and_slow_request_logged(self, settings, caplog):
+        settings.METRICS = {'SLOW_REQUEST_SECONDS': 0, 'N_PLUS_ONE_THRESHOLD': 3}
+        recorder = metrics.QueryRecorder(keep_timings=True)
+        with connection.execute_wrapper(recorder):
+            for pk in range(4):
+                Book.objects.filter(pk=pk).first()
+        assert recorder.count == 4
+        assert len(recorder.repeated(3)) == 1
+
+        with caplog.at_level(logging.WARNING, logger='library.slow_requests'):
+            self.client.get(reverse('book-list'))
+        assert 'Slow request: GET /books/ -> 200' in caplog.text
+        assert 'library_book' in caplog.text
+
+
+class TestRender:
+    def test_escapes_label_values(self):
+        metrics.registry.record('odd"route', 'GET', 200, 0.01)
+        assert 'route="odd\\"route"' in metrics.render()
@@ -0,0 +1,51 @@
+import pytest
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.utils import timezone
+from library import triggers
+from library.models import Book, Loan
+
+
+def _migrate(target):
+    executor = MigrationExecutor(connection)
+    executor.loader.build_graph()
+    executor.migrate([target])
+    apps = executor.loader.project_state([target]).apps
+    # Unapplying rebuilds library_book on SQLite without putting its
+    # triggers back.
+    with connection.schema_editor() as schema_editor:
+        triggers.reinstall_book_triggers(apps, schema_editor)
+    return apps
+
+
+@pytest.mark.django_db(transaction=True)
+class TestNaturalKeyMigration:
+    def teardown_method(self):
+        _migrate(('library', '0011_book_copies'))
+
+    def test_duplicate_books_are_merged(self):
+        apps = _migrate(('library', '0006_bookfacetcount'))
+        OldBook = apps.get_model('library', 'Book')
+        OldLoan = apps.get_model('library', 'Loan')
+        OldReader = apps.get_model('library', 'Reader')
+        User = apps.get_model('auth', 'User')
+
+        reader = OldReader.objects.create(
+            user=User.objects.create(username='migrator'), address='Test Address', phone='1234567890'
+        )
+        fields = {'title': 'Twice', 'author': 'Author', 'genre': 'Test', 'publication_year': 2001}
+        kept = OldBook.objects.create(**fields, is_available=False, loan_count=2)
+        loaned = OldBook.objects.create(**fields, is_available=False, loan_count=1)
+        OldBook.objects.create(**fields, is_available=True, loan_count=4, cover_image='book_covers/x/cover.png')
+        OldBook.objects.create(**{**fields, 'title': 'Once'})
+        OldLoan.objects.create(book=kept, reader=reader, return_date=timezone.now())
+        OldLoan.objects.create(book=loaned, reader=reader, return_date=timezone.now())
+
+        _migrate(('library', '0011_book_copies'))
+
+        book = Book.objects.get(title='Twice')
+        assert book.pk == kept.pk
+        assert (book.loan_count, book.is_available, book.cover_image.name) == (7, True, 'book_covers/x/cover.png')
+        assert (book.total_copies, book.available_copies) == (3, 1)
+        assert Loan.objects.filter(book=book).count() == 2
+        assert Book.objects.count() == 2
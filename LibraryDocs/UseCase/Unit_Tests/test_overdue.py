@@ -0,0 +1,76 @@
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from rest_framework import status
+from rest_framework.test import APIClient
+from library.models import Book, Loan, OverdueSweep, Reader
+from library.overdue import sweep
+
+
+@pytest.mark.django_db
+class TestOverdueSweep:
+    def setup_method(self):
+        self.now = timezone.now()
+        self.staff = User.objects.create_user(username='staff', password='StaffStr0ngP@ss2024!', is_staff=True)
+        self.readers = [
+            Reader.objects.create(user=User.objects.create(username=f'reader{i}'), address='Test Address', phone='1')
+            for i in range(2)
+        ]
+        self.loans = []
+        for i, days in enumerate([1, 3, 3, 10, 0]):
+            book = Book.objects.create(title=f'Book {i}', author='Author', genre='Test', publication_year=2024)
+            self.loans.append(Loan.objects.create(
+                book=book,
+                reader=self.readers[i % 2],
+                return_date=self.now - timezone.timedelta(days=days, hours=1) if days else self.now + timezone.timedelta(days=1)
+            ))
+        returned = Book.objects.create(title='Returned', author='Author', genre='Test', publication_year=2024)
+        self.returned = Loan.objects.create(
+            book=returned,
+            reader=self.readers[0],
+            return_date=self.now - timezone.timedelta(days=30),
+            returned=True
+        )
+
+    def test_sweep_records_days_fines_and_summary(self, settings):
+        settings.LOAN_FINE_PER_DAY = '0.50'
+        result = sweep(now=self.now, chunk_size=2)
+
+        loans = {loan.pk: loan for loan in Loan.objects.all()}
+        assert [loans[loan.pk].overdue_days for loan in self.loans] == [1, 3, 3, 10, 0]
+        assert [loans[loan.pk].fine for loan in self.loans] == [
+            Decimal('0.50'), Decimal('1.50'), Decimal('1.50'), Decimal('5.00'), Decimal('0')
+        ]
+        assert loans[self.returned.pk].fine == 0
+
+        assert result.overdue_loans == 4
+        assert result.readers == 2
+        assert result.total_fine == Decimal('8.50')
+        assert result.chunks == 2
+        assert OverdueSweep.objects.count() == 1
+
+    def test_command(self):
+        call_command('sweep_overdue', chunk_size=1)
+        assert OverdueSweep.objects.get().chunks == 4
+
+    def test_staff_endpoints(self):
+        client = APIClient()
+        client.force_authenticate(user=self.readers[0].user)
+        assert client.get(reverse('loan-overdue')).status_code == status.HTTP_403_FORBIDDEN
+        assert client.post(reverse('loan-sweep-overdue')).status_code == status.HTTP_403_FORBIDDEN
+
+        client.force_authenticate(user=self.staff)
+        response = client.get(reverse('loan-overdue') + '?page_size=3')
+        assert response.status_code == status.HTTP_200_OK
+        assert [loan['id'] for loan in response.data['results']] == [
+            self.loans[3].pk, self.loans[1].pk, self.loans[2].pk
+        ]
+        assert response.data['next'] is not None
+
+        response = client.post(reverse('loan-sweep-overdue'))
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['overdue_loans'] == 4
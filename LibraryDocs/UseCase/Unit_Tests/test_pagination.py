@@ -0,0 +1,54 @@
+import pytest
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework import status
+from rest_framework.test import APIClient
+from library.models import Book
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+    def setup_method(self):
+        self.user = User.objects.create_user(
+            username='pager',
+            password='PagerStr0ngP@ss2024!'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        for i in range(5):
+            Book.objects.create(
+                title=f'Book {i}',
+                author=f'Author {i}',
+                genre='Test',
+                publication_year=2024
+            )
+
+    def _collect_titles(self, url):
+        titles = []
+        while url:
+            response = self.client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            titles.extend(book['title'] for book in response.data['results'])
+            url = response.data['next']
+        return titles
+
+    def test_pages_cover_every_book_once_in_creation_order(self):
+        url = reverse('book-list') + '?page_size=2'
+        assert self._collect_titles(url) == [f'Book {i}' for i in range(5)]
+
+    def test_insert_while_paging_does_not_shift_pages(self):
+        first = self.client.get(reverse('book-list') + '?page_size=2')
+        assert [b['title'] for b in first.data['results']] == ['Book 0', 'Book 1']
+        Book.objects.create(
+            title='Late Arrival',
+            author='Someone',
+            genre='Test',
+            publication_year=2024
+        )
+        titles = self._collect_titles(first.data['next'])
+        assert titles == ['Book 2', 'Book 3', 'Book 4', 'Late Arrival']
+
+    def test_page_size_is_capped(self):
+        response = self.client.get(reverse('book-list') + '?page_size=100000')
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == 5
@@ -0,0 +1,80 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from library.models import Book, Loan, Reader
+
+
+# Maximum number of queries each endpoint may issue, whatever the number of
+# rows it returns. Raising a budget should be a deliberate, reviewed change.
+API_QUERY_BUDGETS = [
+    ('book-list', 2),
+    ('book-most-borrowed', 1),
+    ('reader-list', 2),
+    ('loan-list', 1),
+    ('loan-pending', 1),
+    ('user_profile', 1),
+]
+
+# Includes the estimated-count and date-hierarchy lookups, which are index
+# probes rather than table scans.
+ADMIN_QUERY_BUDGETS = [
+    ('admin:library_book_changelist', 9),
+    ('admin:library_reader_changelist', 7),
+    ('admin:library_loan_changelist', 7),
+    ('admin:auth_user_changelist', 6),
+]
+
+
+@pytest.mark.django_db
+class TestQueryBudgets:
+    def setup_method(self):
+        self.user = User.objects.create_superuser(
+            username='budget',
+            email='budget@library.com',
+            password='BudgetStr0ngP@ss2024!'
+        )
+        self.reader = Reader.objects.create(user=self.user, address='Test Address', phone='1234567890')
+        self.seeded = 0
+
+    def _seed(self, count):
+        """Add `count` books, readers and (overdue) loans on top of what exists."""
+        now = timezone.now()
+        for i in range(self.seeded, self.seeded + count):
+            book = Book.objects.create(title=f'Book {i}', author='Author', genre='Test', publication_year=2024)
+            reader = Reader.objects.create(
+                user=User.objects.create(username=f'reader{i}'),
+                address='Test Address',
+                phone='1234567890'
+            )
+            Loan.objects.create(book=book, reader=reader, return_date=now - timezone.timedelta(days=1))
+            Loan.objects.create(book=book, reader=self.reader, return_date=now - timezone.timedelta(days=1))
+        self.seeded += count
+
+    def _count_queries(self, client, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        assert response.status_code == 200
+        return len(queries)
+
+    def _assert_budget(self, client, url, budget):
+        self._seed(2)
+        small = self._count_queries(client, url)
+        self._seed(10)
+        large = self._count_queries(client, url)
+        assert large == small, f'{url} issued {small} queries for 2 rows but {large} for 12'
+        assert large <= budget, f'{url} issued {large} queries, budget is {budget}'
+
+    @pytest.mark.parametrize('url_name, budget', API_QUERY_BUDGETS)
+    def test_api_endpoint_budget(self, url_name, budget):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        self._assert_budget(client, reverse(url_name), budget)
+
+    @pytest.mark.parametrize('url_name, budget', ADMIN_QUERY_BUDGETS)
+    def test_admin_changelist_budget(self, client, url_name, budget):
+        client.force_login(self.user)
+        self._assert_budget(client, reverse(url_name), budget)
@@ -0,0 +1,79 @@
+import pytest
+from django.db import connection
+from django.utils import timezone
+from django.contrib.auth.models import User
+from library.models import Book, Loan, Reader
+from library.overdue import overdue_loans
+
+
+def _query_plan(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        return ' | '.join(row[-1] for row in cursor.fetchall())
+
+
+@pytest.mark.django_db
+class TestLookupQueryPlans:
+    BOOKS = 2000
+    READERS = 200
+    LOANS = 20000
+
+    def setup_method(self):
+        now = timezone.now()
+        self.books = Book.objects.bulk_create([
+            Book(
+                title=f'Book {i}',
+                author=f'Author {i % 300}',
+                genre=f'Genre {i % 20}',
+                publication_year=1900 + i % 120,
+                is_available=i % 10 != 0
+            ) for i in range(self.BOOKS)
+        ])
+        users = User.objects.bulk_create([User(username=f'reader{i}') for i in range(self.READERS)])
+        self.readers = Reader.objects.bulk_create([
+            Reader(user=user, address='Test Address', phone='1234567890') for user in users
+        ])
+        Loan.objects.bulk_create([
+            Loan(
+                book=self.books[i % self.BOOKS],
+                reader=self.readers[i % self.READERS],
+                return_date=now + timezone.timedelta(days=i % 30 - 15),
+                returned=i % 20 != 0
+            ) for i in range(self.LOANS)
+        ])
+
+    def test_active_loan_count_uses_active_reader_index(self):
+        queryset = Loan.objects.filter(reader=self.readers[0], returned=False)
+        assert 'USING INDEX loan_active_reader_idx' in _query_plan(queryset)
+
+    def test_pending_loans_use_active_reader_index(self):
+        queryset = Loan.objects.filter(
+            reader=self.readers[0],
+            returned=False,
+            return_date__lt=timezone.now()
+        )
+        assert 'USING INDEX loan_active_reader_idx' in _query_plan(queryset)
+
+    def test_book_availability_uses_active_book_index(self):
+        queryset = self.books[0].loan_set.filter(returned=False)
+        assert 'USING INDEX loan_active_book_idx' in _query_plan(queryset)
+
+    @pytest.mark.parametrize('lookup, index', [
+        ({'genre': 'Genre 1'}, 'book_genre_idx'),
+        ({'publication_year': 1950}, 'book_pub_year_idx'),
+        ({'is_available': False}, 'book_unavailable_idx'),
+    ])
+    def test_admin_book_filters_use_index(self, lookup, index):
+        assert f'USING INDEX {index}' in _query_plan(Book.objects.filter(**lookup))
+
+    def test_admin_date_hierarchy_uses_loan_date_index(self):
+        now = timezone.now()
+        queryset = Loan.objects.filter(loan_date__gte=now - timezone.timedelta(days=30), loan_date__lt=now)
+        assert 'USING INDEX loan_date_id_idx' in _query_plan(queryset)
+
+    def test_overdue_sweep_scans_overdue_index(self):
+        queryset = overdue_loans().order_by('return_date', 'id').values_list('return_date', 'id')[:500]
+        plan = _query_plan(queryset)
+        assert 'USING INDEX loan_overdue_idx' in plan
+        assert 'TEMP B-TREE' not in plan
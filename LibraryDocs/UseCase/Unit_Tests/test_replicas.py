@@ -0,0 +1,107 @@
+import pytest
+from django.db import connections
+from django.db.utils import load_backend
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework import status
+from rest_framework.test import APIClient
+from library import routers
+from library.models import Book, Reader
+
+
+@pytest.fixture
+def replica(tmp_path, settings):
+    """A second SQLite file registered as the only replica."""
+    alias = 'replica_test'
+    config = {**connections['default'].settings_dict, 'NAME': str(tmp_path / 'replica.sqlite3')}
+    # Created directly rather than through settings.DATABASES, which the
+    # test case has already read its allowed aliases from.
+    connections[alias] = load_backend(config['ENGINE']).DatabaseWrapper(config, alias)
+    settings.DATABASE_REPLICAS = [alias]
+    routers.reset_health()
+    yield alias
+    connections[alias].close()
+    del connections[alias]
+    routers.reset_health()
+
+
+def _client(username):
+    user = User.objects.create_user(username=username, password='ReplicaStr0ngP@ss2024!')
+    Reader.objects.create(user=user, address='Test Address', phone='1234567890')
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def _titles(response):
+    return [book['title'] for book in response.data['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestReplicaRouting:
+    def setup_method(self):
+        self.book = Book.objects.create(title='Replicated', author='Author', genre='Test', publication_year=2024)
+
+    def test_safe_requests_read_from_replica(self, replica):
+        client = _client('reader')
+        routers.copy_sqlite('default', replica)
+        Book.objects.create(title='Primary Only', author='Author', genre='Test', publication_year=2024)
+
+        assert client.get(reverse('book-search') + '?q=primary').data['count'] == 0
+        assert client.get(reverse('loan-list')).status_code == status.HTTP_200_OK
+        # Views without the mixin keep reading from the primary.
+        assert client.get(reverse('user_profile')).status_code == status.HTTP_200_OK
+
+    def test_writer_is_pinned_to_primary(self, replica):
+        writer, other = _client('writer'), _client('other')
+        routers.copy_sqlite('default', replica)
+
+        response = writer.post(reverse('loan-list'), {'book': self.book.id}, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+
+        assert len(writer.get(reverse('loan-list')).data['results']) == 1
+        assert len(other.get(reverse('loan-list')).data['results']) == 0
+
+    def test_response_cache_is_filled_from_primary(self, replica):
+        writer, other = _client('writer'), _client('other')
+        routers.copy_sqlite('default', replica)
+
+        response = writer.post(
+            reverse('book-list'),
+            {'title': 'Fresh', 'author': 'Author', 'genre': 'Test', 'publication_year': 2024}
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+        # The replica hasn't caught up yet, but misses are built on the primary.
+        first = other.get(reverse('book-list'))
+        second = other.get(reverse('book-list'))
+        assert (first['X-Cache'], second['X-Cache']) == ('MISS', 'HIT')
+        assert sorted(_titles(second)) == ['Fresh', 'Replicated']
+        ranking = [other.get(reverse('book-most-borrowed'))['X-Cache'] for _ in range(2)]
+        assert ranking == ['MISS', 'HIT']
+
+        # The pinned writer bypasses the cache and sees its own write.
+        own = writer.get(reverse('book-list'))
+        assert sorted(_titles(own)) == ['Fresh', 'Replicated']
+        assert 'X-Cache' not in own
+        assert 'X-Cache' not in writer.get(reverse('book-most-borrowed'))
+
+        # Reads outside the cache still go to the replica.
+        assert other.get(reverse('book-search') + '?q=fresh').data['count'] == 0
+
+    def test_unhealthy_replica_falls_back_to_primary(self, replica, tmp_path):
+        connections[replica].settings_dict['NAME'] = str(tmp_path / 'missing' / 'replica.sqlite3')
+        client = _client('reader')
+
+        assert _titles(client.get(reverse('book-search') + '?q=replicated')) == ['Replicated']
+        assert not routers.is_healthy(replica)
+
+    def test_round_robin_and_migrations(self, settings):
+        settings.DATABASE_REPLICAS = ['default', 'default']
+        router = routers.ReplicaRouter()
+        assert router.db_for_write(Book) == 'default'
+        assert router.db_for_read(Book) == 'default'
+        assert not router.allow_migrate('default', 'library')
+        settings.DATABASE_REPLICAS = ['replica1']
+        assert router.allow_migrate('default', 'library')
+        assert not router.allow_migrate('replica1', 'library')
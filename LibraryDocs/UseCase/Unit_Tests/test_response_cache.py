@@ -0,0 +1,100 @@
+import threading
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+from library import response_cache
+from library.models import Book, Loan, Reader
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+    def setup_method(self):
+        self.user = User.objects.create_user(username='reader', password='ReaderStr0ngP@ss2024!')
+        self.reader = Reader.objects.create(user=self.user, address='Test Address', phone='1234567890')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.book = Book.objects.create(title='Cached', author='Author', genre='Test', publication_year=2024)
+
+    def _get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        assert response.status_code == 200
+        return response, len(queries)
+
+    def test_hit_serves_without_queries(self):
+        url = reverse('book-detail', kwargs={'pk': self.book.id})
+        first, _ = self._get(url)
+        second, queries = self._get(url)
+        assert (first['X-Cache'], second['X-Cache']) == ('MISS', 'HIT')
+        assert queries == 0
+        assert second.data == first.data
+        assert second['ETag'] == first['ETag']
+
+    def test_query_params_are_part_of_the_key(self):
+        self._get(reverse('book-list'))
+        response, _ = self._get(reverse('book-list') + '?genre=Other')
+        assert response['X-Cache'] == 'MISS'
+        assert response.data['results'] == []
+
+    def test_book_write_invalidates_detail_and_lists(self):
+        detail = reverse('book-detail', kwargs={'pk': self.book.id})
+        other = Book.objects.create(title='Other', author='Author', genre='Test', publication_year=2024)
+        other_detail = reverse('book-detail', kwargs={'pk': other.id})
+        for url in (detail, other_detail, reverse('book-list')):
+            self._get(url)
+
+        self.book.title = 'Renamed'
+        self.book.save()
+
+        response, _ = self._get(detail)
+        assert (response['X-Cache'], response.data['title']) == ('MISS', 'Renamed')
+        response, _ = self._get(reverse('book-list'))
+        assert response['X-Cache'] == 'MISS'
+        response, _ = self._get(other_detail)
+        assert response['X-Cache'] == 'HIT'
+
+    def test_checkout_and_return_invalidate_book(self):
+        detail = reverse('book-detail', kwargs={'pk': self.book.id})
+        self._get(detail)
+        self._get(reverse('book-most-borrowed'))
+
+        self.client.post(reverse('loan-list'), {'book': self.book.id}, format='json')
+        response, _ = self._get(detail)
+        assert response.data['is_available'] is False
+        response, _ = self._get(reverse('book-most-borrowed'))
+        assert response['X-Cache'] == 'MISS'
+        assert response.data[0]['loan_count'] == 1
+
+        loan = Loan.objects.get(book=self.book)
+        self.client.post(reverse('loan-return-book', kwargs={'pk': loan.id}))
+        response, _ = self._get(detail)
+        assert response.data['is_available'] is True
+
+    def test_stampede_guard_builds_once(self, rf):
+        builds = []
+
+        def build():
+            builds.append(1)
+            time.sleep(0.2)
+            return Response({'value': 42})
+
+        request = rf.get('/books/hot/')
+        responses = []
+        threads = [
+            threading.Thread(target=lambda: responses.append(response_cache.serve(request, ['book-lists'], build)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(builds) == 1
+        assert [response.data for response in responses] == [{'value': 42}] * 5
+        assert response_cache.stats()['wait_hit'] >= 4
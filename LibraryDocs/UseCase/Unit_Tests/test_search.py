@@ -0,0 +1,60 @@
+import pytest
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework import status
+from rest_framework.test import APIClient
+from library.models import Book
+
+
+@pytest.mark.django_db
+class TestBookSearch:
+    def setup_method(self):
+        self.user = User.objects.create_user(username='searcher', password='SearchStr0ngP@ss2024!')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        Book.objects.create(title='The Hobbit', author='J. R. R. Tolkien', genre='Fantasy', publication_year=1937)
+        Book.objects.create(title='Dune', author='Frank Herbert', genre='Science Fiction', publication_year=1965)
+        Book.objects.create(title='Fantasy Atlas', author='Someone Else', genre='Reference', publication_year=2001)
+        Book.objects.create(title='Dom Casmurro', author='Machado de Assis', genre='Romance', publication_year=1899)
+
+    def _search(self, query, **params):
+        response = self.client.get(reverse('book-search'), {'q': query, **params})
+        assert response.status_code == status.HTTP_200_OK
+        return response
+
+    def _titles(self, query):
+        return [book['title'] for book in self._search(query).data['results']]
+
+    def test_matches_title_author_and_genre(self):
+        assert self._titles('hobbit') == ['The Hobbit']
+        assert self._titles('herbert') == ['Dune']
+        assert self._titles('science fiction') == ['Dune']
+
+    def test_matches_word_prefixes(self):
+        assert self._titles('tolk') == ['The Hobbit']
+
+    def test_title_hits_rank_above_genre_hits(self):
+        assert self._titles('fantasy') == ['Fantasy Atlas', 'The Hobbit']
+
+    def test_operators_in_query_are_treated_as_text(self):
+        assert self._titles('"dune*) -(') == ['Dune']
+
+    def test_index_follows_updates_and_deletes(self):
+        book = Book.objects.get(title='Dune')
+        book.title = 'Children of Dune'
+        book.save()
+        assert self._titles('children') == ['Children of Dune']
+        book.delete()
+        assert self._titles('dune') == []
+
+    def test_results_are_paginated(self):
+        for i in range(5):
+            Book.objects.create(title=f'Saga part {i}', author='Author', genre='Epic', publication_year=2000)
+        response = self._search('saga', page_size=2)
+        assert response.data['count'] == 5
+        assert len(response.data['results']) == 2
+        assert response.data['next'] is not None
+
+    def test_query_is_required(self):
+        response = self.client.get(reverse('book-search'))
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
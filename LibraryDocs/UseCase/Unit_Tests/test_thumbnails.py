@@ -0,0 +1,96 @@
+import io
+import os
+
+import pytest
+from PIL import Image
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework import status
+from rest_framework.test import APIClient
+from library import thumbnails
+from library.models import Book, Reader
+
+
+def _png(size=(800, 1200), format='PNG'):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, 'navy').save(buffer, format)
+    return buffer.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.THUMBNAILS_ASYNC = False
+    return tmp_path
+
+
+@pytest.mark.django_db(transaction=True)
+class TestImageVariants:
+    def setup_method(self):
+        self.user = User.objects.create_superuser(
+            username='librarian',
+            email='librarian@library.com',
+            password='LibrarianStr0ngP@ss2024!'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_uploaded_cover_gets_variants(self, media_root):
+        book = Book.objects.create(title='Covered', author='Author', genre='Test', publication_year=2024)
+        response = self.client.patch(
+            reverse('book-detail', kwargs={'pk': book.id}),
+            {'cover_image': SimpleUploadedFile('cover.png', _png(), content_type='image/png')},
+            format='multipart'
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        variants = response.data['cover_image_variants']
+        assert variants['thumbnail'].endswith(f'/media/book_covers/{book.id}/cover.thumb.jpg')
+        with Image.open(media_root / f'book_covers/{book.id}/cover.thumb.jpg') as thumbnail:
+            assert thumbnail.size == (200, 300)
+        with Image.open(media_root / f'book_covers/{book.id}/cover.full.webp') as webp:
+            assert webp.format == 'WEBP'
+            assert webp.size == (800, 1200)
+
+    def test_webp_cover_is_kept(self, media_root):
+        book = Book.objects.create(title='WebP', author='Author', genre='Test', publication_year=2024)
+        original = _png(format='WEBP')
+        response = self.client.patch(
+            reverse('book-detail', kwargs={'pk': book.id}),
+            {'cover_image': SimpleUploadedFile('cover.webp', original, content_type='image/webp')},
+            format='multipart'
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        book.refresh_from_db()
+        assert book.cover_image.name == f'book_covers/{book.id}/cover.webp'
+        assert (media_root / book.cover_image.name).read_bytes() == original
+        assert response.data['cover_image_variants']['webp'].endswith(f'/media/book_covers/{book.id}/cover.full.webp')
+        with Image.open(media_root / f'book_covers/{book.id}/cover.full.webp') as webp:
+            assert webp.size == (800, 1200)
+
+    def test_variant_never_replaces_original(self):
+        with pytest.raises(ValueError):
+            thumbnails._store(default_storage, 'covers/a.webp', 'covers/a.webp', Image.new('RGB', (1, 1)), 'WEBP')
+
+    def test_book_without_cover_has_no_variants(self):
+        book = Book.objects.create(title='Plain', author='Author', genre='Test', publication_year=2024)
+        response = self.client.get(reverse('book-detail', kwargs={'pk': book.id}))
+        assert response.data['cover_image_variants'] is None
+
+    def test_backfill_command(self, media_root):
+        reader = Reader.objects.create(user=self.user, address='Test Address', phone='1234567890')
+        name = default_storage.save(f'profile_pictures/user_{self.user.id}/me.png', ContentFile(_png((300, 300))))
+        Reader.objects.filter(pk=reader.pk).update(profile_picture=name)
+
+        call_command('generate_thumbnails')
+        with Image.open(media_root / f'profile_pictures/user_{self.user.id}/me.thumb.webp') as thumbnail:
+            assert thumbnail.size == (128, 128)
+
+        modified = os.path.getmtime(media_root / f'profile_pictures/user_{self.user.id}/me.full.webp')
+        call_command('generate_thumbnails')
+        assert os.path.getmtime(media_root / f'profile_pictures/user_{self.user.id}/me.full.webp') == modified
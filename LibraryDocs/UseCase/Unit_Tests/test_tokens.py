@@ -0,0 +1,136 @@
+import time
+
+import pytest
+from datetime import timedelta
+from django.core.management import call_command
+from django.core.signals import request_started
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from library import signals
+from library.blacklist import BloomFilter, blacklist
+
+
+class TestBloomFilter:
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(1000)
+        values = [f'jti-{i}' for i in range(1000)]
+        for value in values:
+            bloom.add(value)
+        assert all(value in bloom for value in values)
+
+    def test_false_positive_rate_is_low(self):
+        bloom = BloomFilter(1000)
+        for i in range(1000):
+            bloom.add(f'jti-{i}')
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        assert false_positives < 300
+
+
+@pytest.mark.django_db
+class TestTokenBlacklist:
+    def setup_method(self):
+        self.user = User.objects.create_user(username='tokenuser', password='TokenUserStr0ngP@ss2024!')
+        self.client = APIClient()
+        response = self.client.post(
+            reverse('token_obtain_pair'),
+            {'username': 'tokenuser', 'password': 'TokenUserStr0ngP@ss2024!'},
+            format='json'
+        )
+        self.refresh = response.data['refresh']
+        self.jti = RefreshToken(self.refresh)['jti']
+
+    def _refresh(self, token):
+        return self.client.post(reverse('token_refresh'), {'refresh': token}, format='json')
+
+    def test_known_token_skips_blacklist_query(self):
+        signals.warm_token_blacklist(sender=None)
+        # Issued before the filter was synced, so the filter has seen it.
+        issued_at = int(time.time()) - 60
+        with CaptureQueriesContext(connection) as queries:
+            assert blacklist.is_blacklisted(self.jti, issued_at) is False
+        assert len(queries) == 0
+
+    def test_token_issued_after_sync_is_checked_in_database(self, settings):
+        settings.TOKEN_BLACKLIST_SYNC_INTERVAL = 3600
+        blacklist.warm()
+        token = RefreshToken.for_user(self.user)
+        # Blacklisted by another process that hasn't announced it yet.
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=token['jti']))
+
+        assert blacklist.is_blacklisted(token['jti'], token['iat']) is True
+        assert blacklist.is_blacklisted(token['jti']) is True
+
+    def test_late_commit_with_lower_id_is_picked_up(self, settings):
+        settings.TOKEN_BLACKLIST_SYNC_INTERVAL = 0
+        reserved = BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=self.jti))
+        other = RefreshToken.for_user(self.user)
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=other['jti']))
+        reserved_id = reserved.pk
+        reserved.delete()
+        issued_at = int(time.time()) - 60
+        assert blacklist.is_blacklisted(other['jti'], issued_at) is True
+
+        # A transaction that took its id earlier commits after the sync.
+        BlacklistedToken.objects.create(id=reserved_id, token=OutstandingToken.objects.get(jti=self.jti))
+
+        assert blacklist.is_blacklisted(self.jti, issued_at) is True
+
+    def test_first_request_warms_the_filter(self):
+        request_started.connect(signals.warm_token_blacklist, dispatch_uid='library.warm_token_blacklist')
+        self.client.get(reverse('book-list'))
+
+        with CaptureQueriesContext(connection) as queries:
+            assert blacklist.is_blacklisted(self.jti, int(time.time()) - 60) is False
+        assert len(queries) == 0
+
+    def test_rotated_token_is_rejected(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            response = self._refresh(self.refresh)
+        assert response.status_code == status.HTTP_200_OK
+        assert BlacklistedToken.objects.filter(token__jti=self.jti).exists()
+
+        response = self._refresh(self.refresh)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        response = self.client.post(reverse('token_verify'), {'token': self.refresh}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_logout_is_seen_by_warmed_filter(self, django_capture_on_commit_callbacks):
+        blacklist.is_blacklisted('warm-up')
+        self.client.force_authenticate(self.user)
+        with django_capture_on_commit_callbacks(execute=True):
+            response = self.client.post(reverse('logout'), {'refresh_token': self.refresh}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        self.client.force_authenticate(None)
+        assert self._refresh(self.refresh).status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_blacklist_warms_from_database(self):
+        token = OutstandingToken.objects.get(jti=self.jti)
+        BlacklistedToken.objects.create(token=token)
+        blacklist.reset()
+        assert self._refresh(self.refresh).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+class TestPruneTokens:
+    def test_deletes_expired_tokens_in_batches(self):
+        now = timezone.now()
+        for i in range(5):
+            token = OutstandingToken.objects.create(
+                jti=f'expired-{i}', token='x', expires_at=now - timedelta(days=1)
+            )
+            if i % 2:
+                BlacklistedToken.objects.create(token=token)
+        OutstandingToken.objects.create(jti='live', token='x', expires_at=now + timedelta(days=1))
+
+        call_command('prune_tokens', batch_size=2)
+
+        assert list(OutstandingToken.objects.values_list('jti', flat=True)) == ['live']
+        assert not BlacklistedToken.objects.exists()
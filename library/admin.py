@@ -1,25 +1,109 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
-from .models import Book, Reader, Loan
+from . import inventory
+from .models import Book, BookFacetCount, Reader, Loan, OverdueSweep
+from .pagination import EstimatedCountPaginator
+
+
+class GenreListFilter(admin.SimpleListFilter):
+    """Genre choices from the facet table instead of a DISTINCT over all books."""
+    title = 'genre'
+    parameter_name = 'genre'
+
+    def lookups(self, request, model_admin):
+        genres = BookFacetCount.objects.filter(count__gt=0).values_list('genre', flat=True).distinct()
+        return [(genre, genre) for genre in genres.order_by('genre')]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(genre=self.value())
+        return queryset
+
+
+class DecadeListFilter(admin.SimpleListFilter):
+    """Publication decades from the facet table; filters on book_pub_year_idx."""
+    title = 'publication decade'
+    parameter_name = 'decade'
+
+    def lookups(self, request, model_admin):
+        decades = BookFacetCount.objects.filter(count__gt=0).values_list('decade', flat=True).distinct()
+        return [(str(decade), f'{decade}s') for decade in decades.order_by('decade')]
+
+    def queryset(self, request, queryset):
+        if self.value() and self.value().lstrip('-').isdigit():
+            decade = int(self.value())
+            return queryset.filter(publication_year__range=(decade, decade + 9))
+        return queryset
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Changelist settings for tables too large to count: estimated totals and
+    no second unfiltered count for the "N total" link. The date hierarchy's
+    top-level years come from MIN/MAX (templates/admin/library/change_list.html).
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # Newest first over the primary key, also for autocomplete results.
+    ordering = ('-pk',)
+
+
+class BookAdminForm(forms.ModelForm):
+
+    class Meta:
+        model = Book
+        fields = '__all__'
+
+    def clean_total_copies(self):
+        total_copies = self.cleaned_data['total_copies']
+        withdrawn = self.instance.total_copies - total_copies
+        if self.instance.pk and withdrawn > self.instance.available_copies:
+            raise forms.ValidationError("Can't withdraw copies that are on loan.")
+        return total_copies
 
 
 @admin.register(Book)
-class BookAdmin(admin.ModelAdmin):
-    list_display = ('title', 'author', 'genre', 'publication_year', 'is_available', 'created_at', 'updated_at')
-    list_filter = ('genre', 'publication_year', 'is_available')
+class BookAdmin(LargeTableAdmin):
+    form = BookAdminForm
+    list_display = ('title', 'author', 'genre', 'publication_year', 'available_copies', 'total_copies',
+                    'created_at', 'updated_at')
+    list_filter = (GenreListFilter, DecadeListFilter, 'is_available')
     search_fields = ('title', 'author')
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('is_available', 'available_copies', 'loan_count', 'created_at', 'updated_at')
+    # Backed by book_created_id_idx.
+    date_hierarchy = 'created_at'
 
     def get_readonly_fields(self, request, obj=None):
         return self.readonly_fields
 
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.available_copies = obj.total_copies
+            return super().save_model(request, obj, form, change)
+
+        # Copy counters move through F() updates, never a full-row save.
+        fields = [name for name in form.changed_data if name != 'total_copies']
+        if 'total_copies' in form.changed_data:
+            added = obj.total_copies - form.initial['total_copies']
+            if not inventory.add_copies(obj.pk, added):
+                self.message_user(request, "Copies were checked out meanwhile; total copies unchanged.",
+                                  messages.WARNING)
+        obj.save(update_fields=[*fields, 'updated_at'])
+
 
 @admin.register(Reader)
-class ReaderAdmin(admin.ModelAdmin):
+class ReaderAdmin(LargeTableAdmin):
     list_display = ('get_username', 'phone', 'created_at', 'updated_at')
+    list_select_related = ('user',)
     search_fields = ('user__username', 'phone')
     readonly_fields = ('created_at', 'updated_at', 'user')
+    date_hierarchy = 'created_at'
+
+    def get_queryset(self, request):
+        # Readers are displayed by username, including in loan autocompletes.
+        return super().get_queryset(request).select_related('user')
 
     def get_username(self, obj):
         return obj.user.username
@@ -27,10 +111,15 @@ class ReaderAdmin(admin.ModelAdmin):
 
 
 @admin.register(Loan)
-class LoanAdmin(admin.ModelAdmin):
+class LoanAdmin(LargeTableAdmin):
     list_display = ('book_title', 'reader_username', 'loan_date', 'return_date', 'returned', 'actual_return_date')
-    list_filter = ('returned', 'loan_date', 'return_date')
+    list_filter = ('returned',)
+    list_select_related = ('book', 'reader__user')
     search_fields = ('book__title', 'reader__user__username')
+    # Loan dates are navigated by year/month/day over loan_date_id_idx;
+    # return_date has no index covering all loans.
+    date_hierarchy = 'loan_date'
+    autocomplete_fields = ('book', 'reader')
 
     def book_title(self, obj):
         return obj.book.title
@@ -41,6 +130,17 @@ class LoanAdmin(admin.ModelAdmin):
     reader_username.short_description = 'Reader'
 
 
+@admin.register(OverdueSweep)
+class OverdueSweepAdmin(admin.ModelAdmin):
+    list_display = ('started_at', 'finished_at', 'overdue_loans', 'readers', 'total_fine', 'chunks')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 class ReaderInline(admin.StackedInline):
     model = Reader
     can_delete = False
@@ -51,6 +151,9 @@ class ReaderInline(admin.StackedInline):
 class UserAdmin(BaseUserAdmin):
     inlines = (ReaderInline,)
     list_display = BaseUserAdmin.list_display + ('has_reader_profile',)
+    list_select_related = ('reader',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     def has_reader_profile(self, user):
         return hasattr(user, 'reader')
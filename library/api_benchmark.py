@@ -0,0 +1,408 @@
+"""
+In-process benchmarks of the API.
+
+Each scenario sends one request through Django's test client against the
+current database (typically filled by ``manage.py seed_library``) and is
+measured for latency, single-client throughput and the number of queries
+it runs. The whole run happens inside a transaction that is rolled back at
+the end, and every write scenario additionally runs in a savepoint rolled
+back after each request, so the dataset is left untouched and every
+iteration of a write sees the same state.
+
+Results can be saved as a JSON baseline and later runs compared against it
+to catch latency or query-count regressions.
+
+``run_writers`` separately measures concurrent checkouts and returns, which
+is what stresses the database profile (journal mode, locking, pooling).
+
+``serializer_costs`` compares the per-row cost of list serialization from
+model instances against the ``values()`` row path used by list endpoints,
+and ``render_costs`` the JSON render time and bytes on the wire of large
+lists per renderer and content coding.
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import OperationalError, connection, transaction
+from django.test import Client
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from . import compression
+from .benchmark import percentile
+from .fieldsets import serializer_columns
+from .models import Book, Loan, Reader
+from .renderers import FastJSONRenderer
+from .serializers import BookSerializer, LibraryTokenObtainPairSerializer, LoanSerializer, ReaderSerializer
+
+PASSWORD = 'BenchmarkStr0ngP@ss2024!'
+# Latency regressions smaller than this are treated as noise.
+MIN_REGRESSION_MS = 1.0
+
+
+class Scenario:
+    def __init__(self, route, method='get', kwargs=None, query='', data=None, json=True, write=False, name=None):
+        self.route = route
+        self.method = method
+        self.kwargs = kwargs or {}
+        self.query = query
+        self.data = data
+        self.json = json
+        self.write = write
+        self.name = name or (route if method == 'get' else f'{route} {method.upper()}')
+
+    def url(self):
+        url = reverse(self.route, kwargs=self.kwargs)
+        return f'{url}?{self.query}' if self.query else url
+
+    def send(self, client):
+        data = self.data() if callable(self.data) else self.data
+        options = {}
+        if data is not None and self.json:
+            options['content_type'] = 'application/json'
+        elif data is not None and self.method != 'post':
+            # The test client only encodes multipart bodies for POST.
+            data = encode_multipart(BOUNDARY, data)
+            options['content_type'] = MULTIPART_CONTENT
+        response = getattr(client, self.method)(self.url(), data, **options)
+        # Streaming responses do their work while being consumed.
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response
+
+
+def _catalog_upload():
+    rows = 'title,author,genre,publication_year\n' + ''.join(
+        f'Benchmark Import {i},Benchmark Author,Benchmark,2024\n' for i in range(10)
+    )
+    return {'file': SimpleUploadedFile('books.csv', rows.encode(), content_type='text/csv')}
+
+
+def _registration():
+    return {
+        'username': 'benchmark-register',
+        'password': PASSWORD,
+        'password2': PASSWORD,
+        'email': 'register@benchmark.local',
+        'first_name': 'Bench',
+        'last_name': 'Mark',
+    }
+
+
+def create_fixtures():
+    """
+    Create the benchmark user (staff, with a reader and an active loan) and
+    the books the scenarios act on. Call inside the run's transaction.
+    """
+    user = User.objects.create_user(username='benchmark', password=PASSWORD, is_staff=True)
+    reader = Reader.objects.create(user=user, address='Benchmark Address', phone='0000000000')
+    loaned, available = Book.objects.bulk_create([
+        Book(title='Benchmark Loaned', author='Benchmark Author', genre='Benchmark', publication_year=2024,
+             is_available=False, available_copies=0),
+        Book(title='Benchmark Available', author='Benchmark Author', genre='Benchmark', publication_year=2024),
+    ])
+    loan = Loan.objects.create(
+        book=loaned,
+        reader=reader,
+        return_date=timezone.now() - timezone.timedelta(days=1)
+    )
+    refresh = LibraryTokenObtainPairSerializer.get_token(user)
+    return {
+        'user': user,
+        'reader': reader,
+        'book': Book.objects.exclude(pk__in=[loaned.pk, available.pk]).order_by('pk').first() or available,
+        'available': available,
+        'loan': loan,
+        'access': str(refresh.access_token),
+        'refresh': str(refresh),
+    }
+
+
+def api_scenarios(fixtures):
+    book = fixtures['book'].pk
+    available = fixtures['available'].pk
+    loan = fixtures['loan'].pk
+    refresh = fixtures['refresh']
+    return [
+        Scenario('api-root'),
+        Scenario('register', 'post', data=_registration, json=False, write=True),
+        Scenario('token_obtain_pair', 'post', data={'username': 'benchmark', 'password': PASSWORD}, write=True),
+        Scenario('token_refresh', 'post', data={'refresh': refresh}, write=True),
+        Scenario('token_verify', 'post', data={'token': refresh}),
+        Scenario('change_password', 'put', data={'old_password': PASSWORD, 'new_password': PASSWORD + '1'},
+                 write=True),
+        Scenario('user_profile'),
+        Scenario('user_profile', 'put', data={'phone': '1111111111'}, write=True),
+        Scenario('logout', 'post', data={'refresh_token': refresh}, write=True),
+        Scenario('book-list'),
+        Scenario('book-list', query='genre=Fantasy&is_available=true', name='book-list filtered'),
+        Scenario('book-list', 'post', data=lambda: {
+            'title': 'Benchmark New', 'author': 'Benchmark Author', 'genre': 'Benchmark', 'publication_year': 2024
+        }, json=False, write=True),
+        Scenario('book-detail', kwargs={'pk': book}),
+        Scenario('book-detail', 'patch', kwargs={'pk': book}, data={'genre': 'Benchmark'}, json=False, write=True),
+        Scenario('book-detail', 'delete', kwargs={'pk': available}, write=True),
+        Scenario('book-facets'),
+        Scenario('book-search', query='q=book'),
+        Scenario('book-most-borrowed'),
+        Scenario('book-most-borrowed', query='window=30', name='book-most-borrowed window'),
+        Scenario('book-bulk', 'post', data=_catalog_upload, json=False, write=True),
+        Scenario('book-export'),
+        Scenario('reader-list'),
+        Scenario('reader-detail', kwargs={'pk': fixtures['reader'].pk}),
+        Scenario('loan-list'),
+        Scenario('loan-list', 'post', data={'book': available}, write=True),
+        Scenario('loan-detail', kwargs={'pk': loan}),
+        Scenario('loan-return-book', 'post', kwargs={'pk': loan}, write=True),
+        Scenario('loan-batch-checkout', 'post', data={'books': [available]}, write=True),
+        Scenario('loan-batch-return', 'post', data={'loans': [loan]}, write=True),
+        Scenario('loan-pending'),
+        Scenario('loan-overdue'),
+        Scenario('loan-sweep-overdue', 'post', write=True),
+        Scenario('loan-export'),
+        Scenario('async_book_list'),
+        Scenario('async_book_detail', kwargs={'pk': book}),
+        Scenario('async_book_search', query='q=book'),
+        Scenario('async_most_borrowed'),
+        Scenario('async_pending_loans'),
+        Scenario('async_user_profile'),
+    ]
+
+
+def _client_host():
+    hosts = [host for host in settings.ALLOWED_HOSTS if host and '*' not in host and not host.startswith('.')]
+    return hosts[-1] if hosts else 'localhost'
+
+
+def measure(client, scenario, iterations, warmup=1):
+    latencies, queries, errors = [], [], 0
+    for i in range(warmup + iterations):
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = scenario.send(client)
+                elapsed = time.perf_counter() - started
+            if scenario.write:
+                transaction.set_rollback(True)
+        if i < warmup:
+            continue
+        latencies.append(elapsed)
+        queries.append(len(captured))
+        if response.status_code >= 400:
+            errors += 1
+
+    latencies.sort()
+    return {
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'throughput': round(len(latencies) / sum(latencies), 1) if sum(latencies) else 0,
+        'queries': max(queries),
+        'errors': errors,
+    }
+
+
+def run(iterations=20, warmup=1, only=None):
+    """
+    Benchmark every scenario (or those whose name contains one of the
+    strings in `only`) and return ``{name: stats}``.
+    """
+    results = {}
+    with transaction.atomic():
+        fixtures = create_fixtures()
+        client = Client(SERVER_NAME=_client_host(), HTTP_AUTHORIZATION=f"Bearer {fixtures['access']}")
+        for scenario in api_scenarios(fixtures):
+            if only and not any(part in scenario.name for part in only):
+                continue
+            results[scenario.name] = measure(client, scenario, iterations, warmup)
+        transaction.set_rollback(True)
+    return results
+
+
+def save_baseline(results, path):
+    with open(path, 'w', encoding='utf-8') as output:
+        json.dump(results, output, indent=2, sort_keys=True)
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as source:
+        return json.load(source)
+
+
+def regressions(results, baseline, tolerance=0.25):
+    """
+    List the scenarios whose p95 latency grew by more than `tolerance`
+    (a fraction) or which now run more queries than in `baseline`.
+    """
+    found = []
+    for name, stats in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if stats['queries'] > before['queries']:
+            found.append(f"{name}: {before['queries']} -> {stats['queries']} queries")
+        limit = before['p95_ms'] * (1 + tolerance)
+        if stats['p95_ms'] > limit and stats['p95_ms'] - before['p95_ms'] > MIN_REGRESSION_MS:
+            found.append(f"{name}: p95 {before['p95_ms']} -> {stats['p95_ms']} ms")
+    return found
+
+
+def run_writers(threads=8, operations=50):
+    """
+    Run `threads` readers concurrently checking books out and returning them
+    through the API, `operations` round trips each, against the real
+    database (not rolled back: transactions must commit to contend). The
+    readers and books created for the run are deleted afterwards.
+
+    Returns throughput, latency percentiles and the number of failed
+    requests, e.g. "database is locked" errors.
+    """
+    prefix = f'writer-benchmark-{time.time_ns()}'
+    users = [User.objects.create(username=f'{prefix}-{i}') for i in range(threads)]
+    readers = [Reader.objects.create(user=user, address='Benchmark Address', phone='0') for user in users]
+    books = Book.objects.bulk_create([
+        Book(title=f'{prefix}-{i}', author='Benchmark Author', genre='Benchmark', publication_year=2024)
+        for i in range(threads)
+    ])
+    host = _client_host()
+    latencies, failures = [], []
+    lock = threading.Lock()
+
+    def writer(index):
+        client = APIClient(SERVER_NAME=host)
+        client.force_authenticate(user=users[index])
+        done, failed = [], 0
+        try:
+            for _ in range(operations):
+                started = time.perf_counter()
+                try:
+                    response = client.post(reverse('loan-list'), {'book': books[index].pk}, format='json')
+                    ok = response.status_code == 201
+                    if ok:
+                        response = client.post(reverse('loan-return-book', args=[response.data['id']]))
+                        ok = response.status_code == 200
+                except OperationalError:
+                    ok = False
+                if ok:
+                    done.append(time.perf_counter() - started)
+                else:
+                    failed += 1
+        finally:
+            connection.close()
+        with lock:
+            latencies.extend(done)
+            failures.append(failed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(writer, range(threads)))
+    elapsed = time.perf_counter() - started
+
+    User.objects.filter(pk__in=[user.pk for user in users]).delete()
+    Book.objects.filter(pk__in=[book.pk for book in books]).delete()
+
+    latencies.sort()
+    ms = lambda seconds: round(seconds * 1000, 2) if seconds is not None else None
+    return {
+        'vendor': connection.vendor,
+        'threads': threads,
+        'round_trips': len(latencies),
+        'failed': sum(failures),
+        'throughput': round(len(latencies) / elapsed, 1),
+        'p50_ms': ms(percentile(latencies, 0.50)),
+        'p95_ms': ms(percentile(latencies, 0.95)),
+        'p99_ms': ms(percentile(latencies, 0.99)),
+    }
+
+
+def _best_per_row(serialize, repeat):
+    best, count = None, 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        count = len(serialize())
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best / count * 1_000_000 if count else 0
+
+
+SERIALIZERS = {'books': BookSerializer, 'readers': ReaderSerializer, 'loans': LoanSerializer}
+
+
+def _best_ms(function, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best * 1000, 2), result
+
+
+def serializer_costs(rows=500, repeat=5, query='', only=None):
+    """
+    Serialize up to `rows` books, readers and loans (or only those named in
+    `only`) both from model instances and from ``values()`` rows, and return
+    the best per-row cost of each path in microseconds, query included.
+    `query` is a query string such as ``'fields=id,title'`` applied to both.
+    """
+    request = Request(APIRequestFactory().get('/', SERVER_NAME=_client_host(), QUERY_STRING=query))
+    context = {'request': request}
+    results = {}
+    for name, serializer_class in SERIALIZERS.items():
+        if only and name not in only:
+            continue
+        model = serializer_class.Meta.model
+        queryset = model.objects.select_related(*[
+            field.name for field in model._meta.concrete_fields if field.is_relation
+        ]).order_by('pk')[:rows]
+        columns = serializer_columns(serializer_class(context=context))
+
+        instance_us = _best_per_row(lambda: serializer_class(queryset, many=True, context=context).data, repeat)
+        row_us = _best_per_row(
+            lambda: serializer_class(queryset.values(*columns), many=True, context=context).data, repeat
+        )
+        results[name] = {
+            'rows': queryset.count(),
+            'instance_us': round(instance_us, 1),
+            'row_us': round(row_us, 1),
+            'speedup': round(instance_us / row_us, 2) if row_us else 0,
+        }
+    return results
+
+
+def render_costs(rows=1000, repeat=5):
+    """
+    Render lists of up to `rows` books and loans with DRF's JSONRenderer and
+    FastJSONRenderer, and compress them with each available content coding.
+    Returns the best render/compression times in milliseconds and the body
+    sizes in bytes.
+    """
+    request = Request(APIRequestFactory().get('/', SERVER_NAME=_client_host()))
+    context = {'request': request}
+    results = {}
+    for name in ('books', 'loans'):
+        serializer_class = SERIALIZERS[name]
+        queryset = serializer_class.Meta.model.objects.order_by('pk')[:rows]
+        columns = serializer_columns(serializer_class(context=context))
+        data = serializer_class(queryset.values(*columns), many=True, context=context).data
+
+        stats = {'rows': len(data)}
+        stats['json_ms'], body = _best_ms(lambda: JSONRenderer().render(data), repeat)
+        stats['fast_json_ms'], _ = _best_ms(lambda: FastJSONRenderer().render(data), repeat)
+        stats['identity_bytes'] = len(body)
+        for encoding in compression.available_encodings():
+            stats[f'{encoding}_ms'], compressed = _best_ms(lambda: compression.compress(body, encoding), repeat)
+            stats[f'{encoding}_bytes'] = len(compressed)
+        results[name] = stats
+    return results
@@ -0,0 +1,147 @@
+"""
+Async variants of the read endpoints, for deployments on the ASGI entry
+point (``libraryAPI.asgi``).
+
+DRF views are synchronous, so under an ASGI server each of them runs in a
+worker thread. These views are plain Django ``async def`` views mounted under
+``/async/``: they authenticate with ``CachedJWTAuthentication.aauthenticate``,
+query through the async ORM, and reuse the regular serializers, pagination
+and conditional-request helpers, so their bodies match the sync endpoints'
+and the book list, book detail and profile carry ETag/Last-Modified and
+answer conditional requests. Queries Django or DRF only run synchronously
+(list validators, cursor pagination, full-text search's raw cursor) are
+offloaded to a thread. They don't go through the server-side response
+cache (``library.response_cache``), which only the sync catalog views use.
+
+Write endpoints stay on the sync views, which Django runs in a thread pool
+under ASGI; their transactions and row locks need a sync connection anyway.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.utils import timezone
+from django.views.decorators.http import require_safe
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+
+from . import leaderboard
+from .authentication import CachedJWTAuthentication, get_reader_id
+from .conditional import instance_validators, precondition_response, queryset_validators, set_validators
+from .facets import filter_books
+from .models import Book, Loan
+from .pagination import CreatedAtCursorPagination, SearchPagination
+from .renderers import FastJSONRenderer
+from .search import search_books
+from .serializers import BookFilterSerializer, BookSerializer, LoanSerializer, ReaderSerializer
+
+
+def render(data, status=status.HTTP_200_OK):
+    return HttpResponse(FastJSONRenderer().render(data), status=status, content_type='application/json')
+
+
+def async_api_view(view):
+    """
+    Wrap an async view: require an authenticated JWT, hand the view a DRF
+    ``Request`` and turn API exceptions into JSON error responses.
+    """
+    @require_safe
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        authenticator = CachedJWTAuthentication()
+        api_request = Request(request)
+        try:
+            result = await authenticator.aauthenticate(request)
+            if result is None:
+                raise exceptions.NotAuthenticated()
+            api_request.user, api_request.auth = result
+            return await view(api_request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+            response = render(data, exc.status_code)
+            if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+                response.status_code = status.HTTP_401_UNAUTHORIZED
+                response['WWW-Authenticate'] = authenticator.authenticate_header(request)
+            return response
+
+    return wrapper
+
+
+@async_api_view
+async def book_list(request):
+    filters = BookFilterSerializer(data=request.query_params.dict())
+    filters.is_valid(raise_exception=True)
+
+    books = filter_books(Book.objects.all(), filters.validated_data)
+    etag, last_modified = await sync_to_async(queryset_validators)(request, books)
+    response = precondition_response(request, etag, last_modified)
+    if response is not None:
+        return response
+
+    paginator = CreatedAtCursorPagination()
+    page = await paginator.apaginate_queryset(books, request)
+    serializer = BookSerializer(page, many=True, context={'request': request})
+    return set_validators(render(paginator.get_paginated_response(serializer.data).data), etag, last_modified)
+
+
+@async_api_view
+async def book_detail(request, pk):
+    book = await Book.objects.filter(pk=pk).afirst()
+    if book is None:
+        raise exceptions.NotFound()
+
+    etag, last_modified = instance_validators(request, book)
+    response = precondition_response(request, etag, last_modified)
+    if response is not None:
+        return response
+    serializer = BookSerializer(book, context={'request': request})
+    return set_validators(render(serializer.data), etag, last_modified)
+
+
+@async_api_view
+async def book_search(request):
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return render({"error": "Query parameter 'q' is required"}, status.HTTP_400_BAD_REQUEST)
+
+    paginator = SearchPagination()
+    page = await sync_to_async(paginator.paginate_queryset)(search_books(query), request)
+    serializer = BookSerializer(page, many=True, context={'request': request})
+    return render(paginator.get_paginated_response(serializer.data).data)
+
+
+@async_api_view
+async def most_borrowed(request):
+    window = request.query_params.get('window')
+    if window is not None and (not window.isdigit() or int(window) not in leaderboard.WINDOWS):
+        return render(
+            {"error": f"window must be one of {', '.join(map(str, leaderboard.WINDOWS))} days"},
+            status.HTTP_400_BAD_REQUEST
+        )
+
+    books = await leaderboard.amost_borrowed(int(window) if window else None)
+    serializer = BookSerializer(books, many=True, context={'request': request})
+    return render(serializer.data)
+
+
+@async_api_view
+async def pending_loans(request):
+    pending = Loan.objects.filter(
+        reader_id=get_reader_id(request),
+        returned=False,
+        return_date__lt=timezone.now()
+    )
+    serializer = LoanSerializer([loan async for loan in pending], many=True, context={'request': request})
+    return render(serializer.data)
+
+
+@async_api_view
+async def user_profile(request):
+    # The authenticated user is loaded with its reader joined in.
+    reader = request.user.reader
+    etag, last_modified = instance_validators(request, reader)
+    response = precondition_response(request, etag, last_modified)
+    if response is not None:
+        return response
+    serializer = ReaderSerializer(reader, context={'request': request})
+    return set_validators(render(serializer.data), etag, last_modified)
@@ -0,0 +1,157 @@
+"""
+JWT authentication backed by a short-lived, in-process user cache.
+
+``JWTAuthentication`` loads the user with a SELECT on every request. Here the
+user (with its reader joined in) is kept in a per-process cache for
+``AUTH_USER_CACHE_TTL`` seconds, so authenticated requests inside that window
+don't query the database. Entries are evicted when the user or reader is
+saved or deleted in this process (password changes and deactivation
+included); other processes pick such changes up when their entry expires.
+
+Access tokens also carry ``reader_id`` and the user's permission flags (see
+``LibraryTokenObtainPairSerializer``), so views can scope queries to the
+reader without loading it.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+DEFAULT_TTL = 30
+MAX_ENTRIES = 10000
+
+_users = OrderedDict()
+_lock = threading.Lock()
+
+
+def _ttl():
+    return getattr(settings, 'AUTH_USER_CACHE_TTL', DEFAULT_TTL)
+
+
+def _cached(user_id, now):
+    with _lock:
+        entry = _users.get(user_id)
+        if entry is not None and entry[0] <= now:
+            del _users[user_id]
+            entry = None
+    return entry[1] if entry is not None else None
+
+
+def _store(user_id, user, now):
+    with _lock:
+        _users[user_id] = (now + _ttl(), user)
+        while len(_users) > MAX_ENTRIES:
+            _users.popitem(last=False)
+
+
+def _clone(user):
+    # Views may modify request.user (set_password, attaching attributes), so
+    # never hand out the cached instances themselves.
+    clone = copy.copy(user)
+    reader = clone._state.fields_cache.get('reader')
+    if reader is not None:
+        clone.reader = copy.copy(reader)
+    return clone
+
+
+def cached_user(user_model, user_id):
+    """
+    Return a private copy of the cached user, loading it on a miss.
+    """
+    now = time.monotonic()
+    user = _cached(user_id, now)
+    if user is None:
+        user = user_model.objects.select_related('reader').get(**{api_settings.USER_ID_FIELD: user_id})
+        _store(user_id, user, now)
+    return _clone(user)
+
+
+async def acached_user(user_model, user_id):
+    """
+    Async variant of `cached_user`, loading misses through the async ORM.
+    """
+    now = time.monotonic()
+    user = _cached(user_id, now)
+    if user is None:
+        user = await user_model.objects.select_related('reader').aget(**{api_settings.USER_ID_FIELD: user_id})
+        _store(user_id, user, now)
+    return _clone(user)
+
+
+def evict_user(user_id):
+    with _lock:
+        _users.pop(user_id, None)
+
+
+def clear():
+    with _lock:
+        _users.clear()
+
+
+def get_reader_id(request):
+    """
+    The requesting user's reader id, from the access token when it has one.
+    """
+    claims = request.auth if hasattr(request.auth, 'get') else {}
+    reader_id = claims.get('reader_id')
+    if reader_id is None:
+        reader_id = request.user.reader.id
+    return reader_id
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+
+    def _user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+    def _check_user(self, user, validated_token):
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+    def get_user(self, validated_token):
+        user_id = self._user_id(validated_token)
+        try:
+            user = cached_user(self.user_model, user_id)
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        return self._check_user(user, validated_token)
+
+    async def aget_user(self, validated_token):
+        user_id = self._user_id(validated_token)
+        try:
+            user = await acached_user(self.user_model, user_id)
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        return self._check_user(user, validated_token)
+
+    async def aauthenticate(self, request):
+        """
+        Async `authenticate()`; token validation needs no I/O, and the user
+        comes from the cache or the async ORM.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
@@ -0,0 +1,92 @@
+"""
+A small concurrent HTTP load generator for comparing deployments.
+
+Each worker thread keeps one persistent connection open and issues requests
+back to back, so the measured throughput reflects how many connections the
+server can serve at once rather than connection setup costs.
+"""
+import http.client
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of already sorted `samples`."""
+    if not samples:
+        return None
+    index = max(0, min(len(samples), math.ceil(fraction * len(samples))) - 1)
+    return samples[index]
+
+
+class Result:
+    def __init__(self, url, latencies, errors, elapsed):
+        self.url = url
+        self.latencies = sorted(latencies)
+        self.errors = errors
+        self.elapsed = elapsed
+
+    def as_dict(self):
+        ms = lambda seconds: round(seconds * 1000, 2) if seconds is not None else None
+        return {
+            'url': self.url,
+            'requests': len(self.latencies) + self.errors,
+            'errors': self.errors,
+            'throughput': round(len(self.latencies) / self.elapsed, 1) if self.elapsed else 0,
+            'p50_ms': ms(percentile(self.latencies, 0.50)),
+            'p95_ms': ms(percentile(self.latencies, 0.95)),
+            'p99_ms': ms(percentile(self.latencies, 0.99)),
+        }
+
+
+def run(url, requests, concurrency, headers=None, timeout=30):
+    """
+    Send `requests` GETs to `url` over `concurrency` connections and return
+    a `Result`. Non-2xx/3xx responses and connection errors count as errors.
+    """
+    parts = urlsplit(url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    path = parts.path or '/'
+    if parts.query:
+        path = f'{path}?{parts.query}'
+
+    remaining = [requests]
+    lock = threading.Lock()
+
+    def take():
+        with lock:
+            if remaining[0] <= 0:
+                return False
+            remaining[0] -= 1
+            return True
+
+    def worker():
+        latencies, errors = [], 0
+        connection = connection_class(parts.netloc, timeout=timeout)
+        while take():
+            started = time.perf_counter()
+            try:
+                connection.request('GET', path, headers=headers or {})
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                connection.close()
+                connection = connection_class(parts.netloc, timeout=timeout)
+                continue
+            if response.status >= 400:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - started)
+        connection.close()
+        return latencies, errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(lambda _: worker(), range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for worker_latencies, _ in outcomes for latency in worker_latencies]
+    return Result(url, latencies, sum(errors for _, errors in outcomes), elapsed)
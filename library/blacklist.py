@@ -0,0 +1,157 @@
+"""
+Compact, mostly in-memory checks against the JWT blacklist.
+
+simplejwt checks a refresh token against the blacklist with a join over
+``BlacklistedToken`` and ``OutstandingToken`` on every refresh. Nearly every
+token presented is *not* blacklisted, so each process keeps a Bloom filter of
+blacklisted JTIs instead: a negative answer is definite and needs no query,
+and only the rare positive (a replayed token or a false positive) is
+confirmed against the database.
+
+The filter is warmed from the database on the first request a process
+serves, and then kept current by re-reading the blacklist rows stamped in
+the last ``TOKEN_BLACKLIST_SYNC_OVERLAP`` seconds before the previous sync.
+Reading by time window rather than by "id above the last one seen" matters
+on PostgreSQL, where a row with a lower id can commit after one with a
+higher id has been read. That sync runs when another process announces a new
+entry through the ``TOKEN_BLACKLIST_CACHE`` cache, and at least every
+``TOKEN_BLACKLIST_SYNC_INTERVAL`` seconds, which bounds staleness when the
+cache isn't shared between processes.
+
+A token issued after the last sync (or whose issue time is unknown) may have
+been blacklisted since, so the filter can't vouch for it and it is checked
+against the database too.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+VERSION_KEY = 'library:token-blacklist:version'
+DEFAULT_SYNC_INTERVAL = 1
+DEFAULT_SYNC_OVERLAP = 60
+MIN_CAPACITY = 10000
+FALSE_POSITIVE_RATE = 0.01
+
+
+class BloomFilter:
+    def __init__(self, capacity, false_positive_rate=FALSE_POSITIVE_RATE):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        # Values already present aren't counted again, so re-reading the
+        # overlap window doesn't use up capacity.
+        new = False
+        for position in self._positions(value):
+            mask = 1 << (position & 7)
+            new = new or not self.bits[position >> 3] & mask
+            self.bits[position >> 3] |= mask
+        self.count += new
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _cache():
+    return caches[_setting('TOKEN_BLACKLIST_CACHE', 'default')]
+
+
+class JTIBlacklist:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._synced_from = None
+        self._version = None
+        self._synced_at = 0.0
+
+    def _add_rows(self, queryset):
+        for jti in queryset.values_list('token__jti', flat=True).iterator(chunk_size=5000):
+            self._filter.add(jti)
+
+    def _warm(self):
+        started = timezone.now()
+        # Expired tokens fail verification anyway, so only live ones matter.
+        live = BlacklistedToken.objects.filter(token__expires_at__gt=started)
+        self._filter = BloomFilter(max(MIN_CAPACITY, 2 * live.count()))
+        self._add_rows(live)
+        self._synced_from = started
+
+    def _catch_up(self):
+        started = timezone.now()
+        overlap = timedelta(seconds=_setting('TOKEN_BLACKLIST_SYNC_OVERLAP', DEFAULT_SYNC_OVERLAP))
+        self._add_rows(BlacklistedToken.objects.filter(blacklisted_at__gte=self._synced_from - overlap))
+        self._synced_from = started
+
+    def _sync(self):
+        interval = _setting('TOKEN_BLACKLIST_SYNC_INTERVAL', DEFAULT_SYNC_INTERVAL)
+        version = _cache().get(VERSION_KEY)
+        now = time.monotonic()
+        if self._filter is not None and version == self._version and now - self._synced_at < interval:
+            return
+
+        if self._filter is None or self._filter.count >= self._filter.capacity:
+            self._warm()
+        else:
+            self._catch_up()
+        self._version, self._synced_at = version, now
+
+    def warm(self):
+        """Build the filter now rather than on the first lookup."""
+        with self._lock:
+            if self._filter is None:
+                self._sync()
+
+    def is_blacklisted(self, jti, issued_at=None):
+        """
+        Whether the token with `jti`, issued at the `issued_at` epoch second
+        (its ``iat`` claim), is blacklisted.
+        """
+        with self._lock:
+            self._sync()
+            seen = issued_at is not None and issued_at < int(self._synced_from.timestamp())
+            maybe = not seen or jti in self._filter
+        return maybe and BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+    def added(self, jti):
+        """Record a token blacklisted by this process and tell the others."""
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+        cache = _cache()
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.set(VERSION_KEY, time.time_ns(), None)
+
+    def reset(self):
+        """
+        Drop this process's filter so the next lookup rebuilds it. Other
+        processes keep theirs until they fill up and rebuild on their own.
+        """
+        with self._lock:
+            self._filter = None
+            self._synced_from = None
+            self._version = None
+
+
+blacklist = JTIBlacklist()
@@ -0,0 +1,186 @@
+"""
+Content-negotiated response compression.
+
+``CompressionMiddleware`` compresses textual responses (JSON, CSV, JSON
+lines, HTML...) with brotli when the ``brotli`` package is installed and the
+client prefers it, and with gzip otherwise, honoring ``Accept-Encoding``
+q-values. Responses smaller than ``MIN_SIZE`` bytes are sent as they are,
+since compressing them costs more than it saves.
+
+Streaming responses (the CSV/JSON lines exports) are compressed chunk by
+chunk as they are produced, so they are never buffered in full; their size
+isn't known up front, so the threshold doesn't apply to them.
+
+As with Django's ``GZipMiddleware``, ETags of compressed responses are
+weakened (RFC 9110 section 8.8.1) and gzip output gets a random filename
+against BREACH. Since ``If-Match`` only accepts strong ETags, the weak
+marker is stripped from incoming ``If-Match`` headers, so clients can send
+back the tag they were given to guard their updates.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULTS = {
+    'ENABLED': True,
+    'MIN_SIZE': 1024,
+    'BROTLI_QUALITY': 5,
+    # Media type prefixes worth compressing; images are already compressed.
+    'CONTENT_TYPES': (
+        'text/',
+        'application/json',
+        'application/x-ndjson',
+        'application/javascript',
+        'application/xml',
+        'application/openapi',
+    ),
+}
+GZIP_RANDOM_BYTES = 100
+
+
+def _setting(name):
+    return getattr(settings, 'COMPRESSION', {}).get(name, DEFAULTS[name])
+
+
+def available_encodings():
+    """Supported content codings, in order of preference."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate(accept_encoding):
+    """
+    The content coding to use for an ``Accept-Encoding`` header value, or
+    None if the client accepts none of ours.
+    """
+    weights = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        weight = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if coding:
+            weights[coding.strip().lower()] = weight
+
+    best, best_weight = None, 0.0
+    for coding in available_encodings():
+        weight = weights.get(coding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=_setting('BROTLI_QUALITY'))
+    return compress_string(content, max_random_bytes=GZIP_RANDOM_BYTES)
+
+
+def compress_stream(chunks, encoding):
+    if encoding == 'gzip':
+        yield from compress_sequence(chunks, max_random_bytes=GZIP_RANDOM_BYTES)
+        return
+
+    compressor = brotli.Compressor(quality=_setting('BROTLI_QUALITY'))
+    for chunk in chunks:
+        data = compressor.process(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def acompress_stream(chunks, encoding):
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=_setting('BROTLI_QUALITY'))
+        process, finish = compressor.process, compressor.finish
+    else:
+        # One gzip member per chunk, like GZipMiddleware does for async streams.
+        process, finish = lambda chunk: compress(chunk, 'gzip'), lambda: b''
+    async for chunk in chunks:
+        data = process(chunk)
+        if data:
+            yield data
+    data = finish()
+    if data:
+        yield data
+
+
+def _compressible(response):
+    if response.has_header('Content-Encoding') or response.has_header('Content-Range'):
+        return False
+    if 'no-transform' in response.get('Cache-Control', ''):
+        return False
+    content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+    return content_type.startswith(tuple(_setting('CONTENT_TYPES'))) or content_type.endswith(('+json', '+xml'))
+
+
+class CompressionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not _setting('ENABLED'):
+            return self.get_response(request)
+
+        self._strengthen_if_match(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        if not _setting('ENABLED'):
+            return await self.get_response(request)
+
+        self._strengthen_if_match(request)
+        return self.process_response(request, await self.get_response(request))
+
+    def _strengthen_if_match(self, request):
+        if_match = request.META.get('HTTP_IF_MATCH')
+        if if_match and 'W/' in if_match:
+            request.META['HTTP_IF_MATCH'] = if_match.replace('W/"', '"')
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < _setting('MIN_SIZE'):
+            return response
+        if not _compressible(response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_stream(response.streaming_content, encoding)
+            else:
+                response.streaming_content = compress_stream(response.streaming_content, encoding)
+            del response.headers['Content-Length']
+        else:
+            content = compress(response.content, encoding)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response.headers['Content-Length'] = str(len(content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,118 @@
+"""
+Conditional requests (ETag / Last-Modified) for catalog and profile reads.
+
+Validators are computed from ``updated_at`` columns without serializing
+anything: a detail response is versioned by its row's ``updated_at``, and a
+list response by ``MAX(updated_at)`` and ``COUNT(*)`` over the filtered
+queryset plus the query string, so paging and filters get their own tags.
+Because both are strong validators they're also honored by ``If-Match`` on
+PUT/PATCH, which turns lost updates into 412 responses.
+
+Note that a deleted row only shows up in a list's ETag (through the count),
+not in its Last-Modified date, so clients should prefer If-None-Match.
+"""
+import hashlib
+
+from django.db import models
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+PRECONDITION_HEADERS = ('HTTP_IF_MATCH', 'HTTP_IF_UNMODIFIED_SINCE')
+
+
+def _etag(request, *parts):
+    # The same resource rendered as JSON or as the browsable API is a
+    # different representation, so the negotiated format is part of the tag.
+    renderer = getattr(request, 'accepted_renderer', None)
+    parts += (renderer.format if renderer else '',)
+    return quote_etag(hashlib.sha1(repr(parts).encode()).hexdigest())
+
+
+def _timestamp(moment):
+    return int(moment.timestamp()) if moment else None
+
+
+def instance_validators(request, instance):
+    """
+    Return ``(etag, last_modified)`` for a single row with ``updated_at``.
+    """
+    etag = _etag(request, instance._meta.label, instance.pk, instance.updated_at.isoformat())
+    return etag, _timestamp(instance.updated_at)
+
+
+def queryset_validators(request, queryset):
+    """
+    Return ``(etag, last_modified)`` for a list response over `queryset`.
+    """
+    state = queryset.order_by().aggregate(last_modified=models.Max('updated_at'), count=models.Count('pk'))
+    last_modified = state['last_modified']
+    etag = _etag(
+        request,
+        queryset.model._meta.label,
+        request.get_full_path(),
+        state['count'],
+        last_modified.isoformat() if last_modified else None
+    )
+    return etag, _timestamp(last_modified)
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def precondition_response(request, etag, last_modified):
+    """
+    Return a 304/412 response if the request's conditional headers say so,
+    otherwise None.
+    """
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def has_write_precondition(request):
+    return any(header in request.META for header in PRECONDITION_HEADERS)
+
+
+class ConditionalModelMixin:
+    """
+    Adds validators and conditional request handling to a ModelViewSet whose
+    model has an ``updated_at`` field.
+    """
+
+    def list(self, request, *args, **kwargs):
+        etag, last_modified = queryset_validators(request, self.filter_queryset(self.get_queryset()))
+        response = precondition_response(request, etag, last_modified)
+        if response is not None:
+            return response
+        return set_validators(super().list(request, *args, **kwargs), etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, last_modified = instance_validators(request, instance)
+        response = precondition_response(request, etag, last_modified)
+        if response is not None:
+            return response
+        serializer = self.get_serializer(instance)
+        return set_validators(Response(serializer.data), etag, last_modified)
+
+    def update(self, request, *args, **kwargs):
+        # Only pay for the extra lookup when the client sent a precondition.
+        if has_write_precondition(request):
+            response = precondition_response(request, *instance_validators(request, self.get_object()))
+            if response is not None:
+                return response
+        response = super().update(request, *args, **kwargs)
+        instance = getattr(self, '_updated_instance', None)
+        if instance is not None:
+            set_validators(response, *instance_validators(request, instance))
+        return response
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        self._updated_instance = serializer.instance
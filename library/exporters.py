@@ -0,0 +1,82 @@
+"""
+Streaming export of the catalog and loan history.
+
+Rows are read with ``values_list().iterator()`` so the database driver hands
+them over in chunks, and rendered one line at a time, so memory use doesn't
+grow with the size of the table.
+"""
+import csv
+import datetime
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Book, Loan
+
+FORMATS = ('csv', 'jsonl')
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+DEFAULT_CHUNK_SIZE = 2000
+
+EXPORTS = {
+    'books': (Book, ('id', 'title', 'author', 'genre', 'publication_year', 'total_copies',
+                     'available_copies', 'is_available', 'loan_count', 'created_at', 'updated_at')),
+    'loans': (Loan, ('id', 'book_id', 'reader_id', 'loan_date', 'return_date', 'returned',
+                     'actual_return_date')),
+}
+
+
+class _Echo:
+    """File-like object whose write() returns the line instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def parse_bound(value):
+    """
+    Parse an ISO date or datetime into an aware datetime, or raise ValueError.
+    """
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'{value!r} is not an ISO 8601 date or datetime.')
+        moment = datetime.datetime.combine(day, datetime.time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def export_rows(kind, since=None, until=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    model, fields = EXPORTS[kind]
+    queryset = model.objects.order_by('pk')
+    if since is not None:
+        queryset = queryset.filter(loan_date__gte=since)
+    if until is not None:
+        queryset = queryset.filter(loan_date__lt=until)
+    return fields, queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+
+
+def render_csv(fields, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(
+            value.isoformat() if isinstance(value, datetime.datetime) else value for value in row
+        )
+
+
+def render_jsonl(fields, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(fields, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+def render(format, fields, rows):
+    if format == 'csv':
+        return render_csv(fields, rows)
+    return render_jsonl(fields, rows)
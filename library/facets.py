@@ -0,0 +1,85 @@
+"""
+Book list filtering and facet counts.
+
+Facet counts come from ``BookFacetCount``, a (genre, decade, availability)
+table kept current by triggers, whenever the active filters line up with
+those dimensions. Filters it can't express (an author, or a year range that
+splits a decade) fall back to grouping the filtered books directly.
+"""
+from collections import Counter
+
+from django.db import models
+
+from .models import Book, BookFacetCount
+
+
+def decade_of(year):
+    # Truncates towards zero, like the integer division used by the triggers.
+    return int(year / 10) * 10
+
+
+def filter_books(queryset, filters):
+    if 'genre' in filters:
+        queryset = queryset.filter(genre=filters['genre'])
+    if 'author' in filters:
+        queryset = queryset.filter(author=filters['author'])
+    if 'is_available' in filters:
+        queryset = queryset.filter(is_available=filters['is_available'])
+    if 'year_min' in filters:
+        queryset = queryset.filter(publication_year__gte=filters['year_min'])
+    if 'year_max' in filters:
+        queryset = queryset.filter(publication_year__lte=filters['year_max'])
+    return queryset
+
+
+def _covered_by_facet_table(filters):
+    if 'author' in filters:
+        return False
+    if 'year_min' in filters and filters['year_min'] % 10 != 0:
+        return False
+    if 'year_max' in filters and filters['year_max'] % 10 != 9:
+        return False
+    return True
+
+
+def _facet_rows(filters):
+    if _covered_by_facet_table(filters):
+        queryset = BookFacetCount.objects.filter(count__gt=0)
+        if 'genre' in filters:
+            queryset = queryset.filter(genre=filters['genre'])
+        if 'is_available' in filters:
+            queryset = queryset.filter(is_available=filters['is_available'])
+        if 'year_min' in filters:
+            queryset = queryset.filter(decade__gte=filters['year_min'])
+        if 'year_max' in filters:
+            queryset = queryset.filter(decade__lte=decade_of(filters['year_max']))
+        return queryset.values_list('genre', 'decade', 'is_available', 'count')
+
+    return (
+        filter_books(Book.objects.all(), filters)
+        .values_list('genre', models.F('publication_year') / 10 * 10, 'is_available')
+        .annotate(count=models.Count('id'))
+        .order_by()
+    )
+
+
+def facet_counts(filters):
+    genres = Counter()
+    decades = Counter()
+    availability = Counter()
+    for genre, decade, is_available, count in _facet_rows(filters):
+        genres[genre] += count
+        decades[decade] += count
+        availability[is_available] += count
+
+    return {
+        'count': sum(genres.values()),
+        'genre': [
+            {'value': genre, 'count': count}
+            for genre, count in sorted(genres.items(), key=lambda item: (-item[1], item[0]))
+        ],
+        'decade': [{'value': decade, 'count': decades[decade]} for decade in sorted(decades)],
+        'is_available': [
+            {'value': value, 'count': availability[value]} for value in (True, False) if availability[value]
+        ],
+    }
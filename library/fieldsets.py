@@ -0,0 +1,155 @@
+"""
+Sparse fieldsets and ``values()``-based list serialization.
+
+On GET requests ``?fields=a,b`` limits a serializer to those fields and
+``?exclude=a,b`` drops fields. The model columns the remaining fields read
+are known up front (``serializer_columns``), so views can narrow their SQL
+with ``only()`` or, for lists, fetch plain ``values()`` rows and serialize
+them with precomputed per-field converters instead of building a model
+instance and walking the generic ``ModelSerializer`` machinery per row.
+
+Converters reuse each field's own ``to_representation``, so both paths
+render identically. Serializer method fields opt in by naming the columns
+they read in ``row_sources`` and providing a ``row_<field>(row)`` method.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.relations import RelatedField
+
+
+def _requested(request, name):
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    return [part.strip() for part in value.split(',') if part.strip()]
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin applying ``?fields=`` / ``?exclude=`` on GET requests.
+    """
+    row_sources = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return
+
+        fields = _requested(request, 'fields')
+        exclude = _requested(request, 'exclude') or []
+        unknown = (set(fields or ()) | set(exclude)) - set(self.fields)
+        if unknown:
+            raise serializers.ValidationError({"fields": f"Unknown field(s): {', '.join(sorted(unknown))}"})
+        for name in list(self.fields):
+            if (fields is not None and name not in fields) or name in exclude:
+                self.fields.pop(name)
+
+    def row_file(self, name, row):
+        """The FieldFile for file column `name` of a ``values()`` row."""
+        model_field = self.Meta.model._meta.get_field(name)
+        return model_field.attr_class(None, model_field, row[name]) if row[name] else None
+
+
+def _model_field(serializer, source):
+    try:
+        field = serializer.Meta.model._meta.get_field(source)
+    except (AttributeError, FieldDoesNotExist):
+        return None
+    return field if field.concrete and not field.many_to_many else None
+
+
+def serializer_columns(serializer, prefix=''):
+    """
+    The model columns `serializer`'s fields read, as ``values()``/``only()``
+    lookups, or None if some field can't be rendered from a ``values()`` row.
+    """
+    columns = []
+    row_sources = getattr(serializer, 'row_sources', {})
+    for name, field in serializer.fields.items():
+        if name in row_sources and hasattr(serializer, f'row_{name}'):
+            columns += [prefix + column for column in row_sources[name]]
+        elif isinstance(field, serializers.BaseSerializer):
+            nested = serializer_columns(field, f'{prefix}{field.source}__')
+            if nested is None:
+                return None
+            columns += nested
+        elif _model_field(serializer, field.source) is not None:
+            columns.append(prefix + field.source)
+        else:
+            return None
+    return columns
+
+
+def row_converters(serializer, prefix=''):
+    """
+    ``(name, convert)`` pairs rendering each field from a ``values()`` row
+    fetched with ``serializer_columns(serializer)``.
+    """
+    converters = []
+    for name, field in serializer.fields.items():
+        key = prefix + field.source
+        hook = getattr(serializer, f'row_{name}', None)
+        if name in getattr(serializer, 'row_sources', {}) and hook is not None:
+            convert = hook
+        elif isinstance(field, serializers.BaseSerializer):
+            nested = row_converters(field, f'{key}__')
+            convert = lambda row, nested=nested: {name: convert(row) for name, convert in nested}
+        elif isinstance(field, RelatedField):
+            # values() already yields the related primary key.
+            convert = lambda row, key=key: row[key]
+        elif isinstance(field, serializers.FileField):
+            model_field = _model_field(serializer, field.source)
+            convert = lambda row, key=key, field=field, model_field=model_field: (
+                field.to_representation(model_field.attr_class(None, model_field, row[key])) if row[key] else None
+            )
+        else:
+            convert = lambda row, key=key, to_representation=field.to_representation: (
+                None if row[key] is None else to_representation(row[key])
+            )
+        converters.append((name, convert))
+    return converters
+
+
+class RowListSerializer(serializers.ListSerializer):
+    """
+    List serializer that renders ``values()`` rows with precomputed
+    converters, and model instances as usual.
+    """
+
+    def to_representation(self, data):
+        rows = list(data.all() if hasattr(data, 'all') else data)
+        if not rows or not isinstance(rows[0], dict):
+            return super().to_representation(rows)
+        converters = row_converters(self.child)
+        return [{name: convert(row) for name, convert in converters} for row in rows]
+
+
+class SparseFieldsViewMixin:
+    """
+    Viewset mixin narrowing list and retrieve queries to the columns the
+    serializer reads: lists are fetched as ``values()`` rows when every field
+    supports it, retrieves are narrowed with ``only()``.
+    """
+
+    def _required_columns(self, model):
+        columns = [model._meta.pk.name]
+        ordering = getattr(self.paginator, 'ordering', None) or ()
+        columns += [field.lstrip('-') for field in ((ordering,) if isinstance(ordering, str) else ordering)]
+        # Conditional requests version responses by updated_at.
+        if any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+            columns.append('updated_at')
+        return columns
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method != 'GET' or self.action not in ('list', 'retrieve'):
+            return queryset
+
+        columns = serializer_columns(self.get_serializer())
+        if columns is None:
+            return queryset
+        columns = list(dict.fromkeys(self._required_columns(queryset.model) + columns))
+        if self.action == 'list':
+            return queryset.values(*columns)
+        return queryset.only(*columns)
@@ -0,0 +1,153 @@
+"""
+Streaming catalog import.
+
+Rows are read one at a time from a CSV or JSONL text stream, checked with a
+small hand-written validator instead of a full serializer, and written with
+``bulk_create`` in batches, each in its own transaction. Books are upserted on
+their natural key (title, author, publication_year), so re-running an import
+updates genres instead of duplicating books.
+"""
+import csv
+import json
+import re
+
+from django.db import transaction
+
+from . import response_cache
+from .models import Book
+
+FORMATS = ('csv', 'jsonl')
+NATURAL_KEY = ('title', 'author', 'publication_year')
+TEXT_FIELDS = ('title', 'author', 'genre')
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportReport:
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+        # Set when the import stopped before the end of the file.
+        self.error = None
+
+    def add_error(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def as_dict(self):
+        report = {
+            'imported': self.imported,
+            'failed': self.failed,
+            'errors': self.errors,
+        }
+        if self.error:
+            report['error'] = self.error
+        return report
+
+
+def read_rows(stream, format):
+    """
+    Yield ``(line, row, error)`` for each record of `stream`.
+    """
+    if format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row, None
+        return
+
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError as exc:
+            yield line, None, {'non_field_errors': f'Invalid JSON: {exc}'}
+            continue
+        if not isinstance(row, dict):
+            yield line, None, {'non_field_errors': 'Expected a JSON object.'}
+            continue
+        yield line, row, None
+
+
+def _integer(value):
+    """
+    `value` as an int if it is one, or a string of digits; None otherwise.
+    Booleans and floats (``2024.7``, but also ``2024.0``) are rejected.
+    """
+    if isinstance(value, str):
+        value = value.strip()
+        return int(value) if re.fullmatch(r'-?\d+', value) else None
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    return None
+
+
+def clean_row(row):
+    """
+    Build an unsaved Book from `row`, or raise ValueError with a dict of errors.
+    """
+    values = {}
+    errors = {}
+    for field in TEXT_FIELDS:
+        value = str(row.get(field) or '').strip()
+        max_length = Book._meta.get_field(field).max_length
+        if not value:
+            errors[field] = 'This field is required.'
+        elif len(value) > max_length:
+            errors[field] = f'Ensure this field has no more than {max_length} characters.'
+        values[field] = value
+
+    year = _integer(row.get('publication_year'))
+    if year is None:
+        errors['publication_year'] = 'A valid integer is required.'
+    values['publication_year'] = year
+
+    if errors:
+        raise ValueError(errors)
+    return Book(**values)
+
+
+def _write_batch(batch):
+    with transaction.atomic():
+        Book.objects.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=NATURAL_KEY,
+            update_fields=['genre', 'updated_at']
+        )
+        response_cache.invalidate_catalog()
+
+
+def import_books(stream, format, batch_size=DEFAULT_BATCH_SIZE):
+    report = ImportReport()
+    # Keyed by natural key so a book repeated within one batch is written
+    # once (last row wins); an upsert may not touch the same row twice.
+    batch = {}
+    last_line = 0
+    try:
+        for line, row, error in read_rows(stream, format):
+            last_line = line
+            if error is None:
+                try:
+                    book = clean_row(row)
+                except ValueError as exc:
+                    error = exc.args[0]
+            if error is not None:
+                report.add_error(line, error)
+                continue
+
+            batch[tuple(getattr(book, field) for field in NATURAL_KEY)] = book
+            report.imported += 1
+            if len(batch) >= batch_size:
+                _write_batch(list(batch.values()))
+                batch = {}
+    except UnicodeDecodeError:
+        # Earlier batches are already committed; keep what was read and
+        # report where the import stopped.
+        report.error = f'The file must be UTF-8 encoded; the import stopped after line {last_line}.'
+
+    if batch:
+        _write_batch(list(batch.values()))
+    return report
@@ -0,0 +1,119 @@
+"""
+Copy counters for multi-copy titles.
+
+A library holds ``Book.total_copies`` copies of a title, of which
+``available_copies`` are on the shelf. Checkouts and returns move the
+counter with a single conditional UPDATE on F() expressions, so concurrent
+loans of a popular title never read-modify-write the row: the database
+serializes the decrements and ``available_copies > 0`` in the WHERE clause
+stops the last copy from being handed out twice. ``is_available`` is kept
+equal to ``available_copies > 0`` alongside, for the list filters, facets
+and the book_unavailable_idx index.
+
+Counters can drift if loans are created or closed outside the API (e.g. in
+the admin); ``reconcile`` recomputes them from the active loans.
+"""
+from collections import Counter, defaultdict
+
+from django.db import models, transaction
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.utils import timezone
+
+from .models import Book, Loan
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def _flag(**lookup):
+    return models.Case(models.When(then=models.Value(True), **lookup), default=models.Value(False))
+
+
+def _has_copies_left(taken):
+    # UPDATE right-hand sides see the row as it was before the statement.
+    return _flag(available_copies__gt=taken)
+
+
+def take_copies(book_ids, now=None, **extra):
+    """
+    Check out one copy of each book in `book_ids` that has one left, and
+    return how many were taken. `extra` adds assignments to the UPDATE.
+    """
+    return Book.objects.filter(pk__in=book_ids, available_copies__gt=0).update(
+        available_copies=models.F('available_copies') - 1,
+        is_available=_has_copies_left(1),
+        updated_at=now or timezone.now(),
+        **extra
+    )
+
+
+def return_copies(book_ids, now=None):
+    """
+    Put back one copy per occurrence of a book in `book_ids`, never above
+    its total; one UPDATE per distinct number of copies returned.
+    """
+    by_count = defaultdict(list)
+    for book_id, count in Counter(book_ids).items():
+        by_count[count].append(book_id)
+    for count, ids in by_count.items():
+        Book.objects.filter(pk__in=ids).update(
+            available_copies=Least(models.F('available_copies') + count, models.F('total_copies')),
+            is_available=_flag(total_copies__gt=0),
+            updated_at=now or timezone.now()
+        )
+
+
+def add_copies(book_id, added):
+    """
+    Change a title's holding by `added` copies (negative to withdraw some).
+    Only copies on the shelf can be withdrawn; returns False otherwise.
+    """
+    return bool(Book.objects.filter(pk=book_id, available_copies__gte=-added).update(
+        total_copies=models.F('total_copies') + added,
+        available_copies=models.F('available_copies') + added,
+        is_available=_has_copies_left(-added),
+        updated_at=timezone.now()
+    ))
+
+
+def expected_available_copies():
+    """``available_copies`` of a Book as implied by its active loans."""
+    active = (
+        Loan.objects.filter(book=models.OuterRef('pk'), returned=False)
+        .order_by()
+        .values('book')
+        .annotate(total=models.Count('id'))
+        .values('total')
+    )
+    return Greatest(models.F('total_copies') - Coalesce(models.Subquery(active), 0), 0)
+
+
+def reconcile(queryset=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Recompute ``available_copies`` and ``is_available`` from the active
+    loans for the books in `queryset` (all by default), walking primary key
+    ranges so each UPDATE holds the write lock briefly. Only rows whose
+    counters are off are written; returns how many were.
+    """
+    queryset = Book.objects.all() if queryset is None else queryset
+    expected = expected_available_copies()
+    fixed = 0
+    last_id = 0
+    while True:
+        ids = list(queryset.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:chunk_size])
+        if not ids:
+            break
+        with transaction.atomic():
+            drifted = list(
+                Book.objects.filter(pk__in=ids)
+                .annotate(expected=expected)
+                .exclude(available_copies=models.F('expected'), is_available=_flag(expected__gt=0))
+                .values_list('pk', flat=True)
+            )
+            if drifted:
+                fixed += Book.objects.filter(pk__in=drifted).update(
+                    available_copies=expected,
+                    updated_at=timezone.now()
+                )
+                Book.objects.filter(pk__in=drifted).update(is_available=_has_copies_left(0))
+        last_id = ids[-1]
+    return fixed
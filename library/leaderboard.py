@@ -0,0 +1,135 @@
+"""
+Cached "most borrowed" rankings.
+
+The all-time ranking is read straight from the denormalized
+``Book.loan_count`` column through its index. Rankings over a recent window
+(e.g. the last 7 days) need a ``GROUP BY`` over the loans in that window, so
+they are cached in the ``LEADERBOARD_CACHE`` cache, shared by all processes:
+the list of ranked book ids, plus one counter per book that new loans bump
+with ``cache.incr``, so concurrent checkouts never lose an increment.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import models
+from django.utils import timezone
+
+from .models import Book, Loan
+
+WINDOWS = (7, 30, 365)
+TOP_N = 10
+CACHE_TIMEOUT = 300
+
+
+def _cache():
+    return caches[getattr(settings, 'LEADERBOARD_CACHE', 'default')]
+
+
+def _ranking_key(days):
+    return f'library:most_borrowed:{days}'
+
+
+def _count_key(days, generation, book_id):
+    return f'library:most_borrowed:{days}:{generation}:{book_id}'
+
+
+def _ranking_rows(days):
+    since = timezone.now() - timezone.timedelta(days=days)
+    return (
+        Loan.objects.filter(loan_date__gte=since)
+        .values('book')
+        .annotate(total=models.Count('id'))
+        .order_by('-total', 'book')[:TOP_N]
+    )
+
+
+def _rank(days):
+    return [(row['book'], row['total']) for row in _ranking_rows(days)]
+
+
+async def _arank(days):
+    return [(row['book'], row['total']) async for row in _ranking_rows(days)]
+
+
+def _store(days, ranking):
+    # A new generation per rebuild, so late increments of a replaced
+    # ranking can't land on this one's counters.
+    cache = _cache()
+    generation = time.time_ns()
+    cache.set_many({_count_key(days, generation, book_id): total for book_id, total in ranking}, CACHE_TIMEOUT)
+    cache.set(_ranking_key(days), (generation, [book_id for book_id, _ in ranking]), CACHE_TIMEOUT)
+
+
+def _cached(days):
+    """The cached ranking for `days` as ``(book_id, loans)`` pairs, or None."""
+    cache = _cache()
+    cached = cache.get(_ranking_key(days))
+    if cached is None:
+        return None
+    generation, book_ids = cached
+    keys = {_count_key(days, generation, book_id): book_id for book_id in book_ids}
+    counts = cache.get_many(keys)
+    if len(counts) < len(keys):
+        return None
+    return sorted(((keys[key], total) for key, total in counts.items()), key=lambda item: (-item[1], item[0]))
+
+
+def most_borrowed(days=None):
+    """
+    Return the TOP_N most borrowed books, over the last `days` days or all time.
+    """
+    if days is None:
+        return list(Book.objects.order_by('-loan_count', 'id')[:TOP_N])
+
+    ranking = _cached(days)
+    if ranking is None:
+        ranking = _rank(days)
+        _store(days, ranking)
+
+    books = Book.objects.in_bulk([book_id for book_id, _ in ranking])
+    return [books[book_id] for book_id, _ in ranking if book_id in books]
+
+
+async def amost_borrowed(days=None):
+    """
+    Async variant of `most_borrowed`, querying through the async ORM.
+    """
+    if days is None:
+        return [book async for book in Book.objects.order_by('-loan_count', 'id')[:TOP_N]]
+
+    ranking = _cached(days)
+    if ranking is None:
+        ranking = await _arank(days)
+        _store(days, ranking)
+
+    books = await Book.objects.ain_bulk([book_id for book_id, _ in ranking])
+    return [books[book_id] for book_id, _ in ranking if book_id in books]
+
+
+def record_loan(book_id):
+    """
+    Account for a new loan of `book_id` in every cached window ranking.
+
+    A book already on a ranking gets its counter incremented. Any other book
+    may or may not have climbed onto it, which can't be told without
+    counting, so that window is dropped and rebuilt lazily.
+    """
+    cache = _cache()
+    for days in WINDOWS:
+        cached = cache.get(_ranking_key(days))
+        if cached is None:
+            continue
+        generation, book_ids = cached
+        if book_id in book_ids:
+            try:
+                cache.incr(_count_key(days, generation, book_id))
+                continue
+            except ValueError:
+                # The counter expired or was evicted.
+                pass
+        cache.delete(_ranking_key(days))
+
+
+def invalidate():
+    _cache().delete_many([_ranking_key(days) for days in WINDOWS])
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from library import api_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark every API route in-process against the current database '
+        '(see seed_library) and report latency percentiles, throughput and '
+        'query counts. Changes made by the benchmark are rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='Measured requests per scenario.')
+        parser.add_argument('--warmup', type=int, default=1, help='Unmeasured requests per scenario.')
+        parser.add_argument('--only', action='append', help='Only run scenarios whose name contains this.')
+        parser.add_argument('--save', help='Write the results to this JSON baseline file.')
+        parser.add_argument('--compare', help='Fail if results regress against this JSON baseline file.')
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.25,
+            help='Allowed p95 latency growth over the baseline, as a fraction.'
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1 or options['warmup'] < 0:
+            raise CommandError('--iterations must be positive and --warmup not negative.')
+
+        baseline = None
+        if options['compare']:
+            try:
+                baseline = api_benchmark.load_baseline(options['compare'])
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Can't read baseline: {exc}")
+
+        results = api_benchmark.run(options['iterations'], options['warmup'], options['only'])
+
+        self.stdout.write(
+            f"{'scenario':<32} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} {'queries':>8} {'errors':>7}"
+        )
+        for name, stats in results.items():
+            self.stdout.write(
+                f"{name:<32} {stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8} "
+                f"{stats['throughput']:>8} {stats['queries']:>8} {stats['errors']:>7}"
+            )
+
+        if options['save']:
+            api_benchmark.save_baseline(results, options['save'])
+            self.stdout.write(f"Saved baseline to {options['save']}.")
+
+        if baseline is not None:
+            found = api_benchmark.regressions(results, baseline, options['tolerance'])
+            if found:
+                raise CommandError('Performance regressions:\n' + '\n'.join(found))
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline.'))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from library import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Load a running server with concurrent GET requests and report '
+        'throughput and latency percentiles.\n\n'
+        'To compare deployments, start the same project under a WSGI server '
+        '(e.g. "gunicorn libraryAPI.wsgi -w 1 --threads 8") and an ASGI one '
+        '(e.g. "uvicorn libraryAPI.asgi:application") and point this command '
+        'at the sync endpoints (/books/) and their async variants '
+        '(/async/books/) on each.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+', help='Absolute URLs to request.')
+        parser.add_argument('--requests', type=int, default=1000, help='Requests per URL.')
+        parser.add_argument('--concurrency', type=int, default=32, help='Concurrent connections.')
+        parser.add_argument('--token', help='JWT access token sent as a Bearer Authorization header.')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--requests and --concurrency must be positive.')
+
+        headers = {}
+        if options['token']:
+            headers['Authorization'] = f"Bearer {options['token']}"
+
+        self.stdout.write(f"{'url':<50} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for url in options['urls']:
+            result = benchmark.run(url, options['requests'], options['concurrency'], headers).as_dict()
+            self.stdout.write(
+                f"{url:<50} {result['throughput']:>8} {result['p50_ms'] or '-':>8} "
+                f"{result['p95_ms'] or '-':>8} {result['p99_ms'] or '-':>8} {result['errors']:>7}"
+            )
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from library import api_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure JSON render time (DRF vs FastJSONRenderer) and bytes on the '
+        'wire per content coding for large book and loan lists.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Rows per list.')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement; the best is reported.')
+
+    def handle(self, *args, **options):
+        if options['rows'] < 1 or options['repeat'] < 1:
+            raise CommandError('--rows and --repeat must be positive.')
+
+        for name, stats in api_benchmark.render_costs(options['rows'], options['repeat']).items():
+            self.stdout.write(name)
+            for key, value in stats.items():
+                self.stdout.write(f'  {key:<16} {value}')
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from library import api_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the per-row cost of list serialization from model instances '
+        'with the values() row path used by the list endpoints.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500, help='Rows serialized per model.')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per path; the best is reported.')
+        parser.add_argument('--model', choices=api_benchmark.SERIALIZERS, help='Benchmark only this model.')
+        parser.add_argument('--fields', help='Comma-separated sparse fieldset, e.g. id,title (needs --model).')
+
+    def handle(self, *args, **options):
+        if options['rows'] < 1 or options['repeat'] < 1:
+            raise CommandError('--rows and --repeat must be positive.')
+        if options['fields'] and not options['model']:
+            raise CommandError('--fields needs --model, since fieldsets differ per model.')
+
+        query = f"fields={options['fields']}" if options['fields'] else ''
+        try:
+            results = api_benchmark.serializer_costs(
+                options['rows'], options['repeat'], query, [options['model']] if options['model'] else None
+            )
+        except ValidationError as error:
+            raise CommandError(error.detail['fields'])
+
+        self.stdout.write(f"{'model':<10} {'rows':>6} {'instance µs':>12} {'row µs':>8} {'speedup':>8}")
+        for name, stats in results.items():
+            self.stdout.write(
+                f"{name:<10} {stats['rows']:>6} {stats['instance_us']:>12} {stats['row_us']:>8} {stats['speedup']:>7}x"
+            )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from library import api_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure concurrent checkout/return round trips against the configured '
+        'database, to compare database profiles (e.g. SQLITE_JOURNAL_MODE=DELETE '
+        'vs WAL, or PostgreSQL with and without pooling).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent readers.')
+        parser.add_argument('--operations', type=int, default=50, help='Round trips per reader.')
+
+    def handle(self, *args, **options):
+        if options['threads'] < 1 or options['operations'] < 1:
+            raise CommandError('--threads and --operations must be positive.')
+
+        result = api_benchmark.run_writers(options['threads'], options['operations'])
+        for name, value in result.items():
+            self.stdout.write(f'{name:<12} {value}')
+        if result['failed']:
+            raise CommandError(f"{result['failed']} round trips failed.")
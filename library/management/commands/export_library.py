@@ -0,0 +1,40 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from library.exporters import DEFAULT_CHUNK_SIZE, EXPORTS, FORMATS, export_rows, parse_bound, render
+
+
+class Command(BaseCommand):
+    help = 'Stream the book catalog or the loan history as CSV or JSONL.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument('--output-format', choices=FORMATS, default='csv')
+        parser.add_argument('--output', '-o', help='File to write to. Defaults to stdout.')
+        parser.add_argument('--since', help='Only loans made on or after this ISO date/datetime.')
+        parser.add_argument('--until', help='Only loans made before this ISO date/datetime.')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Number of rows fetched from the database at a time.'
+        )
+
+    def handle(self, *args, **options):
+        kind = options['kind']
+        if kind != 'loans' and (options['since'] or options['until']):
+            raise CommandError('--since and --until only apply to loans.')
+        try:
+            since = parse_bound(options['since']) if options['since'] else None
+            until = parse_bound(options['until']) if options['until'] else None
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        fields, rows = export_rows(kind, since, until, options['chunk_size'])
+        lines = render(options['output_format'], fields, rows)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+                output.writelines(lines)
+        else:
+            sys.stdout.writelines(lines)
@@ -0,0 +1,70 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from library import thumbnails
+from library.models import Book, Reader
+
+BATCH_SIZE = 500
+IMAGES = (
+    (Book, 'cover_image', thumbnails.COVER_SIZE),
+    (Reader, 'profile_picture', thumbnails.PROFILE_PICTURE_SIZE),
+)
+
+
+class Command(BaseCommand):
+    help = 'Generate thumbnail and WebP variants for existing book covers and profile pictures.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate variants that already exist.'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=getattr(settings, 'THUMBNAIL_WORKERS', 2),
+            help='Number of images processed in parallel.'
+        )
+
+    def _images(self):
+        for model, field_name, size in IMAGES:
+            storage = model._meta.get_field(field_name).storage
+            names = (
+                model.objects.exclude(**{field_name: ''})
+                .exclude(**{f'{field_name}__isnull': True})
+                .values_list(field_name, flat=True)
+            )
+            for name in names.iterator():
+                yield storage, name, size
+
+    def _generate(self, image):
+        storage, name, size = image
+        try:
+            return thumbnails.generate_variants(storage, name, size, force=self.force)
+        except Exception as exc:
+            self.stderr.write(f'{name}: {exc}')
+            return None
+
+    def handle(self, *args, **options):
+        self.force = options['force']
+        generated = skipped = failed = 0
+        images = self._images()
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            # Executor.map submits everything up front, so feed it in slices
+            # to keep the number of pending images bounded.
+            while batch := list(islice(images, BATCH_SIZE)):
+                for result in pool.map(self._generate, batch):
+                    if result is None:
+                        failed += 1
+                    elif result:
+                        generated += 1
+                    else:
+                        skipped += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated variants for {generated} images, {skipped} already done, {failed} failed.'
+        ))
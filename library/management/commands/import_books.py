@@ -0,0 +1,48 @@
+import io
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from library.importers import DEFAULT_BATCH_SIZE, FORMATS, import_books
+
+
+class Command(BaseCommand):
+    help = 'Import books from a CSV or JSONL file, upserting on (title, author, publication_year).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or '-' to read from stdin.")
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='Input format. Defaults to the file extension.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Number of books written per transaction.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format'] or path.rsplit('.', 1)[-1].lower()
+        if format not in FORMATS:
+            raise CommandError(f"Can't tell the format of {path!r}; pass --format csv or --format jsonl.")
+
+        if path == '-':
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline='')
+            report = import_books(stream, format, options['batch_size'])
+        else:
+            try:
+                with open(path, encoding='utf-8', newline='') as stream:
+                    report = import_books(stream, format, options['batch_size'])
+            except OSError as exc:
+                raise CommandError(str(exc))
+
+        for error in report.errors:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {report.imported} books, {report.failed} rows rejected.'
+        ))
+        if report.error:
+            raise CommandError(report.error)
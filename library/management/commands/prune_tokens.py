@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from library.blacklist import blacklist
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete expired outstanding tokens, and their blacklist entries, in '
+        'small batches. Meant to run periodically from cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of tokens deleted per transaction.'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0,
+            help='Seconds to pause between batches to let other writers in.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        now = timezone.now()
+
+        # Unlike flushexpiredtokens' single DELETE, each batch holds the write
+        # lock only briefly, so logins and refreshes keep going meanwhile.
+        deleted = 0
+        while True:
+            ids = list(
+                OutstandingToken.objects.filter(expires_at__lte=now)
+                .order_by('expires_at')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                OutstandingToken.objects.filter(pk__in=ids).delete()
+            deleted += len(ids)
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        # Only this process's filter is dropped; web processes rebuild theirs
+        # once it fills up, or when they restart.
+        blacklist.reset()
+        self.stdout.write(self.style.SUCCESS(f'Pruned {deleted} expired tokens.'))
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+
+from library import leaderboard, response_cache
+from library.models import Book, Loan
+
+
+class Command(BaseCommand):
+    help = 'Recompute Book.loan_count from the loan history.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Number of books updated per transaction.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        loans = (
+            Loan.objects.filter(book=models.OuterRef('pk'))
+            .values('book')
+            .annotate(total=models.Count('id'))
+            .values('total')
+        )
+        loan_count = models.functions.Coalesce(models.Subquery(loans), 0)
+
+        # Walk the books in primary key ranges so each UPDATE holds the write
+        # lock briefly instead of once over the whole table.
+        last_id = 0
+        updated = 0
+        while True:
+            ids = list(
+                Book.objects.filter(pk__gt=last_id)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                updated += Book.objects.filter(pk__gte=ids[0], pk__lte=ids[-1]).update(loan_count=loan_count)
+            last_id = ids[-1]
+
+        leaderboard.invalidate()
+        response_cache.invalidate_catalog()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt loan counts for {updated} books.'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from library import inventory, response_cache
+
+
+class Command(BaseCommand):
+    help = 'Recompute Book.available_copies and is_available from the active loans.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=inventory.DEFAULT_CHUNK_SIZE,
+            help='Number of books checked per transaction.'
+        )
+
+    def handle(self, *args, **options):
+        fixed = inventory.reconcile(chunk_size=max(options['chunk_size'], 1))
+        if fixed:
+            response_cache.invalidate_catalog()
+        self.stdout.write(self.style.SUCCESS(f'Corrected the copy counters of {fixed} books.'))
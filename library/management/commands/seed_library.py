@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from library.seeding import DEFAULT_BATCH_SIZE, seed
+
+
+class Command(BaseCommand):
+    help = 'Fill the database with synthetic books, readers and loans for load testing.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=1000)
+        parser.add_argument('--readers', type=int, default=100)
+        parser.add_argument('--loans', type=int, default=10000)
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Number of rows inserted per transaction.'
+        )
+        parser.add_argument('--password', help='Password for the seeded users. Defaults to none (unusable).')
+        parser.add_argument('--seed', type=int, help='Random seed, for reproducible data.')
+
+    def handle(self, *args, **options):
+        if min(options['books'], options['readers'], options['loans']) < 0 or options['batch_size'] < 1:
+            raise CommandError('Counts must not be negative and --batch-size must be positive.')
+
+        book_ids, reader_ids = seed(
+            options['books'],
+            options['readers'],
+            options['loans'],
+            batch_size=options['batch_size'],
+            password=options['password'],
+            seed=options['seed']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(book_ids)} books, {len(reader_ids)} readers and {options['loans']} loans."
+        ))
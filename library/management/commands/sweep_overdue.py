@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from library.overdue import DEFAULT_CHUNK_SIZE, sweep
+
+
+class Command(BaseCommand):
+    help = 'Record overdue days and fines on every overdue loan. Meant to run nightly.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Number of loans updated per transaction.'
+        )
+
+    def handle(self, *args, **options):
+        result = sweep(chunk_size=max(options['chunk_size'], 1))
+        elapsed = (result.finished_at - result.started_at).total_seconds()
+        self.stdout.write(self.style.SUCCESS(
+            f'{result.overdue_loans} overdue loans across {result.readers} readers, '
+            f'{result.total_fine} in fines ({result.chunks} chunks, {elapsed:.1f}s).'
+        ))
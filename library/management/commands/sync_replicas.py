@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from library.routers import copy_sqlite, replicas
+
+
+class Command(BaseCommand):
+    help = 'Copy the primary SQLite database to every SQLite replica, for local replica testing.'
+
+    def handle(self, *args, **options):
+        if connections['default'].vendor != 'sqlite':
+            raise CommandError('Only SQLite replicas can be synced this way; use real replication otherwise.')
+        aliases = replicas()
+        if not aliases:
+            raise CommandError('No replicas configured; set DATABASE_REPLICAS.')
+        for alias in aliases:
+            copy_sqlite('default', alias)
+            self.stdout.write(self.style.SUCCESS(f'Synced {alias}.'))
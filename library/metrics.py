@@ -0,0 +1,271 @@
+"""
+In-process request and SQL metrics, exposed in Prometheus text format.
+
+``MetricsMiddleware`` times every request and, through a database execute
+wrapper, counts its queries and SQL time. Each finished request is folded
+into pre-aggregated per-route counters under one short lock, so recording
+costs a few dictionary updates and scraping ``/metrics`` never walks raw
+samples. Routes are labeled by URL name (``book-list``), which keeps label
+cardinality bounded.
+
+A request that runs the same SQL statement ``N_PLUS_ONE_THRESHOLD`` or more
+times is counted as a likely N+1. With ``SLOW_REQUEST_SECONDS`` set, slower
+requests are logged to ``library.slow_requests`` along with their slowest
+and most repeated statements.
+
+Counters are per process: with several workers, scrape each one or
+aggregate in Prometheus. Scrapers must send ``TOKEN`` as a bearer token;
+without one configured, ``/metrics`` is only served while ``DEBUG`` is on.
+"""
+import bisect
+import contextlib
+import logging
+import threading
+import time
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from . import response_cache
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULTS = {
+    'ENABLED': True,
+    'N_PLUS_ONE_THRESHOLD': 5,
+    'SLOW_REQUEST_SECONDS': None,
+    'SLOW_REQUEST_STATEMENTS': 5,
+    'TOKEN': None,
+}
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+slow_logger = logging.getLogger('library.slow_requests')
+
+
+def _setting(name):
+    return getattr(settings, 'METRICS', {}).get(name, DEFAULTS[name])
+
+
+class RouteStats:
+    __slots__ = ('buckets', 'count', 'seconds', 'queries', 'sql_seconds', 'n_plus_one', 'statuses')
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.seconds = 0.0
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.n_plus_one = 0
+        self.statuses = Counter()
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, route, method, status, seconds, queries=0, sql_seconds=0.0, n_plus_one=False):
+        bucket = bisect.bisect_left(BUCKETS, seconds)
+        with self._lock:
+            stats = self._routes.get((route, method))
+            if stats is None:
+                stats = self._routes[(route, method)] = RouteStats()
+            stats.buckets[bucket] += 1
+            stats.count += 1
+            stats.seconds += seconds
+            stats.queries += queries
+            stats.sql_seconds += sql_seconds
+            stats.n_plus_one += n_plus_one
+            stats.statuses[status] += 1
+
+    def snapshot(self):
+        """Return a copy of the per-(route, method) stats."""
+        with self._lock:
+            copies = {}
+            for key, stats in self._routes.items():
+                copy = copies[key] = RouteStats()
+                for name in RouteStats.__slots__:
+                    setattr(copy, name, getattr(stats, name))
+                copy.buckets = list(stats.buckets)
+                copy.statuses = Counter(stats.statuses)
+            return copies
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+registry = Registry()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def render():
+    """Return every metric in the Prometheus text exposition format."""
+    snapshot = sorted(registry.snapshot().items())
+    lines = []
+
+    def header(name, kind, text):
+        lines.append(f'# HELP {name} {text}')
+        lines.append(f'# TYPE {name} {kind}')
+
+    name = 'library_http_request_duration_seconds'
+    header(name, 'histogram', 'Request latency by route.')
+    for (route, method), stats in snapshot:
+        cumulative = 0
+        for bound, observed in zip(BUCKETS + ('+Inf',), stats.buckets):
+            cumulative += observed
+            lines.append(f'{name}_bucket{_labels(route=route, method=method, le=bound)} {cumulative}')
+        lines.append(f'{name}_sum{_labels(route=route, method=method)} {stats.seconds}')
+        lines.append(f'{name}_count{_labels(route=route, method=method)} {stats.count}')
+
+    header('library_http_responses_total', 'counter', 'Responses by route and status code.')
+    for (route, method), stats in snapshot:
+        for status, count in sorted(stats.statuses.items()):
+            lines.append(f'library_http_responses_total{_labels(route=route, method=method, status=status)} {count}')
+
+    for name, attribute, text in (
+        ('library_sql_queries_total', 'queries', 'SQL queries run while serving requests.'),
+        ('library_sql_seconds_total', 'sql_seconds', 'Time spent in SQL while serving requests.'),
+        ('library_n_plus_one_requests_total', 'n_plus_one', 'Requests that repeated one SQL statement.'),
+    ):
+        header(name, 'counter', text)
+        for (route, method), stats in snapshot:
+            lines.append(f'{name}{_labels(route=route, method=method)} {getattr(stats, attribute)}')
+
+    header('library_response_cache_events_total', 'counter', 'Response cache lookups by outcome.')
+    for event, count in response_cache.stats().items():
+        lines.append(f'library_response_cache_events_total{_labels(event=event)} {count}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    token = _setting('TOKEN')
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponse('Set METRICS_TOKEN to enable /metrics.', status=403, content_type='text/plain')
+    elif not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=401)
+    return HttpResponse(render(), content_type=CONTENT_TYPE)
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper counting and timing the queries of a request.
+    """
+
+    def __init__(self, keep_timings):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+        self.timings = [] if keep_timings else None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.seconds += elapsed
+            self.statements[sql] += 1
+            if self.timings is not None:
+                self.timings.append((elapsed, sql))
+
+    def repeated(self, threshold):
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+
+def _route(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match.route
+
+
+class MetricsMiddleware:
+    """
+    Records latency, status and SQL usage of every request.
+
+    Under ASGI, async views run their queries in worker threads, outside the
+    execute wrapper, so their SQL isn't counted; their latency is.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not _setting('ENABLED'):
+            return self.get_response(request)
+
+        slow_after = _setting('SLOW_REQUEST_SECONDS')
+        recorder = QueryRecorder(keep_timings=slow_after is not None)
+        started = time.perf_counter()
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        self._finish(request, response, time.perf_counter() - started, recorder, slow_after)
+        return response
+
+    async def __acall__(self, request):
+        if not _setting('ENABLED'):
+            return await self.get_response(request)
+
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self._finish(request, response, time.perf_counter() - started, None, None)
+        return response
+
+    def _finish(self, request, response, seconds, recorder, slow_after):
+        route = _route(request)
+        if route == 'metrics':
+            return
+
+        threshold = _setting('N_PLUS_ONE_THRESHOLD')
+        repeated = recorder.repeated(threshold) if recorder is not None else []
+        registry.record(
+            route,
+            request.method,
+            response.status_code,
+            seconds,
+            recorder.count if recorder is not None else 0,
+            recorder.seconds if recorder is not None else 0.0,
+            bool(repeated)
+        )
+
+        if slow_after is not None and seconds >= slow_after:
+            self._log_slow(request, response, seconds, recorder, repeated)
+
+    def _log_slow(self, request, response, seconds, recorder, repeated):
+        limit = _setting('SLOW_REQUEST_STATEMENTS')
+        slowest = sorted(recorder.timings, reverse=True)[:limit]
+        details = [f'  {elapsed * 1000:.1f} ms  {sql}' for elapsed, sql in slowest]
+        details += [f'  x{count}  {sql}' for sql, count in repeated[:limit]]
+        slow_logger.warning(
+            'Slow request: %s %s -> %s in %.0f ms, %d queries (%.0f ms SQL)\n%s',
+            request.method,
+            request.get_full_path(),
+            response.status_code,
+            seconds * 1000,
+            recorder.count,
+            recorder.seconds * 1000,
+            '\n'.join(details)
+        )
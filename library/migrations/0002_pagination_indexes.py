@@ -0,0 +1,27 @@
+# Generated by Django 5.1.3 on 2026-10-18 01:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['created_at', 'id'], name='book_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(fields=['loan_date', 'id'], name='loan_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reader',
+            index=models.Index(fields=['created_at', 'id'], name='reader_created_id_idx'),
+        ),
+    ]
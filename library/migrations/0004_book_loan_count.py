@@ -0,0 +1,35 @@
+# Generated by Django 5.1.3 on 2026-10-18 02:03
+
+from django.db import migrations, models
+
+
+def count_loans(apps, schema_editor):
+    Book = apps.get_model('library', 'Book')
+    Loan = apps.get_model('library', 'Loan')
+    loans = (
+        Loan.objects.filter(book=models.OuterRef('pk'))
+        .values('book')
+        .annotate(total=models.Count('id'))
+        .values('total')
+    )
+    Book.objects.update(loan_count=models.functions.Coalesce(models.Subquery(loans), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0003_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='loan_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['-loan_count', 'id'], name='book_loan_count_idx'),
+        ),
+        migrations.RunPython(count_loans, migrations.RunPython.noop),
+    ]
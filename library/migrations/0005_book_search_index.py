@@ -0,0 +1,69 @@
+from django.db import migrations
+
+# Trigger SQL as of this migration, copied here so that later changes to the
+# triggers don't change what it does.
+SQLITE_SEARCH_TRIGGERS = [
+    ('library_book_fts_insert', """
+        CREATE TRIGGER library_book_fts_insert AFTER INSERT ON library_book BEGIN
+            INSERT INTO library_book_fts(rowid, title, author, genre)
+            VALUES (new.id, new.title, new.author, new.genre);
+        END
+    """),
+    ('library_book_fts_delete', """
+        CREATE TRIGGER library_book_fts_delete AFTER DELETE ON library_book BEGIN
+            INSERT INTO library_book_fts(library_book_fts, rowid, title, author, genre)
+            VALUES ('delete', old.id, old.title, old.author, old.genre);
+        END
+    """),
+    ('library_book_fts_update', """
+        CREATE TRIGGER library_book_fts_update AFTER UPDATE OF title, author, genre ON library_book BEGIN
+            INSERT INTO library_book_fts(library_book_fts, rowid, title, author, genre)
+            VALUES ('delete', old.id, old.title, old.author, old.genre);
+            INSERT INTO library_book_fts(rowid, title, author, genre)
+            VALUES (new.id, new.title, new.author, new.genre);
+        END
+    """),
+]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute("""
+            CREATE VIRTUAL TABLE library_book_fts USING fts5(
+                title, author, genre,
+                content='library_book',
+                content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+        for name, create in SQLITE_SEARCH_TRIGGERS:
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            schema_editor.execute(create)
+        schema_editor.execute("INSERT INTO library_book_fts(library_book_fts) VALUES ('rebuild')")
+    elif vendor == 'postgresql':
+        schema_editor.execute("""
+            CREATE INDEX library_book_search_idx ON library_book
+            USING GIN (to_tsvector('simple', title || ' ' || author || ' ' || genre))
+        """)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for name, _ in SQLITE_SEARCH_TRIGGERS:
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        schema_editor.execute('DROP TABLE IF EXISTS library_book_fts')
+    elif vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS library_book_search_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0004_book_loan_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,121 @@
+# Generated by Django 5.1.3 on 2026-10-18 02:06
+
+from django.db import migrations, models
+
+# Trigger SQL as of this migration, copied here so that later changes to the
+# triggers don't change what it does.
+SQLITE_FACET_TRIGGERS = [
+    ('library_book_facet_insert', """
+        CREATE TRIGGER library_book_facet_insert AFTER INSERT ON library_book BEGIN
+            INSERT INTO library_bookfacetcount (genre, decade, is_available, count)
+            VALUES (new.genre, (new.publication_year / 10) * 10, new.is_available, 1)
+            ON CONFLICT (genre, decade, is_available) DO UPDATE SET count = count + 1;
+        END
+    """),
+    ('library_book_facet_delete', """
+        CREATE TRIGGER library_book_facet_delete AFTER DELETE ON library_book BEGIN
+            UPDATE library_bookfacetcount SET count = count - 1
+            WHERE genre = old.genre
+              AND decade = (old.publication_year / 10) * 10
+              AND is_available = old.is_available;
+        END
+    """),
+    ('library_book_facet_update', """
+        CREATE TRIGGER library_book_facet_update
+        AFTER UPDATE OF genre, publication_year, is_available ON library_book
+        WHEN old.genre IS NOT new.genre
+          OR (old.publication_year / 10) IS NOT (new.publication_year / 10)
+          OR old.is_available IS NOT new.is_available
+        BEGIN
+            UPDATE library_bookfacetcount SET count = count - 1
+            WHERE genre = old.genre
+              AND decade = (old.publication_year / 10) * 10
+              AND is_available = old.is_available;
+            INSERT INTO library_bookfacetcount (genre, decade, is_available, count)
+            VALUES (new.genre, (new.publication_year / 10) * 10, new.is_available, 1)
+            ON CONFLICT (genre, decade, is_available) DO UPDATE SET count = count + 1;
+        END
+    """),
+]
+
+POSTGRESQL_FACET_TRIGGER = """
+    CREATE OR REPLACE FUNCTION library_book_facet_count() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE library_bookfacetcount SET count = count - 1
+            WHERE genre = OLD.genre
+              AND decade = (OLD.publication_year / 10) * 10
+              AND is_available = OLD.is_available;
+        END IF;
+        IF TG_OP IN ('UPDATE', 'INSERT') THEN
+            INSERT INTO library_bookfacetcount (genre, decade, is_available, count)
+            VALUES (NEW.genre, (NEW.publication_year / 10) * 10, NEW.is_available, 1)
+            ON CONFLICT (genre, decade, is_available)
+            DO UPDATE SET count = library_bookfacetcount.count + 1;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql;
+
+    CREATE TRIGGER library_book_facet_count
+    AFTER INSERT OR DELETE OR UPDATE OF genre, publication_year, is_available ON library_book
+    FOR EACH ROW EXECUTE FUNCTION library_book_facet_count();
+"""
+
+POPULATE = """
+    INSERT INTO library_bookfacetcount (genre, decade, is_available, count)
+    SELECT genre, (publication_year / 10) * 10, is_available, COUNT(*)
+    FROM library_book
+    GROUP BY genre, (publication_year / 10) * 10, is_available
+"""
+
+
+def install_facet_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for name, create in SQLITE_FACET_TRIGGERS:
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            schema_editor.execute(create)
+    elif vendor == 'postgresql':
+        schema_editor.execute('DROP TRIGGER IF EXISTS library_book_facet_count ON library_book')
+        schema_editor.execute(POSTGRESQL_FACET_TRIGGER)
+
+
+def uninstall_facet_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for name, _ in SQLITE_FACET_TRIGGERS:
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}')
+    elif vendor == 'postgresql':
+        schema_editor.execute('DROP TRIGGER IF EXISTS library_book_facet_count ON library_book')
+        schema_editor.execute('DROP FUNCTION IF EXISTS library_book_facet_count()')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0005_book_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('genre', models.CharField(max_length=100)),
+                ('decade', models.IntegerField()),
+                ('is_available', models.BooleanField()),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['author'], name='book_author_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='bookfacetcount',
+            constraint=models.UniqueConstraint(fields=('genre', 'decade', 'is_available'), name='book_facet_unique'),
+        ),
+        migrations.RunSQL(POPULATE, migrations.RunSQL.noop),
+        migrations.RunPython(install_facet_triggers, uninstall_facet_triggers),
+    ]
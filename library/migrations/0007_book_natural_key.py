@@ -0,0 +1,118 @@
+# Generated by Django 5.1.3 on 2026-10-18 02:07
+
+from django.db import migrations, models
+
+# Trigger SQL as of this migration, copied here so that later changes to the
+# triggers don't change what it does.
+SQLITE_SEARCH_TRIGGERS = [
+    ('library_book_fts_insert', """
+        CREATE TRIGGER library_book_fts_insert AFTER INSERT ON library_book BEGIN
+            INSERT INTO library_book_fts(rowid, title, author, genre)
+            VALUES (new.id, new.title, new.author, new.genre);
+        END
+    """),
+    ('library_book_fts_delete', """
+        CREATE TRIGGER library_book_fts_delete AFTER DELETE ON library_book BEGIN
+            INSERT INTO library_book_fts(library_book_fts, rowid, title, author, genre)
+            VALUES ('delete', old.id, old.title, old.author, old.genre);
+        END
+    """),
+    ('library_book_fts_update', """
+        CREATE TRIGGER library_book_fts_update AFTER UPDATE OF title, author, genre ON library_book BEGIN
+            INSERT INTO library_book_fts(library_book_fts, rowid, title, author, genre)
+            VALUES ('delete', old.id, old.title, old.author, old.genre);
+            INSERT INTO library_book_fts(rowid, title, author, genre)
+            VALUES (new.id, new.title, new.author, new.genre);
+        END
+    """),
+]
+
+SQLITE_FACET_TRIGGERS = [
+    ('library_book_facet_insert', """
+        CREATE TRIGGER library_book_facet_insert AFTER INSERT ON library_book BEGIN
+            INSERT INTO library_bookfacetcount (genre, decade, is_available, count)
+            VALUES (new.genre, (new.publication_year / 10) * 10, new.is_available, 1)
+            ON CONFLICT (genre, decade, is_available) DO UPDATE SET count = count + 1;
+        END
+    """),
+    ('library_book_facet_delete', """
+        CREATE TRIGGER library_book_facet_delete AFTER DELETE ON library_book BEGIN
+            UPDATE library_bookfacetcount SET count = count - 1
+            WHERE genre = old.genre
+              AND decade = (old.publication_year / 10) * 10
+              AND is_available = old.is_available;
+        END
+    """),
+    ('library_book_facet_update', """
+        CREATE TRIGGER library_book_facet_update
+        AFTER UPDATE OF genre, publication_year, is_available ON library_book
+        WHEN old.genre IS NOT new.genre
+          OR (old.publication_year / 10) IS NOT (new.publication_year / 10)
+          OR old.is_available IS NOT new.is_available
+        BEGIN
+            UPDATE library_bookfacetcount SET count = count - 1
+            WHERE genre = old.genre
+              AND decade = (old.publication_year / 10) * 10
+              AND is_available = old.is_available;
+            INSERT INTO library_bookfacetcount (genre, decade, is_available, count)
+            VALUES (new.genre, (new.publication_year / 10) * 10, new.is_available, 1)
+            ON CONFLICT (genre, decade, is_available) DO UPDATE SET count = count + 1;
+        END
+    """),
+]
+
+
+def reinstall_book_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for name, create in SQLITE_SEARCH_TRIGGERS + SQLITE_FACET_TRIGGERS:
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        schema_editor.execute(create)
+
+
+def merge_duplicate_books(apps, schema_editor):
+    """
+    Fold books sharing a title, author and publication year into the oldest
+    of them, so the natural key can be enforced: their loans move over, loan
+    counts add up, the title stays available if any duplicate was, and it
+    keeps a cover if any duplicate had one.
+    """
+    Book = apps.get_model('library', 'Book')
+    Loan = apps.get_model('library', 'Loan')
+    duplicates = (
+        Book.objects.order_by()
+        .values('title', 'author', 'publication_year')
+        .annotate(books=models.Count('id'), keep=models.Min('id'))
+        .filter(books__gt=1)
+    )
+    for key in list(duplicates):
+        del key['books']
+        kept = Book.objects.get(pk=key.pop('keep'))
+        others = Book.objects.filter(**key).exclude(pk=kept.pk)
+
+        kept.loan_count += others.aggregate(total=models.Sum('loan_count'))['total']
+        kept.is_available = kept.is_available or others.filter(is_available=True).exists()
+        if not kept.cover_image:
+            kept.cover_image = others.exclude(cover_image='').exclude(cover_image=None).values_list(
+                'cover_image', flat=True
+            ).first()
+        kept.save(update_fields=['loan_count', 'is_available', 'cover_image', 'updated_at'])
+        Loan.objects.filter(book__in=others).update(book=kept)
+        others.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0006_bookfacetcount'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_books, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='book',
+            constraint=models.UniqueConstraint(fields=('title', 'author', 'publication_year'), name='book_natural_key'),
+        ),
+        # SQLite rebuilds library_book to add the constraint, dropping its triggers.
+        migrations.RunPython(reinstall_book_triggers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Index token_blacklist's OutstandingToken.expires_at so prune_tokens and
+    the blacklist warm-up can range-scan expired/live tokens. The model
+    belongs to simplejwt, so the index is created directly.
+    """
+
+    dependencies = [
+        ('library', '0008_updated_at_indexes'),
+        ('token_blacklist', '0012_alter_outstandingtoken_user'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS library_outstanding_expires_idx '
+            'ON token_blacklist_outstandingtoken (expires_at)',
+            'DROP INDEX IF EXISTS library_outstanding_expires_idx',
+        ),
+    ]
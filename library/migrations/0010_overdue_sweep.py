@@ -0,0 +1,42 @@
+# Generated by Django 5.1.3 on 2026-10-18 02:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0009_outstanding_token_expiry_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OverdueSweep',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField()),
+                ('overdue_loans', models.PositiveIntegerField()),
+                ('readers', models.PositiveIntegerField()),
+                ('total_fine', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('chunks', models.PositiveIntegerField()),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='loan',
+            name='fine',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AddField(
+            model_name='loan',
+            name='overdue_days',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(condition=models.Q(('returned', False)), fields=['return_date', 'id'], name='loan_overdue_idx'),
+        ),
+    ]
@@ -0,0 +1,115 @@
+# Generated by Django 5.1.3 on 2026-10-18 02:58
+
+import django.core.validators
+from django.db import migrations, models
+from django.db.models.functions import Coalesce, Greatest
+
+# Trigger SQL as of this migration, copied here so that later changes to the
+# triggers don't change what it does.
+SQLITE_SEARCH_TRIGGERS = [
+    ('library_book_fts_insert', """
+        CREATE TRIGGER library_book_fts_insert AFTER INSERT ON library_book BEGIN
+            INSERT INTO library_book_fts(rowid, title, author, genre)
+            VALUES (new.id, new.title, new.author, new.genre);
+        END
+    """),
+    ('library_book_fts_delete', """
+        CREATE TRIGGER library_book_fts_delete AFTER DELETE ON library_book BEGIN
+            INSERT INTO library_book_fts(library_book_fts, rowid, title, author, genre)
+            VALUES ('delete', old.id, old.title, old.author, old.genre);
+        END
+    """),
+    ('library_book_fts_update', """
+        CREATE TRIGGER library_book_fts_update AFTER UPDATE OF title, author, genre ON library_book BEGIN
+            INSERT INTO library_book_fts(library_book_fts, rowid, title, author, genre)
+            VALUES ('delete', old.id, old.title, old.author, old.genre);
+            INSERT INTO library_book_fts(rowid, title, author, genre)
+            VALUES (new.id, new.title, new.author, new.genre);
+        END
+    """),
+]
+
+SQLITE_FACET_TRIGGERS = [
+    ('library_book_facet_insert', """
+        CREATE TRIGGER library_book_facet_insert AFTER INSERT ON library_book BEGIN
+            INSERT INTO library_bookfacetcount (genre, decade, is_available, count)
+            VALUES (new.genre, (new.publication_year / 10) * 10, new.is_available, 1)
+            ON CONFLICT (genre, decade, is_available) DO UPDATE SET count = count + 1;
+        END
+    """),
+    ('library_book_facet_delete', """
+        CREATE TRIGGER library_book_facet_delete AFTER DELETE ON library_book BEGIN
+            UPDATE library_bookfacetcount SET count = count - 1
+            WHERE genre = old.genre
+              AND decade = (old.publication_year / 10) * 10
+              AND is_available = old.is_available;
+        END
+    """),
+    ('library_book_facet_update', """
+        CREATE TRIGGER library_book_facet_update
+        AFTER UPDATE OF genre, publication_year, is_available ON library_book
+        WHEN old.genre IS NOT new.genre
+          OR (old.publication_year / 10) IS NOT (new.publication_year / 10)
+          OR old.is_available IS NOT new.is_available
+        BEGIN
+            UPDATE library_bookfacetcount SET count = count - 1
+            WHERE genre = old.genre
+              AND decade = (old.publication_year / 10) * 10
+              AND is_available = old.is_available;
+            INSERT INTO library_bookfacetcount (genre, decade, is_available, count)
+            VALUES (new.genre, (new.publication_year / 10) * 10, new.is_available, 1)
+            ON CONFLICT (genre, decade, is_available) DO UPDATE SET count = count + 1;
+        END
+    """),
+]
+
+
+def reinstall_book_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for name, create in SQLITE_SEARCH_TRIGGERS + SQLITE_FACET_TRIGGERS:
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        schema_editor.execute(create)
+
+
+def copies_from_availability(apps, schema_editor):
+    # A book has one copy on the shelf if available, plus one per active
+    # loan; more than one only for titles 0007 merged from duplicates.
+    Book = apps.get_model('library', 'Book')
+    Loan = apps.get_model('library', 'Loan')
+    active = (
+        Loan.objects.filter(book=models.OuterRef('pk'), returned=False)
+        .order_by()
+        .values('book')
+        .annotate(total=models.Count('id'))
+        .values('total')
+    )
+    Book.objects.filter(is_available=False).update(available_copies=0)
+    Book.objects.update(total_copies=Greatest(models.F('available_copies') + Coalesce(models.Subquery(active), 0), 1))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0010_overdue_sweep'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='available_copies',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='total_copies',
+            field=models.PositiveIntegerField(default=1, validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+        migrations.AddConstraint(
+            model_name='book',
+            constraint=models.CheckConstraint(condition=models.Q(('available_copies__lte', models.F('total_copies'))), name='book_available_copies_lte_total'),
+        ),
+        migrations.RunPython(copies_from_availability, migrations.RunPython.noop),
+        # SQLite rebuilds library_book to add the columns, dropping its triggers.
+        migrations.RunPython(reinstall_book_triggers, migrations.RunPython.noop),
+    ]
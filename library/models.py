@@ -1,3 +1,4 @@
+from django.core.validators import MinValueValidator
 from django.db import models
 from django.contrib.auth.models import User
 
@@ -23,20 +24,67 @@ class Book(models.Model):
         blank=True, 
         verbose_name='Book Cover'
     )
-    is_available = models.BooleanField(default=True)  # New field
+    # Maintained by library.inventory: available_copies > 0.
+    is_available = models.BooleanField(default=True)
+    total_copies = models.PositiveIntegerField(default=1, validators=[MinValueValidator(1)])
+    available_copies = models.PositiveIntegerField(default=1)
+    loan_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['title', 'author', 'publication_year'], name='book_natural_key'),
+            models.CheckConstraint(
+                condition=models.Q(available_copies__lte=models.F('total_copies')),
+                name='book_available_copies_lte_total'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='book_created_id_idx'),
+            models.Index(fields=['updated_at'], name='book_updated_idx'),
+            models.Index(fields=['genre'], name='book_genre_idx'),
+            models.Index(fields=['author'], name='book_author_idx'),
+            models.Index(fields=['publication_year'], name='book_pub_year_idx'),
+            models.Index(fields=['-loan_count', 'id'], name='book_loan_count_idx'),
+            models.Index(
+                fields=['id'],
+                condition=models.Q(is_available=False),
+                name='book_unavailable_idx'
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
     def update_availability(self):
         """
-        Update book availability based on active loans.
+        Recompute the copy counters from active loans.
         """
-        active_loans = self.loan_set.filter(returned=False).exists()
-        self.is_available = not active_loans
-        self.save()
+        from .inventory import reconcile
+        reconcile(Book.objects.filter(pk=self.pk))
+        self.refresh_from_db(fields=['available_copies', 'is_available', 'updated_at'])
+
+
+class BookFacetCount(models.Model):
+    """
+    Number of books per (genre, decade, availability) combination.
+
+    Rows are maintained by database triggers on library_book (see migration
+    0006_bookfacetcount), so they also follow bulk and queryset updates.
+    """
+    genre = models.CharField(max_length=100)
+    decade = models.IntegerField()
+    is_available = models.BooleanField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['genre', 'decade', 'is_available'], name='book_facet_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.genre} / {self.decade}s / {'available' if self.is_available else 'loaned'}: {self.count}"
 
 
 class Reader(models.Model):
@@ -52,6 +100,12 @@ class Reader(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='reader_created_id_idx'),
+            models.Index(fields=['updated_at'], name='reader_updated_idx'),
+        ]
+
     def __str__(self):
         return self.user.username
 
@@ -63,6 +117,50 @@ class Loan(models.Model):
     return_date = models.DateTimeField()
     returned = models.BooleanField(default=False)
     actual_return_date = models.DateTimeField(null=True, blank=True)
+    # Set by the overdue sweep (library.overdue) for loans past return_date.
+    overdue_days = models.PositiveIntegerField(default=0)
+    fine = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['loan_date', 'id'], name='loan_date_id_idx'),
+            # Only active loans are ever looked up by reader or book, and they
+            # are a small slice of the loan history, so index just those rows.
+            models.Index(
+                fields=['reader'],
+                condition=models.Q(returned=False),
+                name='loan_active_reader_idx'
+            ),
+            models.Index(
+                fields=['book'],
+                condition=models.Q(returned=False),
+                name='loan_active_book_idx'
+            ),
+            # Keyset order for the overdue sweep and the staff overdue list.
+            models.Index(
+                fields=['return_date', 'id'],
+                condition=models.Q(returned=False),
+                name='loan_overdue_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.book.title} - {self.reader.user.username}"
+
+
+class OverdueSweep(models.Model):
+    """
+    Summary of one run of the overdue sweep.
+    """
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    overdue_loans = models.PositiveIntegerField()
+    readers = models.PositiveIntegerField()
+    total_fine = models.DecimalField(max_digits=12, decimal_places=2)
+    chunks = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"Sweep at {self.started_at:%Y-%m-%d %H:%M}: {self.overdue_loans} overdue loans"
@@ -0,0 +1,95 @@
+"""
+Library-wide overdue sweep.
+
+Overdue loans are walked in ``(return_date, id)`` keyset order through the
+partial ``loan_overdue_idx`` index over active loans, a chunk at a time, so
+memory stays flat however many loans are active. Each chunk is updated with
+one ``UPDATE`` that computes the overdue days and fine in SQL, and the run is
+summarized in an ``OverdueSweep`` row.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+
+from .models import Loan, OverdueSweep
+
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_FINE_PER_DAY = Decimal('0.50')
+
+
+class OverdueDays(models.Func):
+    """
+    Whole days elapsed between `now` and a loan's ``return_date``.
+    """
+    output_field = models.IntegerField()
+
+    def __init__(self, now):
+        super().__init__(models.Value(now, output_field=models.DateTimeField()), models.F('return_date'))
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            template='CAST(julianday(%(expressions)s) AS INTEGER)',
+            arg_joiner=') - julianday(',
+            **extra_context
+        )
+
+    def as_sql(self, compiler, connection, **extra_context):
+        extra_context.setdefault('template', 'CAST(FLOOR(EXTRACT(EPOCH FROM (%(expressions)s)) / 86400) AS INTEGER)')
+        extra_context.setdefault('arg_joiner', ' - ')
+        return super().as_sql(compiler, connection, **extra_context)
+
+
+def fine_per_day():
+    return Decimal(str(getattr(settings, 'LOAN_FINE_PER_DAY', DEFAULT_FINE_PER_DAY)))
+
+
+def overdue_loans(now=None):
+    return Loan.objects.filter(returned=False, return_date__lt=now or timezone.now())
+
+
+def sweep(now=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Record overdue days and fines on every overdue loan and return the
+    `OverdueSweep` summarizing the run.
+    """
+    now = now or timezone.now()
+    started_at = timezone.now()
+    overdue = overdue_loans(now).order_by('return_date', 'id')
+    days = OverdueDays(now)
+    rate = fine_per_day()
+
+    chunks = 0
+    last = None
+    while True:
+        chunk = overdue
+        if last is not None:
+            chunk = chunk.filter(
+                models.Q(return_date__gt=last[0]) | models.Q(return_date=last[0], id__gt=last[1])
+            )
+        rows = list(chunk.values_list('return_date', 'id')[:chunk_size])
+        if not rows:
+            break
+        with transaction.atomic():
+            Loan.objects.filter(pk__in=[pk for _, pk in rows]).update(
+                overdue_days=days,
+                fine=models.ExpressionWrapper(days * rate, output_field=models.DecimalField())
+            )
+        chunks += 1
+        last = rows[-1]
+
+    totals = overdue_loans(now).aggregate(
+        loans=models.Count('id'),
+        readers=models.Count('reader', distinct=True),
+        fine=models.Sum('fine')
+    )
+    return OverdueSweep.objects.create(
+        started_at=started_at,
+        finished_at=timezone.now(),
+        overdue_loans=totals['loans'],
+        readers=totals['readers'],
+        total_fine=totals['fine'] or 0,
+        chunks=chunks
+    )
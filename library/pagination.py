@@ -0,0 +1,84 @@
+from asgiref.sync import sync_to_async
+from django.core.paginator import Paginator
+from django.db import connections, models
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Opaque cursor pagination ordered by creation time.
+
+    The cursor encodes the position of the last row served, so each page is
+    a range scan on the (created_at, id) index instead of an OFFSET, and rows
+    inserted while a client is paging never shift the pages it has yet to read.
+    """
+    ordering = ('created_at', 'id')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        # DRF paginates synchronously; run its single query in a thread.
+        return await sync_to_async(self.paginate_queryset)(queryset, request, view)
+
+
+class LoanCursorPagination(CreatedAtCursorPagination):
+    ordering = ('loan_date', 'id')
+
+
+class OverdueCursorPagination(CreatedAtCursorPagination):
+    """
+    Overdue loans, most overdue first, over the loan_overdue_idx index.
+    """
+    ordering = ('return_date', 'id')
+
+
+class SearchPagination(PageNumberPagination):
+    """
+    Numbered pages for relevance-ranked results, which have no stable
+    column to put a cursor on.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+def estimated_count(queryset):
+    """
+    Approximate row count of `queryset`'s table without scanning it: the
+    planner's estimate on PostgreSQL, the highest primary key elsewhere
+    (which counts deleted rows too).
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                           [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        # -1 until the table is first analyzed.
+        if row and row[0] >= 0:
+            return row[0]
+    return queryset.model._default_manager.using(queryset.db).aggregate(last=models.Max('pk'))['last'] or 0
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Admin paginator that avoids ``COUNT(*)`` over large tables.
+
+    An unfiltered changelist is counted with ``estimated_count`` once the
+    table holds more than ``exact_count_limit`` rows; a filtered one counts
+    at most ``exact_count_limit`` matches, so its last pages are only
+    reachable by narrowing the filters.
+    """
+    exact_count_limit = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, models.QuerySet):
+            return super().count
+        if not queryset.query.where:
+            estimate = estimated_count(queryset)
+            if estimate > self.exact_count_limit:
+                return estimate
+            return super().count
+        return queryset.order_by()[:self.exact_count_limit].count()
@@ -0,0 +1,40 @@
+"""
+JSON rendering through orjson when it is installed.
+
+``FastJSONRenderer`` is a drop-in replacement for DRF's ``JSONRenderer``:
+without orjson, or when indentation is requested (e.g. by the browsable
+API), it renders exactly like its parent. With orjson, output is the same
+compact UTF-8 JSON; values orjson doesn't know (lazy strings, Decimals,
+datetimes) are handed to DRF's encoder, so they're formatted as before.
+The only difference is that NaN and infinities become ``null`` instead of
+raising under ``STRICT_JSON``.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    # DRF's encoder formats datetimes (UTC as 'Z') and everything else orjson
+    # can't serialize natively.
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        ret = orjson.dumps(data, default=self.encoder_class().default, option=ORJSON_OPTIONS)
+        # Like DRF, keep the output a strict JavaScript subset.
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
@@ -0,0 +1,222 @@
+"""
+Server-side cache of serialized catalog responses.
+
+Entries hold a view's serialized data plus its ETag/Last-Modified validators,
+keyed by the absolute URL (so query parameters, cursors and host-dependent
+links all get their own entry) and the negotiated format. Rather than
+tracking every URL a book appears under, each key embeds the current
+*generation* of the scopes it depends on; invalidating a scope bumps its
+generation, which orphans every entry built from it.
+
+Scopes:
+
+* ``catalog``    - everything; bumped by bulk operations
+* ``book-lists`` - book list pages and rankings; bumped by any book or loan write
+* ``book:<pk>``  - one book's detail; bumped when that book or its loans change
+
+A cache miss takes a short lock (``cache.add``) so that when a hot key
+expires one request rebuilds it while the others wait for the result
+instead of all querying the database at once.
+
+Misses are rebuilt from the primary even when the request may otherwise
+read from a replica: a lagging replica's answer, stored under the current
+generation, would be served to everyone until it expires. Clients pinned to
+the primary after a write skip the cache altogether, so they always read
+their own writes.
+"""
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+from . import routers
+from .conditional import precondition_response, set_validators
+
+DEFAULTS = {
+    'ENABLED': True,
+    'ALIAS': 'default',
+    'TIMEOUT': 60,
+    'LOCK_TIMEOUT': 10,
+    'LOCK_WAIT': 2,
+}
+LOCK_POLL_INTERVAL = 0.05
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _setting(name):
+    return getattr(settings, 'RESPONSE_CACHE', {}).get(name, DEFAULTS[name])
+
+
+def _cache():
+    return caches[_setting('ALIAS')]
+
+
+def _count(event):
+    with _stats_lock:
+        _stats[event] += 1
+
+
+def stats():
+    """Return hit/miss counters for this process."""
+    with _stats_lock:
+        return {event: _stats[event] for event in ('hit', 'miss', 'wait_hit', 'uncacheable', 'bypass')}
+
+
+def _generation_key(scope):
+    return f'library:response-generation:{scope}'
+
+
+def _generations(cache, scopes):
+    keys = [_generation_key(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # Start from the clock rather than 1, so a generation that was
+            # evicted can't come back to a value old entries were built with.
+            cache.add(key, time.time_ns(), None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def _bump(scopes):
+    cache = _cache()
+    for scope in scopes:
+        try:
+            cache.incr(_generation_key(scope))
+        except ValueError:
+            cache.set(_generation_key(scope), time.time_ns(), None)
+
+
+def _invalidate(*scopes):
+    if not _setting('ENABLED'):
+        return
+    # Bump now, so reads later in this transaction miss, and again after
+    # commit, so an entry rebuilt from pre-commit data by a concurrent
+    # request doesn't survive.
+    _bump(scopes)
+    transaction.on_commit(lambda: _bump(scopes))
+
+
+def invalidate_book(book_id):
+    _invalidate('book-lists', f'book:{book_id}')
+
+
+def invalidate_books(book_ids):
+    _invalidate('book-lists', *(f'book:{book_id}' for book_id in book_ids))
+
+
+def invalidate_catalog():
+    _invalidate('catalog')
+
+
+def _entry_key(request, cache, scopes):
+    renderer = getattr(request, 'accepted_renderer', None)
+    generations = _generations(cache, scopes)
+    url = request.build_absolute_uri()
+    digest = hashlib.sha1(repr((url, renderer.format if renderer else '', generations)).encode()).hexdigest()
+    return f'library:response:{digest}'
+
+
+def _fill(cache, key, build):
+    """
+    Build and store an entry, or wait for a concurrent request building it.
+    Returns ``(entry, None)``, or ``(None, response)`` if not cacheable.
+    """
+    lock_key = f'{key}:lock'
+    if not cache.add(lock_key, 1, _setting('LOCK_TIMEOUT')):
+        deadline = time.monotonic() + _setting('LOCK_WAIT')
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            entry = cache.get(key)
+            if entry is not None:
+                _count('wait_hit')
+                return entry, None
+        lock_key = None
+
+    try:
+        response = build()
+        if response.status_code != 200:
+            _count('uncacheable')
+            return None, response
+        entry = (
+            response.data,
+            response.get('ETag'),
+            parse_http_date_safe(response.get('Last-Modified', '')),
+        )
+        cache.set(key, entry, _setting('TIMEOUT'))
+        _count('miss')
+        return entry, None
+    finally:
+        if lock_key is not None:
+            cache.delete(lock_key)
+
+
+def serve(request, scopes, build):
+    """
+    Respond from the cache, calling `build()` to produce the response on a
+    miss. `scopes` lists the invalidation scopes the response depends on.
+    """
+    if not _setting('ENABLED'):
+        return build()
+
+    cache = _cache()
+    key = _entry_key(request, cache, ['catalog', *scopes])
+    entry = cache.get(key)
+    if entry is not None:
+        _count('hit')
+        outcome = 'HIT'
+    else:
+        entry, response = _fill(cache, key, build)
+        if response is not None:
+            return response
+        outcome = 'MISS'
+
+    data, etag, last_modified = entry
+    if etag:
+        response = precondition_response(request, etag, last_modified)
+        if response is not None:
+            return response
+    response = Response(data)
+    if etag:
+        set_validators(response, etag, last_modified)
+    response['X-Cache'] = outcome
+    return response
+
+
+class CachedResponseMixin:
+    """
+    Serves list and retrieve of a book viewset through the response cache.
+    """
+
+    def _serve(self, request, scopes, build):
+        if getattr(self, 'pinned_to_primary', False):
+            _count('bypass')
+            return build()
+        return serve(request, scopes, lambda: self._build_on_primary(build))
+
+    def _build_on_primary(self, build):
+        with routers.use_primary():
+            return build()
+
+    def list(self, request, *args, **kwargs):
+        return self._serve(
+            request,
+            ['book-lists'],
+            lambda: super(CachedResponseMixin, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        book_id = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        return self._serve(
+            request,
+            [f'book:{book_id}'],
+            lambda: super(CachedResponseMixin, self).retrieve(request, *args, **kwargs)
+        )
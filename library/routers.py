@@ -0,0 +1,171 @@
+"""
+Read-replica routing.
+
+Replicas are the database aliases listed in ``DATABASE_REPLICAS`` (built
+from the ``DATABASE_REPLICAS`` environment variable in settings). Reads are
+only sent to a replica while a view marked with ``ReplicaReadMixin`` handles
+a safe-method request; everything else, writes included, uses ``default``.
+
+Replicas are picked round-robin. One that fails to connect is skipped for
+``REPLICA_RETRY_SECONDS``, falling back to the other replicas and finally to
+``default``. After a client writes through one of those views it is pinned
+to ``default`` for ``REPLICA_PIN_SECONDS``, so it reads its own writes (a
+checkout followed by ``/loans/pending/``) despite replication lag. Pins are
+kept in the ``REPLICA_PIN_CACHE`` cache, which should be shared between
+processes so a pin holds whichever process serves the next request.
+
+Locally, list a second SQLite file as replica and refresh it from the
+primary with ``manage.py sync_replicas``.
+"""
+import contextlib
+import contextvars
+import itertools
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+DEFAULT_PIN_SECONDS = 5
+DEFAULT_RETRY_SECONDS = 30
+
+_use_replica = contextvars.ContextVar('library_use_replica', default=False)
+_turns = itertools.count()
+_down_until = {}
+_down_lock = threading.Lock()
+
+
+def replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+
+def _pin_cache():
+    return caches[getattr(settings, 'REPLICA_PIN_CACHE', 'default')]
+
+
+def _pin_key(user_id):
+    return f'library:replica-pin:{user_id}'
+
+
+def pin(user):
+    if user.is_authenticated:
+        _pin_cache().set(_pin_key(user.pk), 1, getattr(settings, 'REPLICA_PIN_SECONDS', DEFAULT_PIN_SECONDS))
+
+
+def is_pinned(user):
+    return user.is_authenticated and _pin_cache().get(_pin_key(user.pk)) is not None
+
+
+@contextlib.contextmanager
+def use_primary():
+    """Send the reads made inside the block to ``default``."""
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def mark_down(alias):
+    with _down_lock:
+        _down_until[alias] = time.monotonic() + getattr(settings, 'REPLICA_RETRY_SECONDS', DEFAULT_RETRY_SECONDS)
+
+
+def reset_health():
+    with _down_lock:
+        _down_until.clear()
+
+
+def is_healthy(alias):
+    """
+    False while `alias` is marked down. A new connection is probed with a
+    query once; an open one is trusted (CONN_HEALTH_CHECKS covers reuse).
+    """
+    with _down_lock:
+        if _down_until.get(alias, 0) > time.monotonic():
+            return False
+    connection = connections[alias]
+    if connection.connection is not None:
+        return True
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1 FROM django_migrations LIMIT 1')
+    except DatabaseError:
+        connection.close()
+        mark_down(alias)
+        return False
+    return True
+
+
+def choose_replica():
+    """Return the next healthy replica alias, or None."""
+    aliases = replicas()
+    if not aliases:
+        return None
+    start = next(_turns)
+    for offset in range(len(aliases)):
+        alias = aliases[(start + offset) % len(aliases)]
+        if is_healthy(alias):
+            return alias
+    return None
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if _use_replica.get():
+            return choose_replica() or 'default'
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema (and data) from the primary.
+        return db not in replicas()
+
+
+class ReplicaReadMixin:
+    """
+    Lets a viewset's safe-method requests read from a replica, and pins
+    clients that write through it to the primary for a while. While pinned,
+    ``pinned_to_primary`` is True for the request.
+    """
+    pinned_to_primary = False
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and replicas():
+            self.pinned_to_primary = is_pinned(request.user)
+            if not self.pinned_to_primary:
+                self._replica_token = _use_replica.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_replica_token', None)
+        if token is not None:
+            _use_replica.reset(token)
+            self._replica_token = None
+        elif request.method not in SAFE_METHODS and response.status_code < 400:
+            pin(request.user)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+def copy_sqlite(source_alias, target_alias):
+    """
+    Overwrite the SQLite database `target_alias` with a consistent snapshot
+    of `source_alias`, using SQLite's online backup.
+    """
+    connections[target_alias].close()
+    source = connections[source_alias]
+    source.ensure_connection()
+    target = sqlite3.connect(connections[target_alias].settings_dict['NAME'])
+    try:
+        source.connection.backup(target)
+    finally:
+        target.close()
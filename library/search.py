@@ -0,0 +1,108 @@
+"""
+Ranked full-text search over the book catalog.
+
+On SQLite the catalog is mirrored into the ``library_book_fts`` FTS5 table,
+which triggers keep in sync with ``library_book``; on PostgreSQL a GIN index
+over a ``tsvector`` of the same columns is used. Both are created by
+migration ``0005_book_search_index``. Other backends fall back to
+``icontains`` filters.
+"""
+import re
+
+from django.db import connections, models, router
+
+from .models import Book
+
+TOKEN_RE = re.compile(r'\w+')
+MAX_TOKENS = 8
+
+SQLITE_MATCH = 'FROM library_book_fts WHERE library_book_fts MATCH %s'
+# Column weights for bm25(): a hit in the title counts most, then author.
+SQLITE_ORDER = 'ORDER BY bm25(library_book_fts, 10.0, 5.0, 1.0), rowid'
+
+POSTGRESQL_VECTOR = "to_tsvector('simple', title || ' ' || author || ' ' || genre)"
+POSTGRESQL_MATCH = f"FROM library_book WHERE {POSTGRESQL_VECTOR} @@ to_tsquery('simple', %s)"
+POSTGRESQL_ORDER = f"ORDER BY ts_rank({POSTGRESQL_VECTOR}, to_tsquery('simple', %s)) DESC, id"
+
+
+class BookSearchResults:
+    """
+    Lazily evaluated, relevance-ordered search results.
+
+    Exposes ``count()`` and slicing so it can be handed to a paginator, which
+    then runs one query for the total and one for the requested page.
+    """
+
+    def __init__(self, query):
+        self.tokens = TOKEN_RE.findall(query.lower())[:MAX_TOKENS]
+        # Raw SQL bypasses the database router, so ask it where books are read.
+        self.db = router.db_for_read(Book)
+
+    @property
+    def vendor(self):
+        return connections[self.db].vendor
+
+    def _fetch(self, sql, params):
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def count(self):
+        if not self.tokens:
+            return 0
+        if self.vendor == 'sqlite':
+            return self._fetch(f'SELECT COUNT(*) {SQLITE_MATCH}', [self._fts5_query()])[0][0]
+        if self.vendor == 'postgresql':
+            return self._fetch(f'SELECT COUNT(*) {POSTGRESQL_MATCH}', [self._tsquery()])[0][0]
+        return self._fallback().count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        if not self.tokens:
+            return []
+
+        offset = index.start or 0
+        limit = index.stop - offset
+        if self.vendor == 'sqlite':
+            rows = self._fetch(
+                f'SELECT rowid {SQLITE_MATCH} {SQLITE_ORDER} LIMIT %s OFFSET %s',
+                [self._fts5_query(), limit, offset]
+            )
+        elif self.vendor == 'postgresql':
+            tsquery = self._tsquery()
+            rows = self._fetch(
+                f'SELECT id {POSTGRESQL_MATCH} {POSTGRESQL_ORDER} LIMIT %s OFFSET %s',
+                [tsquery, tsquery, limit, offset]
+            )
+        else:
+            return list(self._fallback()[offset:index.stop])
+
+        ids = [row[0] for row in rows]
+        books = Book.objects.using(self.db).in_bulk(ids)
+        return [books[book_id] for book_id in ids if book_id in books]
+
+    def _fts5_query(self):
+        # Quote every token so user input can't inject FTS5 operators, and
+        # prefix-match them so partial words ("tolk") still find results.
+        return ' '.join(f'"{token}"*' for token in self.tokens)
+
+    def _tsquery(self):
+        return ' & '.join(f'{token}:*' for token in self.tokens)
+
+    def _fallback(self):
+        queryset = Book.objects.using(self.db)
+        for token in self.tokens:
+            queryset = queryset.filter(
+                models.Q(title__icontains=token)
+                | models.Q(author__icontains=token)
+                | models.Q(genre__icontains=token)
+            )
+        return queryset.order_by('title', 'id')
+
+
+def search_books(query):
+    return BookSearchResults(query)
@@ -0,0 +1,109 @@
+"""
+Synthetic data for load tests.
+
+Everything is written with ``bulk_create`` in batches, generated lazily so
+that seeding millions of loans keeps memory flat. The data is shaped like a
+real library's: a long tail of authors and genres, a year of returned loan
+history, and up to three active loans per reader, some of them overdue.
+Denormalized state (availability, ``loan_count``) is made consistent with
+set-based updates at the end.
+"""
+import io
+import random
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import models, transaction
+from django.utils import timezone
+
+from . import leaderboard, response_cache
+from .models import Book, Loan, Reader
+
+GENRES = (
+    'Fantasy', 'Science Fiction', 'Mystery', 'Romance', 'History', 'Biography',
+    'Poetry', 'Horror', 'Philosophy', 'Children', 'Travel', 'Science',
+)
+AUTHORS = 2000
+DEFAULT_BATCH_SIZE = 5000
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _insert(model, objects, batch_size):
+    ids = []
+    for batch in _batches(objects, batch_size):
+        with transaction.atomic():
+            ids.extend(obj.pk for obj in model.objects.bulk_create(batch))
+    return ids
+
+
+def seed(books, readers, loans, batch_size=DEFAULT_BATCH_SIZE, password=None, seed=None):
+    """
+    Add `books` books, `readers` readers (with users) and `loans` loans.
+    Returns the ids of the created books and readers.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    # Number past the highest existing id, which unlike a row count never
+    # lands on a name an earlier run used, whatever was deleted since.
+    book_offset = (Book.objects.aggregate(last=models.Max('pk'))['last'] or 0) + 1
+    user_offset = (User.objects.aggregate(last=models.Max('pk'))['last'] or 0) + 1
+
+    book_ids = _insert(Book, (
+        Book(
+            title=f'Book {book_offset + i}',
+            author=f'Author {int(rng.paretovariate(1.2)) % AUTHORS}',
+            genre=rng.choice(GENRES),
+            publication_year=rng.randint(1850, now.year)
+        ) for i in range(books)
+    ), batch_size)
+
+    # Hash once: every seeded user shares the password, if one is given.
+    hashed = make_password(password)
+    user_ids = _insert(User, (
+        User(username=f'seed-reader-{user_offset + i}', password=hashed) for i in range(readers)
+    ), batch_size)
+    reader_ids = _insert(Reader, (
+        Reader(user_id=user_id, address='Seeded Address', phone='0000000000') for user_id in user_ids
+    ), batch_size)
+
+    if loans and book_ids and reader_ids:
+        # Active loans take distinct books and at most three per reader; the
+        # rest is returned history spread over the last year.
+        active = min(loans // 10, len(book_ids), 3 * len(reader_ids))
+
+        def make_loan(i):
+            if i < active:
+                return Loan(
+                    book_id=book_ids[i],
+                    reader_id=reader_ids[i % len(reader_ids)],
+                    return_date=now + timezone.timedelta(days=rng.randint(-10, 14), minutes=rng.randint(0, 1439))
+                )
+            return_date = now - timezone.timedelta(days=rng.randint(0, 365), minutes=rng.randint(0, 1439))
+            return Loan(
+                book_id=rng.choice(book_ids),
+                reader_id=rng.choice(reader_ids),
+                return_date=return_date,
+                returned=True,
+                actual_return_date=return_date - timezone.timedelta(days=rng.randint(0, 5))
+            )
+
+        loan_ids = _insert(Loan, (make_loan(i) for i in range(loans)), batch_size)
+
+        # loan_date is auto_now_add, so backdate it afterwards; only the
+        # seeded loans, not ones made meanwhile.
+        for batch in _batches(loan_ids, batch_size):
+            Loan.objects.filter(pk__in=batch).update(loan_date=models.F('return_date') - timezone.timedelta(days=14))
+        for batch in _batches(book_ids[:active], batch_size):
+            Book.objects.filter(pk__in=batch).update(is_available=False, available_copies=0)
+        call_command('rebuild_loan_counts', batch_size=batch_size, stdout=io.StringIO())
+
+    leaderboard.invalidate()
+    response_cache.invalidate_catalog()
+    return book_ids, reader_ids
@@ -1,7 +1,29 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
-from .models import Book, Reader, Loan
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer, TokenRefreshSerializer, TokenVerifySerializer
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import UntypedToken
+from . import inventory, thumbnails
+from .blacklist import blacklist
+from .fieldsets import RowListSerializer, SparseFieldsetMixin
+from .models import Book, Reader, Loan, OverdueSweep
+from .tokens import LibraryRefreshToken
+
+
+def image_variant_urls(fieldfile, request):
+    """
+    URLs of the thumbnail/WebP variants of `fieldfile`, absolute when a
+    request is available, like DRF's ImageField.
+    """
+    if not fieldfile:
+        return None
+    urls = thumbnails.variant_urls(fieldfile)
+    if request is not None:
+        urls = {variant: request.build_absolute_uri(url) for variant, url in urls.items()}
+    return urls
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -39,6 +61,36 @@ class RegisterSerializer(serializers.ModelSerializer):
         return user
 
 
+class LibraryTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Adds the reader id to the issued tokens; refreshed access tokens inherit
+    it from the refresh token. Permission flags are deliberately left out:
+    permissions are checked against the (cached) user, so revoking staff
+    status takes effect without waiting for live tokens to expire.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['reader_id'] = Reader.objects.filter(user=user).values_list('id', flat=True).first()
+        return token
+
+
+class LibraryTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = LibraryRefreshToken
+
+
+class LibraryTokenVerifySerializer(TokenVerifySerializer):
+
+    def validate(self, attrs):
+        token = UntypedToken(attrs['token'])
+        if api_settings.BLACKLIST_AFTER_ROTATION and blacklist.is_blacklisted(
+            token.get(api_settings.JTI_CLAIM), token.get('iat')
+        ):
+            raise serializers.ValidationError("Token is blacklisted")
+        return {}
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -51,28 +103,100 @@ class ChangePasswordSerializer(serializers.Serializer):
     new_password = serializers.CharField(required=True, validators=[validate_password])
 
 
-class ReaderSerializer(serializers.ModelSerializer):
+class ReaderSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
+    profile_picture_variants = serializers.SerializerMethodField()
+    row_sources = {'profile_picture_variants': ['profile_picture']}
 
     class Meta:
         model = Reader
         fields = '__all__'
+        list_serializer_class = RowListSerializer
         extra_kwargs = {
             'profile_picture': {'required': False, 'allow_null': True}
         }
 
+    def get_profile_picture_variants(self, obj):
+        return image_variant_urls(obj.profile_picture, self.context.get('request'))
+
+    def row_profile_picture_variants(self, row):
+        return image_variant_urls(self.row_file('profile_picture', row), self.context.get('request'))
+
+
+class BookSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    cover_image_variants = serializers.SerializerMethodField()
+    row_sources = {'cover_image_variants': ['cover_image']}
 
-class BookSerializer(serializers.ModelSerializer):
     class Meta:
         model = Book
         fields = '__all__'
+        list_serializer_class = RowListSerializer
         extra_kwargs = {
             'cover_image': {'required': False, 'allow_null': True},
-            'is_available': {'read_only': True}
+            'is_available': {'read_only': True},
+            'available_copies': {'read_only': True},
+            'loan_count': {'read_only': True}
         }
 
+    def create(self, validated_data):
+        total_copies = validated_data.get('total_copies', 1)
+        return super().create({**validated_data, 'available_copies': total_copies, 'is_available': True})
+
+    def update(self, instance, validated_data):
+        # The copy counters only move through library.inventory's F()
+        # updates; saving the whole row would write back stale counts.
+        added = validated_data.pop('total_copies', instance.total_copies) - instance.total_copies
+        if added and not inventory.add_copies(instance.pk, added):
+            raise serializers.ValidationError(
+                {"total_copies": "Can't withdraw copies that are on loan."}
+            )
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        if added:
+            instance.refresh_from_db(fields=['total_copies', 'available_copies', 'is_available'])
+        return instance
+
+    def get_cover_image_variants(self, obj):
+        return image_variant_urls(obj.cover_image, self.context.get('request'))
+
+    def row_cover_image_variants(self, row):
+        return image_variant_urls(self.row_file('cover_image', row), self.context.get('request'))
+
+
+class BookFilterSerializer(serializers.Serializer):
+    genre = serializers.CharField(required=False)
+    author = serializers.CharField(required=False)
+    is_available = serializers.BooleanField(required=False)
+    year_min = serializers.IntegerField(required=False)
+    year_max = serializers.IntegerField(required=False)
 
-class LoanSerializer(serializers.ModelSerializer):
+    def validate(self, attrs):
+        if 'year_min' in attrs and 'year_max' in attrs and attrs['year_min'] > attrs['year_max']:
+            raise serializers.ValidationError({"year_min": "year_min can't be greater than year_max."})
+        return attrs
+
+
+class LoanSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Loan
         fields = '__all__'
+        list_serializer_class = RowListSerializer
+        extra_kwargs = {
+            'overdue_days': {'read_only': True},
+            'fine': {'read_only': True}
+        }
+
+
+class OverdueSweepSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OverdueSweep
+        fields = '__all__'
+
+
+class BatchCheckoutSerializer(serializers.Serializer):
+    books = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=50)
+
+
+class BatchReturnSerializer(serializers.Serializer):
+    loans = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=50)
@@ -0,0 +1,131 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.signals import request_started
+from django.db import models, transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from . import authentication, inventory, leaderboard, response_cache, thumbnails
+from .blacklist import blacklist
+from .models import Book, Loan, Reader
+
+
+@receiver(post_save, sender=Loan)
+def count_new_loan(sender, instance, created, raw=False, **kwargs):
+    if not created or raw:
+        return
+    # Checkouts through the API count the loan while claiming the copy.
+    if not getattr(instance, 'counted', False):
+        Book.objects.filter(pk=instance.book_id).update(
+            loan_count=models.F('loan_count') + 1,
+            updated_at=timezone.now()
+        )
+    transaction.on_commit(lambda: leaderboard.record_loan(instance.book_id))
+
+
+@receiver(post_delete, sender=Loan)
+def uncount_deleted_loan(sender, instance, **kwargs):
+    Book.objects.filter(pk=instance.book_id, loan_count__gt=0).update(
+        loan_count=models.F('loan_count') - 1,
+        updated_at=timezone.now()
+    )
+    if not instance.returned:
+        # Deleting an active loan puts its copy back on the shelf.
+        inventory.return_copies([instance.book_id])
+    transaction.on_commit(leaderboard.invalidate)
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def invalidate_cached_book(sender, instance, **kwargs):
+    response_cache.invalidate_book(instance.pk)
+
+
+@receiver(post_save, sender=Loan)
+@receiver(post_delete, sender=Loan)
+def invalidate_cached_loan_book(sender, instance, **kwargs):
+    # Loans change their book's loan_count and availability.
+    response_cache.invalidate_book(instance.book_id)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def announce_blacklisted_token(sender, instance, created, raw=False, **kwargs):
+    if not created or raw:
+        return
+    jti = instance.token.jti
+    transaction.on_commit(lambda: blacklist.added(jti))
+
+
+@receiver(request_started, dispatch_uid='library.warm_token_blacklist')
+def warm_token_blacklist(sender, **kwargs):
+    # Build the filter on the first request, not on the first token refresh;
+    # checking the database from AppConfig.ready would also hit it during
+    # migrate and other management commands.
+    request_started.disconnect(dispatch_uid='library.warm_token_blacklist')
+    blacklist.warm()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def evict_cached_user(sender, instance, **kwargs):
+    # Covers password changes and deactivation as well as plain edits.
+    authentication.evict_user(instance.pk)
+
+
+@receiver(post_save, sender=Reader)
+@receiver(post_delete, sender=Reader)
+def evict_cached_reader_user(sender, instance, **kwargs):
+    authentication.evict_user(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def touch_reader(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    # ReaderSerializer nests the user, so a user edit changes the reader's
+    # representation; bump updated_at so its ETag changes too. Logins only
+    # touch last_login, which isn't serialized.
+    if created or raw or (update_fields and set(update_fields) <= {'last_login'}):
+        return
+    Reader.objects.filter(user=instance).update(updated_at=timezone.now())
+
+
+IMAGE_FIELDS = {
+    Book: ('cover_image', thumbnails.COVER_SIZE),
+    Reader: ('profile_picture', thumbnails.PROFILE_PICTURE_SIZE),
+}
+
+
+def _image_field(instance):
+    field_name, size = IMAGE_FIELDS[type(instance)]
+    return getattr(instance, field_name), size
+
+
+@receiver(pre_save, sender=Book)
+@receiver(pre_save, sender=Reader)
+def note_image_upload(sender, instance, raw=False, **kwargs):
+    # The upload is only written to storage while the model saves, so check
+    # here whether a new, not yet committed file was assigned.
+    fieldfile, _ = _image_field(instance)
+    instance._image_uploaded = not raw and bool(fieldfile) and not fieldfile._committed
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_save, sender=Reader)
+def make_image_variants(sender, instance, **kwargs):
+    if not getattr(instance, '_image_uploaded', False):
+        return
+    instance._image_uploaded = False
+    fieldfile, size = _image_field(instance)
+    storage, name = fieldfile.storage, fieldfile.name
+    transaction.on_commit(lambda: thumbnails.schedule(storage, name, size))
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {name} = {value}')
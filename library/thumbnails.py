@@ -0,0 +1,101 @@
+"""
+Thumbnail and WebP variants of uploaded images.
+
+Every book cover and profile picture gets three files stored beside the
+original, named after it:
+
+* ``<name>.thumb.jpg``  - a fixed-size, center-cropped JPEG thumbnail
+* ``<name>.thumb.webp`` - the same thumbnail as WebP
+* ``<name>.full.webp``  - the full image re-encoded as WebP
+
+The full-size variant has its own suffix so that it never takes the name of
+an original that was uploaded as WebP.
+
+Variants are generated on a small thread pool once the upload is committed,
+so the request that uploaded the image doesn't wait for Pillow. Pillow
+releases the GIL while resampling and encoding, so threads are enough.
+"""
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+COVER_SIZE = (200, 300)
+PROFILE_PICTURE_SIZE = (128, 128)
+
+_executor = None
+
+
+def variant_names(name):
+    root, _ = os.path.splitext(name)
+    return {
+        'thumbnail': f'{root}.thumb.jpg',
+        'thumbnail_webp': f'{root}.thumb.webp',
+        'webp': f'{root}.full.webp',
+    }
+
+
+def variant_urls(fieldfile):
+    return {
+        variant: fieldfile.storage.url(name)
+        for variant, name in variant_names(fieldfile.name).items()
+    }
+
+
+def _store(storage, name, original, image, format, **options):
+    if name == original:
+        raise ValueError(f'Refusing to overwrite the original image {original} with a variant.')
+    buffer = io.BytesIO()
+    image.save(buffer, format, **options)
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def generate_variants(storage, name, size, force=False):
+    """
+    Write the variants of image `name`. Returns False if they already existed.
+    """
+    names = variant_names(name)
+    if not force and all(storage.exists(variant) for variant in names.values()):
+        return False
+
+    with storage.open(name, 'rb') as original:
+        image = ImageOps.exif_transpose(Image.open(original))
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    thumbnail = ImageOps.fit(image, size, Image.Resampling.LANCZOS)
+    _store(storage, names['webp'], name, image, 'WEBP', quality=80)
+    _store(storage, names['thumbnail_webp'], name, thumbnail, 'WEBP', quality=80)
+    _store(storage, names['thumbnail'], name, thumbnail.convert('RGB'), 'JPEG', quality=85, optimize=True)
+    return True
+
+
+def _generate_logged(storage, name, size):
+    try:
+        generate_variants(storage, name, size, force=True)
+    except Exception:
+        logger.exception('Could not generate image variants for %s', name)
+
+
+def schedule(storage, name, size):
+    """
+    Generate the variants of `name` on the worker pool, or inline when
+    THUMBNAILS_ASYNC is off.
+    """
+    global _executor
+    if not getattr(settings, 'THUMBNAILS_ASYNC', True):
+        _generate_logged(storage, name, size)
+        return
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'THUMBNAIL_WORKERS', 2),
+            thread_name_prefix='thumbnails'
+        )
+    _executor.submit(_generate_logged, storage, name, size)
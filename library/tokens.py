@@ -0,0 +1,16 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .blacklist import blacklist
+
+
+class LibraryRefreshToken(RefreshToken):
+    """
+    Refresh token whose blacklist check goes through the in-memory JTI filter.
+    """
+
+    def check_blacklist(self):
+        if blacklist.is_blacklisted(self.payload[api_settings.JTI_CLAIM], self.payload.get('iat')):
+            raise TokenError(_("Token is blacklisted"))
@@ -0,0 +1,133 @@
+"""
+Database triggers on ``library_book``.
+
+They keep the FTS5 search table (SQLite) and ``BookFacetCount`` in step with
+the catalog, including changes made by bulk and queryset updates that bypass
+model signals. SQLite drops a table's triggers whenever Django rebuilds the
+table to alter it, so any migration that alters ``Book`` on SQLite must put
+them back afterwards.
+
+These are the current definitions, used by ``reinstall_book_triggers`` to
+repair a database at runtime (e.g. after unapplying migrations). Migrations
+don't import this module: each one carries a copy of the SQL it installs,
+so editing the triggers here never changes what an old migration does. A
+change to the triggers needs a new migration that installs the new SQL.
+"""
+
+SQLITE_FACET_DECREMENT = """
+    UPDATE library_bookfacetcount SET count = count - 1
+    WHERE genre = old.genre
+      AND decade = (old.publication_year / 10) * 10
+      AND is_available = old.is_available;
+"""
+
+SQLITE_FACET_INCREMENT = """
+    INSERT INTO library_bookfacetcount (genre, decade, is_available, count)
+    VALUES (new.genre, (new.publication_year / 10) * 10, new.is_available, 1)
+    ON CONFLICT (genre, decade, is_available) DO UPDATE SET count = count + 1;
+"""
+
+# Each group maps a vendor to (name, CREATE statement) pairs.
+SEARCH_TRIGGERS = {
+    'sqlite': [
+        ('library_book_fts_insert', """
+            CREATE TRIGGER library_book_fts_insert AFTER INSERT ON library_book BEGIN
+                INSERT INTO library_book_fts(rowid, title, author, genre)
+                VALUES (new.id, new.title, new.author, new.genre);
+            END
+        """),
+        ('library_book_fts_delete', """
+            CREATE TRIGGER library_book_fts_delete AFTER DELETE ON library_book BEGIN
+                INSERT INTO library_book_fts(library_book_fts, rowid, title, author, genre)
+                VALUES ('delete', old.id, old.title, old.author, old.genre);
+            END
+        """),
+        ('library_book_fts_update', """
+            CREATE TRIGGER library_book_fts_update AFTER UPDATE OF title, author, genre ON library_book BEGIN
+                INSERT INTO library_book_fts(library_book_fts, rowid, title, author, genre)
+                VALUES ('delete', old.id, old.title, old.author, old.genre);
+                INSERT INTO library_book_fts(rowid, title, author, genre)
+                VALUES (new.id, new.title, new.author, new.genre);
+            END
+        """),
+    ],
+}
+
+FACET_TRIGGERS = {
+    'sqlite': [
+        ('library_book_facet_insert', f"""
+            CREATE TRIGGER library_book_facet_insert AFTER INSERT ON library_book BEGIN
+                {SQLITE_FACET_INCREMENT}
+            END
+        """),
+        ('library_book_facet_delete', f"""
+            CREATE TRIGGER library_book_facet_delete AFTER DELETE ON library_book BEGIN
+                {SQLITE_FACET_DECREMENT}
+            END
+        """),
+        ('library_book_facet_update', f"""
+            CREATE TRIGGER library_book_facet_update
+            AFTER UPDATE OF genre, publication_year, is_available ON library_book
+            WHEN old.genre IS NOT new.genre
+              OR (old.publication_year / 10) IS NOT (new.publication_year / 10)
+              OR old.is_available IS NOT new.is_available
+            BEGIN
+                {SQLITE_FACET_DECREMENT}
+                {SQLITE_FACET_INCREMENT}
+            END
+        """),
+    ],
+    'postgresql': [
+        ('library_book_facet_count', """
+            CREATE OR REPLACE FUNCTION library_book_facet_count() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    UPDATE library_bookfacetcount SET count = count - 1
+                    WHERE genre = OLD.genre
+                      AND decade = (OLD.publication_year / 10) * 10
+                      AND is_available = OLD.is_available;
+                END IF;
+                IF TG_OP IN ('UPDATE', 'INSERT') THEN
+                    INSERT INTO library_bookfacetcount (genre, decade, is_available, count)
+                    VALUES (NEW.genre, (NEW.publication_year / 10) * 10, NEW.is_available, 1)
+                    ON CONFLICT (genre, decade, is_available)
+                    DO UPDATE SET count = library_bookfacetcount.count + 1;
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql;
+
+            CREATE TRIGGER library_book_facet_count
+            AFTER INSERT OR DELETE OR UPDATE OF genre, publication_year, is_available ON library_book
+            FOR EACH ROW EXECUTE FUNCTION library_book_facet_count();
+        """),
+    ],
+}
+
+
+def _drop_statement(vendor, name):
+    if vendor == 'postgresql':
+        return f'DROP TRIGGER IF EXISTS {name} ON library_book'
+    return f'DROP TRIGGER IF EXISTS {name}'
+
+
+def install(schema_editor, *groups):
+    vendor = schema_editor.connection.vendor
+    for group in groups:
+        for name, create in group.get(vendor, []):
+            schema_editor.execute(_drop_statement(vendor, name))
+            schema_editor.execute(create)
+
+
+def uninstall(schema_editor, *groups):
+    vendor = schema_editor.connection.vendor
+    for group in groups:
+        for name, _ in group.get(vendor, []):
+            schema_editor.execute(_drop_statement(vendor, name))
+    if vendor == 'postgresql' and FACET_TRIGGERS in groups:
+        schema_editor.execute('DROP FUNCTION IF EXISTS library_book_facet_count()')
+
+
+def reinstall_book_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        install(schema_editor, SEARCH_TRIGGERS, FACET_TRIGGERS)
@@ -6,6 +6,7 @@ from rest_framework_simplejwt.views import (
     TokenVerifyView,
 )
 
+from . import async_views
 from .views import (
     BookViewSet,
     ReaderViewSet,
@@ -29,5 +30,11 @@ urlpatterns = [
     path('auth/change-password/', ChangePasswordView.as_view(), name='change_password'),
     path('auth/profile/', get_user_profile, name='user_profile'),
     path('auth/logout/', logout_view, name='logout'),
+    path('async/books/', async_views.book_list, name='async_book_list'),
+    path('async/books/search/', async_views.book_search, name='async_book_search'),
+    path('async/books/most_borrowed/', async_views.most_borrowed, name='async_most_borrowed'),
+    path('async/books/<int:pk>/', async_views.book_detail, name='async_book_detail'),
+    path('async/loans/pending/', async_views.pending_loans, name='async_pending_loans'),
+    path('async/auth/profile/', async_views.user_profile, name='async_user_profile'),
     path('', include(router.urls)),
 ]
@@ -1,18 +1,36 @@
+import io
+
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, transaction
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from rest_framework import viewsets, status, permissions, generics
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.parsers import MultiPartParser, FormParser
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 
+from . import exporters, importers, inventory, leaderboard, overdue, response_cache
+from .authentication import get_reader_id
+from .conditional import (
+    ConditionalModelMixin, has_write_precondition, instance_validators,
+    precondition_response, set_validators
+)
+from .facets import facet_counts, filter_books
+from .fieldsets import SparseFieldsViewMixin
 from .models import Book, Reader, Loan
+from .pagination import LoanCursorPagination, OverdueCursorPagination, SearchPagination
+from .routers import ReplicaReadMixin
+from .search import search_books
 from .serializers import (
     BookSerializer, ReaderSerializer, LoanSerializer,
-    RegisterSerializer, ChangePasswordSerializer
+    RegisterSerializer, ChangePasswordSerializer, BookFilterSerializer,
+    BatchCheckoutSerializer, BatchReturnSerializer, OverdueSweepSerializer
 )
+from .tokens import LibraryRefreshToken
+
+MAX_ACTIVE_LOANS = 3
+LOAN_PERIOD = timezone.timedelta(days=14)
 
 
 class RegisterView(generics.CreateAPIView):
@@ -51,14 +69,22 @@ def get_user_profile(request):
     reader = request.user.reader
 
     if request.method == 'GET':
+        etag, last_modified = instance_validators(request, reader)
+        response = precondition_response(request, etag, last_modified)
+        if response is not None:
+            return response
         serializer = ReaderSerializer(reader)
-        return Response(serializer.data)
+        return set_validators(Response(serializer.data), etag, last_modified)
 
     if request.method == 'PUT':
+        if has_write_precondition(request):
+            response = precondition_response(request, *instance_validators(request, reader))
+            if response is not None:
+                return response
         serializer = ReaderSerializer(reader, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
-            return Response(serializer.data)
+            return set_validators(Response(serializer.data), *instance_validators(request, serializer.instance))
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -67,88 +93,300 @@ def get_user_profile(request):
 def logout_view(request):
     try:
         refresh_token = request.data["refresh_token"]
-        token = RefreshToken(refresh_token)
+        token = LibraryRefreshToken(refresh_token)
         token.blacklist()
         return Response({"message": "Successfully logged out."})
     except Exception:
         return Response({"message": "Invalid token."}, status=status.HTTP_400_BAD_REQUEST)
 
 
-class BookViewSet(viewsets.ModelViewSet):
+def export_response(request, kind):
+    output = request.query_params.get('output', 'csv')
+    if output not in exporters.FORMATS:
+        return Response(
+            {"error": f"output must be one of {', '.join(exporters.FORMATS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    bounds = {}
+    for name in ('since', 'until') if kind == 'loans' else ():
+        value = request.query_params.get(name)
+        if value:
+            try:
+                bounds[name] = exporters.parse_bound(value)
+            except ValueError as exc:
+                return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    fields, rows = exporters.export_rows(kind, **bounds)
+    response = StreamingHttpResponse(
+        exporters.render(output, fields, rows),
+        content_type=exporters.CONTENT_TYPES[output]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{kind}.{output}"'
+    return response
+
+
+class BookViewSet(ReplicaReadMixin, response_cache.CachedResponseMixin, ConditionalModelMixin,
+                  SparseFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
+    def get_book_filters(self):
+        serializer = BookFilterSerializer(data=self.request.query_params.dict())
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            queryset = filter_books(queryset, self.get_book_filters())
+        return queryset
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        return Response(facet_counts(self.get_book_filters()))
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"error": "Query parameter 'q' is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = SearchPagination()
+        page = paginator.paginate_queryset(search_books(query), request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser])
+    def bulk(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"error": "Upload the catalog as 'file'"}, status=status.HTTP_400_BAD_REQUEST)
+
+        format = request.data.get('format') or upload.name.rsplit('.', 1)[-1].lower()
+        if format not in importers.FORMATS:
+            return Response(
+                {"error": f"format must be one of {', '.join(importers.FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            batch_size = int(request.data.get('batch_size', importers.DEFAULT_BATCH_SIZE))
+        except ValueError:
+            return Response({"error": "batch_size must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        stream = io.TextIOWrapper(upload, encoding='utf-8', newline='')
+        report = importers.import_books(stream, format, max(batch_size, 1))
+        # A partial import still reports what was written before it stopped.
+        return Response(report.as_dict(), status=status.HTTP_400_BAD_REQUEST if report.error else status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def export(self, request):
+        return export_response(request, 'books')
+
     @action(detail=False, methods=['get'])
     def most_borrowed(self, request):
-        books = Book.objects.annotate(
-            loan_count=models.Count('loan')
-        ).order_by('-loan_count')[:10]
+        return self._serve(request, ['book-lists'], lambda: self._most_borrowed(request))
+
+    def _most_borrowed(self, request):
+        window = request.query_params.get('window')
+        if window is not None and (not window.isdigit() or int(window) not in leaderboard.WINDOWS):
+            return Response(
+                {"error": f"window must be one of {', '.join(map(str, leaderboard.WINDOWS))} days"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        books = leaderboard.most_borrowed(int(window) if window else None)
         serializer = self.get_serializer(books, many=True)
         return Response(serializer.data)
 
 
-class ReaderViewSet(viewsets.ModelViewSet):
-    queryset = Reader.objects.all()
+class ReaderViewSet(ReplicaReadMixin, ConditionalModelMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
+    queryset = Reader.objects.select_related('user')
     serializer_class = ReaderSerializer
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
 
-class LoanViewSet(viewsets.ModelViewSet):
-    queryset = Loan.objects.all()
+class LoanViewSet(ReplicaReadMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
+    queryset = Loan.objects.select_related('reader')
     serializer_class = LoanSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = LoanCursorPagination
 
     def create(self, request, *args, **kwargs):
         mutable_data = request.data.copy()
-        reader = Reader.objects.get(user=request.user)
-        active_loans = Loan.objects.filter(reader=reader, returned=False).count()
+        book_id = mutable_data.get('book')
 
-        if active_loans >= 3:
-            return Response({"error": "Maximum number of loans reached"}, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            # Locking the reader row serializes checkouts per reader, so the
+            # active-loan count below cannot go stale before the insert.
+            reader = Reader.objects.select_for_update().get(pk=get_reader_id(request))
+            active_loans = Loan.objects.filter(reader=reader, returned=False).count()
+
+            if active_loans >= MAX_ACTIVE_LOANS:
+                return Response({"error": "Maximum number of loans reached"}, status=status.HTTP_400_BAD_REQUEST)
+
+            # Claim a copy with a conditional UPDATE: concurrent checkouts
+            # decrement available_copies one at a time and none can take it
+            # below zero. The same UPDATE counts the loan, so the book row
+            # is written once per checkout.
+            claimed = inventory.take_copies([book_id], loan_count=models.F('loan_count') + 1)
+            if not claimed:
+                if Book.objects.filter(pk=book_id).exists():
+                    return Response({"error": "Book is not available for loan"}, status=status.HTTP_400_BAD_REQUEST)
+                return Response({"error": "Book not found"}, status=status.HTTP_404_NOT_FOUND)
+
+            mutable_data['reader'] = reader.id
+            mutable_data['return_date'] = (timezone.now() + LOAN_PERIOD).isoformat()
+            serializer = self.get_serializer(data=mutable_data)
+            serializer.is_valid(raise_exception=True)
+            loan = Loan(**serializer.validated_data)
+            loan.counted = True
+            loan.save()
+            serializer.instance = loan
 
-        book_id = mutable_data.get('book')
-        try:
-            book = Book.objects.get(pk=book_id)
-            if not book.is_available:
-                return Response({"error": "Book is not available for loan"}, status=status.HTTP_400_BAD_REQUEST)
-        except Book.DoesNotExist:
-            return Response({"error": "Book not found"}, status=status.HTTP_404_NOT_FOUND)
-
-        mutable_data['reader'] = reader.id
-        mutable_data['return_date'] = (timezone.now() + timezone.timedelta(days=14)).isoformat()
-        serializer = self.get_serializer(data=mutable_data)
-        serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
         headers = self.get_success_headers(serializer.data)
-
-        book.is_available = False
-        book.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
     @action(detail=True, methods=['post'])
     def return_book(self, request, pk=None):
         loan = self.get_object()
-        if loan.reader.user != request.user:
+        if loan.reader.user_id != request.user.id:
             return Response({"error": "You are not authorized to return this book"}, status=status.HTTP_403_FORBIDDEN)
 
-        loan.returned = True
-        loan.actual_return_date = timezone.now()
-        loan.save()
+        now = timezone.now()
+        with transaction.atomic():
+            returned = Loan.objects.filter(pk=loan.pk, returned=False).update(
+                returned=True,
+                actual_return_date=now
+            )
+            if not returned:
+                return Response({"error": "This loan has already been returned"}, status=status.HTTP_400_BAD_REQUEST)
 
-        book = loan.book
-        book.is_available = True
-        book.save()
+            inventory.return_copies([loan.book_id], now)
+            response_cache.invalidate_book(loan.book_id)
 
         return Response({'status': 'book returned'})
 
+    @action(detail=False, methods=['post'], url_path='batch-checkout')
+    def batch_checkout(self, request):
+        serializer = BatchCheckoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        book_ids = list(dict.fromkeys(serializer.validated_data['books']))
+
+        now = timezone.now()
+        results = {}
+        with transaction.atomic():
+            reader = Reader.objects.select_for_update().get(pk=get_reader_id(request))
+            slots = MAX_ACTIVE_LOANS - Loan.objects.filter(reader=reader, returned=False).count()
+
+            # One locked read settles every requested book, so the UPDATE
+            # below can't race another checkout of the same books.
+            availability = dict(
+                Book.objects.select_for_update()
+                .filter(pk__in=book_ids)
+                # Lock in a fixed order so overlapping batches can't deadlock.
+                .order_by('pk')
+                .values_list('pk', 'available_copies')
+            )
+            claimed = []
+            for book_id in book_ids:
+                if book_id not in availability:
+                    results[book_id] = {"book": book_id, "error": "Book not found"}
+                elif not availability[book_id]:
+                    results[book_id] = {"book": book_id, "error": "Book is not available for loan"}
+                elif len(claimed) >= slots:
+                    results[book_id] = {"book": book_id, "error": "Maximum number of loans reached"}
+                else:
+                    claimed.append(book_id)
+
+            if claimed:
+                # bulk_create skips the Loan signals, so count the loans here.
+                taken = inventory.take_copies(claimed, now, loan_count=models.F('loan_count') + 1)
+                if taken < len(claimed):
+                    transaction.set_rollback(True)
+                    return Response(
+                        {"error": "Some of the books were checked out meanwhile; nothing was borrowed, try again"},
+                        status=status.HTTP_409_CONFLICT
+                    )
+                loans = Loan.objects.bulk_create(
+                    Loan(book_id=book_id, reader=reader, return_date=now + LOAN_PERIOD)
+                    for book_id in claimed
+                )
+                for loan in loans:
+                    results[loan.book_id] = {"book": loan.book_id, "loan": LoanSerializer(loan).data}
+                response_cache.invalidate_books(claimed)
+                for book_id in claimed:
+                    transaction.on_commit(lambda book_id=book_id: leaderboard.record_loan(book_id))
+
+        return Response(
+            {"results": [results[book_id] for book_id in book_ids]},
+            status=status.HTTP_201_CREATED if claimed else status.HTTP_400_BAD_REQUEST
+        )
+
+    @action(detail=False, methods=['post'], url_path='batch-return')
+    def batch_return(self, request):
+        serializer = BatchReturnSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        loan_ids = list(dict.fromkeys(serializer.validated_data['loans']))
+
+        reader_id = get_reader_id(request)
+        now = timezone.now()
+        results = {}
+        with transaction.atomic():
+            loans = {
+                pk: (book_id, loan_reader_id, returned)
+                for pk, book_id, loan_reader_id, returned in Loan.objects.select_for_update()
+                .filter(pk__in=loan_ids)
+                .order_by('pk')
+                .values_list('pk', 'book_id', 'reader_id', 'returned')
+            }
+            returning = {}
+            for loan_id in loan_ids:
+                if loan_id not in loans:
+                    results[loan_id] = {"loan": loan_id, "error": "Loan not found"}
+                elif loans[loan_id][1] != reader_id:
+                    results[loan_id] = {"loan": loan_id, "error": "You are not authorized to return this book"}
+                elif loans[loan_id][2]:
+                    results[loan_id] = {"loan": loan_id, "error": "This loan has already been returned"}
+                else:
+                    returning[loan_id] = loans[loan_id][0]
+                    results[loan_id] = {"loan": loan_id, "status": "book returned"}
+
+            if returning:
+                Loan.objects.filter(pk__in=returning).update(returned=True, actual_return_date=now)
+                # Several of the loans may be copies of the same title.
+                inventory.return_copies(list(returning.values()), now)
+                response_cache.invalidate_books(returning.values())
+
+        return Response(
+            {"results": [results[loan_id] for loan_id in loan_ids]},
+            status=status.HTTP_200_OK if returning else status.HTTP_400_BAD_REQUEST
+        )
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def export(self, request):
+        return export_response(request, 'loans')
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def overdue(self, request):
+        paginator = OverdueCursorPagination()
+        page = paginator.paginate_queryset(overdue.overdue_loans(), request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['post'], url_path='overdue/sweep', permission_classes=[IsAdminUser])
+    def sweep_overdue(self, request):
+        result = overdue.sweep()
+        return Response(OverdueSweepSerializer(result).data, status=status.HTTP_201_CREATED)
+
     @action(detail=False, methods=['get'])
     def pending(self, request):
-        reader = Reader.objects.get(user=request.user)
         pending_loans = Loan.objects.filter(
-            reader=reader,
+            reader_id=get_reader_id(request),
             returned=False,
             return_date__lt=timezone.now()
         )
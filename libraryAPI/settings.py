@@ -49,11 +49,23 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'library.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_PAGINATION_CLASS': 'library.pagination.CreatedAtCursorPagination',
+    'PAGE_SIZE': 20,
+    # orjson-backed when orjson is installed, DRF's stdlib JSON otherwise.
+    'DEFAULT_RENDERER_CLASSES': (
+        'library.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'library.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
 SIMPLE_JWT = {
@@ -78,9 +90,36 @@ SIMPLE_JWT = {
     'TOKEN_TYPE_CLAIM': 'token_type',
 
     'JTI_CLAIM': 'jti',
+
+    'TOKEN_OBTAIN_SERIALIZER': 'library.serializers.LibraryTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'library.serializers.LibraryTokenRefreshSerializer',
+    'TOKEN_VERIFY_SERIALIZER': 'library.serializers.LibraryTokenVerifySerializer',
 }
 
+# Seconds an authenticated user stays in the per-process cache used by
+# library.authentication.CachedJWTAuthentication.
+AUTH_USER_CACHE_TTL = 30
+
+# Upper bound, in seconds, on how long a process can miss a refresh token
+# blacklisted by another process when TOKEN_BLACKLIST_CACHE isn't shared.
+TOKEN_BLACKLIST_SYNC_INTERVAL = 1
+# Cache through which processes announce newly blacklisted tokens.
+TOKEN_BLACKLIST_CACHE = 'responses'
+# Seconds of blacklist entries re-read on every sync, to pick up rows that
+# committed after a later one had already been read.
+TOKEN_BLACKLIST_SYNC_OVERLAP = 60
+
+# Cache holding the windowed "most borrowed" rankings; shared by all
+# processes so they all patch and read the same counters.
+LEADERBOARD_CACHE = 'responses'
+
+# Fine charged per whole day a loan is overdue, applied by the overdue sweep
+# (manage.py sweep_overdue or POST /loans/overdue/sweep/).
+LOAN_FINE_PER_DAY = '0.50'
+
 MIDDLEWARE = [
+    'library.metrics.MetricsMiddleware',
+    'library.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -92,6 +131,25 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
 ]
 
+# Request/SQL metrics served at /metrics (see library.metrics). Set
+# SLOW_REQUEST_SECONDS to log slower requests with their SQL. Scrapers
+# authenticate with METRICS_TOKEN; without it /metrics is refused unless DEBUG
+# is on.
+METRICS = {
+    'ENABLED': True,
+    'N_PLUS_ONE_THRESHOLD': 5,
+    'SLOW_REQUEST_SECONDS': None,
+    'TOKEN': os.environ.get('METRICS_TOKEN'),
+}
+
+# Negotiated gzip/brotli compression of textual responses (see
+# library.compression); brotli is used when the brotli package is installed.
+COMPRESSION = {
+    'ENABLED': True,
+    'MIN_SIZE': 1024,
+    'BROTLI_QUALITY': 5,
+}
+
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
 
@@ -119,11 +177,112 @@ WSGI_APPLICATION = 'libraryAPI.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DATABASE_ENGINE selects the profile: 'sqlite' (default) or 'postgresql'.
+# Connections persist for CONN_MAX_AGE seconds and are health-checked before
+# reuse, so requests don't pay for a fresh connection each time.
+
+DATABASE_ENGINE = os.environ.get('DATABASE_ENGINE', 'sqlite')
+CONN_MAX_AGE = int(os.environ.get('CONN_MAX_AGE', 60))
+
+if DATABASE_ENGINE == 'postgresql':
+    # With DATABASE_POOL_MAX_SIZE set, connections come from a psycopg pool
+    # (requires psycopg[pool]); Django then needs CONN_MAX_AGE = 0.
+    DATABASE_POOL = {
+        'min_size': int(os.environ.get('DATABASE_POOL_MIN_SIZE', 2)),
+        'max_size': int(os.environ.get('DATABASE_POOL_MAX_SIZE', 0)),
+        'timeout': int(os.environ.get('DATABASE_POOL_TIMEOUT', 10)),
+    }
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DATABASE_NAME', 'library'),
+            'USER': os.environ.get('DATABASE_USER', 'library'),
+            'PASSWORD': os.environ.get('DATABASE_PASSWORD', ''),
+            'HOST': os.environ.get('DATABASE_HOST', 'localhost'),
+            'PORT': os.environ.get('DATABASE_PORT', '5432'),
+            'OPTIONS': {'pool': DATABASE_POOL} if DATABASE_POOL['max_size'] else {},
+            'CONN_MAX_AGE': 0 if DATABASE_POOL['max_size'] else CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+        }
     }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DATABASE_NAME', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                # Take the write lock when a transaction starts so concurrent
+                # checkouts wait on the busy timeout instead of failing with
+                # "database is locked" when upgrading a read lock.
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 20)),
+            },
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            # A file-backed test database keeps SQLite's normal file locking;
+            # the shared-cache in-memory default fails concurrent writers with
+            # "database table is locked" instead of waiting.
+            'TEST': {
+                'NAME': BASE_DIR / 'test_db.sqlite3',
+            },
+        }
+    }
+
+# Read replicas: DATABASE_REPLICAS is a comma-separated list of SQLite file
+# paths, or of PostgreSQL hosts, each a copy of the primary. Safe requests
+# to the catalog, reader and loan endpoints read from them (library.routers);
+# a client that writes is pinned to the primary for REPLICA_PIN_SECONDS.
+DATABASE_REPLICAS = []
+for number, location in enumerate(filter(None, os.environ.get('DATABASE_REPLICAS', '').split(',')), 1):
+    alias = f'replica{number}'
+    replica = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+    replica['NAME' if DATABASE_ENGINE == 'sqlite' else 'HOST'] = location.strip()
+    DATABASES[alias] = replica
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['library.routers.ReplicaRouter']
+REPLICA_PIN_SECONDS = 5
+# Cache holding the pins; it must be shared by all processes for a pin to hold.
+REPLICA_PIN_CACHE = 'responses'
+REPLICA_RETRY_SECONDS = 30
+
+# PRAGMAs run on every new SQLite connection (see library.signals). WAL lets
+# readers proceed while a checkout writes, and with it synchronous=NORMAL
+# only fsyncs at checkpoints. mmap_size and cache_size (negative: KiB) keep
+# hot pages in memory.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -64000)),
+    'temp_store': 'MEMORY',
+}
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+#
+# Serialized catalog responses go to the 'responses' cache. It is local
+# memory by default; point RESPONSE_CACHE_BACKEND/RESPONSE_CACHE_LOCATION at
+# e.g. django.core.cache.backends.filebased.FileBasedCache or a shared
+# Redis/Memcached backend to share it between processes.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': os.environ.get('RESPONSE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('RESPONSE_CACHE_LOCATION', 'library-responses'),
+    },
+}
+
+RESPONSE_CACHE = {
+    'ENABLED': True,
+    'ALIAS': 'responses',
+    'TIMEOUT': 60,
+    # How long a request waits for another one rebuilding the same entry
+    # before building it itself.
+    'LOCK_WAIT': 2,
 }
 
 # Password validation
@@ -164,6 +323,12 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Thumbnail and WebP variants of uploaded images are generated on a thread
+# pool after the upload commits; set THUMBNAILS_ASYNC to False to generate
+# them inline instead.
+THUMBNAILS_ASYNC = True
+THUMBNAIL_WORKERS = 2
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field